@@ -18,7 +18,8 @@ import {
   Database,
 } from "lucide-react"
 import { ReviewsTable } from "../components/reviews-table"
-import { SentimentChart } from "../components/sentiment-chart"
+import { ReviewSearch } from "../components/review-search"
+import { SentimentChart, type ReviewSummary } from "../components/sentiment-chart"
 import { Alert, AlertDescription } from "../components/ui/alert"
 import  {Badge}  from "../components/ui/badge"
 import { motion, AnimatePresence } from "framer-motion"
@@ -37,21 +38,41 @@ interface ScrapeResponse {
   data: ReviewData[]
   message: string
   total_reviews: number
-  google_sheets_saved: boolean
+  google_sheets_saved: boolean | "pending"
   sheet_url?: string
+  product_id?: string
+  summary?: ReviewSummary
 }
 
+interface ScrapeJob {
+  job_id: string
+  status: "queued" | "running" | "done" | "failed"
+  pages_fetched: number
+  reviews_scored: number
+  error?: string
+  reviews: ReviewData[]
+  summary?: ReviewSummary
+  result?: ScrapeResponse
+}
+
+const JOB_POLL_INTERVAL_MS = 1000
+
 // Get API URL from environment or default to localhost
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
 
 export default function Home() {
   const [productUrl, setProductUrl] = useState("https://www.daraz.pk/products/sample-product")
-  const [reviews, setReviews] = useState<ReviewData[]>([])
+  const [productId, setProductId] = useState<string | null>(null)
+  const [summary, setSummary] = useState<ReviewSummary | null>(null)
+  // Reviews held in the page: what a running job has scored so far, then the finished result's reviews
+  // when the review store cannot page them (store disabled, or demo data that is never stored)
+  const [jobReviews, setJobReviews] = useState<ReviewData[]>([])
   const [loading, setLoading] = useState(false)
   const [hasData, setHasData] = useState(false)
   const [error, setError] = useState<string | null>(null)
+  const [pagesFetched, setPagesFetched] = useState(0)
   const [googleSheetsStatus, setGoogleSheetsStatus] = useState<{
-    saved: boolean
+    saved: boolean | "pending"
     url?: string
   } | null>(null)
 
@@ -98,9 +119,14 @@ export default function Home() {
     setLoading(true)
     setError(null)
     setGoogleSheetsStatus(null)
+    setProductId(null)
+    setSummary(null)
+    setJobReviews([])
+    setPagesFetched(0)
+    setHasData(false)
 
     try {
-      const response = await fetch(`${API_URL}/scrape`, {
+      const response = await fetch(`${API_URL}/jobs`, {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
@@ -113,19 +139,61 @@ export default function Home() {
         throw new Error(errorData.detail || `HTTP ${response.status}`)
       }
 
-      const data: ScrapeResponse = await response.json()
+      // The scrape runs as a background job. Each poll returns only the reviews scored since the last one;
+      // the finished result comes without reviews, the table then pages them from the store if it can
+      let job: ScrapeJob = await response.json()
+      let received = 0
 
-      if (!data.success || !data.data || data.data.length === 0) {
+      while (job.status === "queued" || job.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS))
+        const poll = await fetch(`${API_URL}/jobs/${job.job_id}?include_reviews=false&offset=${received}`)
+        if (!poll.ok) {
+          throw new Error(`HTTP ${poll.status}`)
+        }
+        job = await poll.json()
+        setPagesFetched(job.pages_fetched)
+        const newReviews = job.reviews ?? []
+        if (newReviews.length > 0) {
+          received += newReviews.length
+          setJobReviews((prev) => [...prev, ...newReviews])
+        }
+        if (job.summary) {
+          setSummary(job.summary)
+          setHasData(job.summary.total > 0)
+        }
+      }
+
+      if (job.status === "failed") {
+        throw new Error(job.error || "Scraping failed")
+      }
+
+      const result = job.result
+      if (!result || !result.success || result.total_reviews === 0) {
         throw new Error("No reviews found or invalid response")
       }
 
-      setReviews(data.data)
+      // Page the finished reviews from the store when it has them, else show the result's own reviews
+      const storedId = result.product_id
+      const stored = storedId
+        ? (await fetch(`${API_URL}/products/${encodeURIComponent(storedId)}/reviews?limit=1`)).ok
+        : false
+      if (stored) {
+        setProductId(storedId ?? null)
+      } else {
+        const full = await fetch(`${API_URL}/jobs/${job.job_id}?include_reviews=true`)
+        if (!full.ok) {
+          throw new Error(`HTTP ${full.status}`)
+        }
+        const finished: ScrapeJob = await full.json()
+        setJobReviews(finished.result?.data ?? [])
+      }
+      setSummary(result.summary ?? null)
       setHasData(true)
       setError(null)
 
       setGoogleSheetsStatus({
-        saved: data.google_sheets_saved,
-        url: data.sheet_url,
+        saved: result.google_sheets_saved,
+        url: result.sheet_url,
       })
     } catch (error) {
       const errorMessage = error instanceof Error ? error.message : "Failed to scrape reviews"
@@ -136,30 +204,14 @@ export default function Home() {
     }
   }
 
-  const getSentimentStats = () => {
-    if (!reviews || reviews.length === 0) {
-      return { positive: 0, negative: 0, neutral: 0, total: 0 }
-    }
-
-    const stats = reviews.reduce(
-      (acc, review) => {
-        const label = review.sentiment_label || "Neutral"
-        acc[label] = (acc[label] || 0) + 1
-        return acc
-      },
-      {} as Record<string, number>,
-    )
-
-    return {
-      positive: stats.Positive || 0,
-      negative: stats.Negative || 0,
-      neutral: stats.Neutral || 0,
-      total: reviews.length,
-    }
+  // Counts come from the backend's summary rather than a pass over every review on each render
+  const sentimentStats = {
+    positive: summary?.labels.Positive ?? 0,
+    negative: summary?.labels.Negative ?? 0,
+    neutral: summary?.labels.Neutral ?? 0,
+    total: summary?.total ?? 0,
   }
 
-  const sentimentStats = getSentimentStats()
-
   return (
     <div className="min-h-screen bg-gradient-to-br from-slate-900 via-purple-900 to-slate-900 relative overflow-hidden">
       {/* Animated Background Elements */}
@@ -234,7 +286,9 @@ export default function Home() {
                   {loading ? (
                     <>
                       <Loader2 className="mr-2 h-5 w-5 animate-spin" />
-                      Analyzing...
+                      {summary && summary.total > 0
+                        ? `Analyzing... (${summary.total} reviews, ${pagesFetched} pages)`
+                        : "Analyzing..."}
                     </>
                   ) : (
                     <>
@@ -270,9 +324,11 @@ export default function Home() {
                       <CheckCircle className="h-4 w-4 text-green-400" />
                       <AlertDescription className="flex flex-col sm:flex-row sm:items-center sm:justify-between gap-3 text-green-200">
                         <span>
-                          {googleSheetsStatus.saved
-                            ? "✅ Data saved to Google Sheets successfully!"
-                            : "⚠️ Data processed but not saved to Google Sheets"}
+                          {googleSheetsStatus.saved === "pending"
+                            ? "⏳ Saving to Google Sheets in the background..."
+                            : googleSheetsStatus.saved
+                              ? "✅ Data saved to Google Sheets successfully!"
+                              : "⚠️ Data processed but not saved to Google Sheets"}
                         </span>
                         {googleSheetsStatus.url && (
                           <Button
@@ -347,7 +403,11 @@ export default function Home() {
                               <Badge
                                 className={`${googleSheetsStatus.saved ? "bg-green-500/20 text-green-300" : "bg-gray-500/20 text-gray-300"} border-0`}
                               >
-                                {googleSheetsStatus.saved ? "Sheets Saved" : "Not Saved"}
+                                {googleSheetsStatus.saved === "pending"
+                                  ? "Sheets Pending"
+                                  : googleSheetsStatus.saved
+                                    ? "Sheets Saved"
+                                    : "Not Saved"}
                               </Badge>
                             )}
                           </div>
@@ -368,7 +428,7 @@ export default function Home() {
 
         {/* Charts and Table */}
         <AnimatePresence>
-          {hasData && reviews.length > 0 && (
+          {hasData && summary && summary.total > 0 && (
             <motion.div
               className="grid grid-cols-1 xl:grid-cols-3 gap-6 lg:gap-8"
               variants={containerVariants}
@@ -382,7 +442,7 @@ export default function Home() {
                 style={{ perspective: 1000 }}
               >
                 <motion.div variants={cardHoverVariants}>
-                  <SentimentChart data={reviews} />
+                  <SentimentChart summary={summary} />
                 </motion.div>
               </motion.div>
               <motion.div
@@ -392,12 +452,21 @@ export default function Home() {
                 style={{ perspective: 1000 }}
               >
                 <motion.div variants={cardHoverVariants}>
-                  <ReviewsTable reviews={reviews} />
+                  {productId ? (
+                    <ReviewsTable key={productId} productId={productId} />
+                  ) : (
+                    jobReviews.length > 0 && <ReviewsTable key="job" rows={jobReviews} running={loading} />
+                  )}
                 </motion.div>
               </motion.div>
             </motion.div>
           )}
         </AnimatePresence>
+
+        {/* Search over every stored review */}
+        <motion.div variants={itemVariants}>
+          <ReviewSearch />
+        </motion.div>
       </motion.div>
 
       <style jsx>{`
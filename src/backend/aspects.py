@@ -0,0 +1,111 @@
+import re
+
+import numpy as np
+
+# Aspect -> the nouns and noun phrases that name it in a review
+ASPECT_TERMS = {
+    "quality": ("quality", "build quality", "material", "materials", "fabric", "stitching", "finish"),
+    "price": ("price", "value", "value for money", "money", "cost", "deal"),
+    "delivery": ("delivery", "shipping", "shipment", "courier", "parcel", "arrival", "on time"),
+    "packaging": ("packaging", "package", "packing", "box", "wrapping"),
+    "size": ("size", "sizes", "sizing", "fit", "fitting"),
+    "battery": ("battery", "batteries", "battery life", "charge", "charging", "charger"),
+    "service": ("service", "customer service", "seller", "support", "refund", "return", "returns", "warranty"),
+    "design": ("design", "color", "colour", "colors", "colours", "look", "looks", "style"),
+    "description": ("description", "as described", "picture", "pictures", "photo", "photos", "as pictured"),
+}
+# Column order of aspect matrices (ReviewBatch.aspects)
+ASPECTS = tuple(ASPECT_TERMS)
+
+# Tokens that end a clause; an aspect takes the polarity of the clause it is mentioned in
+_CLAUSE_ENDS = frozenset((".", "!", "?", ";", "..."))
+_CONTRASTS = frozenset(("but", "however", "although", "though", "yet", "whereas"))
+# "not as described", "no refund": a negated mention in a clause the lexicon finds no sentiment in is a complaint
+_NEGATIONS = frozenset(("no", "not", "never", "n't", "without"))
+NEGATED_MENTION_POLARITY = -0.5
+
+
+def no_aspects(count):
+    """Aspect matrix for count reviews that mention no aspect"""
+    return np.full((count, len(ASPECTS)), np.nan, dtype=np.float32)
+
+
+class AspectExtractor:
+    """Finds ASPECT_TERMS in tokenized reviews and scores each mention by its clause
+
+    Terms are matched on the lowercase tokens the sentiment lexicon already
+    produced for the review, so a review is tokenized once for both passes.
+    mentions() is a single regex search that lets reviews naming no aspect
+    skip the token pass entirely.
+    """
+
+    def __init__(self, terms=ASPECT_TERMS):
+        # first token -> [(term tokens, aspect code)], longest term first
+        self._terms = {}
+        for code, phrases in enumerate(terms.values()):
+            for phrase in phrases:
+                words = tuple(phrase.split())
+                self._terms.setdefault(words[0], []).append((words, code))
+        for candidates in self._terms.values():
+            candidates.sort(key=lambda candidate: -len(candidate[0]))
+        alternatives = sorted(
+            (r"\s+".join(map(re.escape, phrase.split())) for phrases in terms.values() for phrase in phrases),
+            key=len,
+            reverse=True,
+        )
+        self._pattern = re.compile(rf"\b(?:{'|'.join(alternatives)})\b", re.IGNORECASE)
+
+    def mentions(self, text):
+        """Whether text names any aspect"""
+        return self._pattern.search(text) is not None
+
+    def _clauses(self, tokens):
+        start = 0
+        for index, token in enumerate(tokens):
+            if token in _CONTRASTS:
+                if index > start:
+                    yield tokens[start:index]
+                start = index
+            elif token in _CLAUSE_ENDS:
+                yield tokens[start:index + 1]
+                start = index + 1
+        if start < len(tokens):
+            yield tokens[start:]
+
+    def extract(self, tokens, score_tokens):
+        """[(aspect code, polarity)] for one review's tokens; an aspect named in several clauses gets their mean
+
+        score_tokens is the sentiment lexicon's scorer, applied to each
+        clause that names an aspect.
+        """
+        totals = {}
+        for clause in self._clauses(tokens):
+            # aspect code -> whether the mention is negated
+            found = {}
+            index = 0
+            while index < len(clause):
+                step = 1
+                for words, code in self._terms.get(clause[index], ()):
+                    if tuple(clause[index:index + len(words)]) == words:
+                        found[code] = found.get(code, False) or (index > 0 and clause[index - 1] in _NEGATIONS)
+                        step = len(words)
+                        break
+                index += step
+            if found:
+                polarity = score_tokens(clause)
+                for code, negated in found.items():
+                    entry = totals.setdefault(code, [0.0, 0])
+                    entry[0] += NEGATED_MENTION_POLARITY if negated and polarity == 0.0 else polarity
+                    entry[1] += 1
+        return [(code, total / count) for code, (total, count) in totals.items()]
+
+
+_extractor = None
+
+
+def get_extractor():
+    """Return the aspect extractor, building it on first use"""
+    global _extractor
+    if _extractor is None:
+        _extractor = AspectExtractor()
+    return _extractor
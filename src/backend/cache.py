@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from starlette.concurrency import run_in_threadpool
+
+import config
+from scraper import normalize_product_url
+
+logger = logging.getLogger(__name__)
+
+# Request fields that change the scrape result; force_refresh and max_concurrency do not
+CACHE_KEY_FIELDS = ("max_reviews", "incremental")
+# Bumped when serialized results gain or change fields, so older cached payloads are not served
+RESULT_FORMAT = 3
+
+
+def cache_key(request):
+    """Content address of a scrape: normalized URL plus result-affecting parameters"""
+    params = {name: getattr(request, name) for name in CACHE_KEY_FIELDS}
+    material = json.dumps([normalize_product_url(request.product_url), params, RESULT_FORMAT], sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """SQLite tier holding serialized scrape results across restarts"""
+
+    def __init__(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, payload FROM results WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def set(self, key, expires_at, payload):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, expires_at, payload) VALUES (?, ?, ?)",
+                (key, expires_at, payload),
+            )
+            self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResultCache:
+    """Two-tier scrape result cache: byte-bounded in-memory LRU plus optional SQLite"""
+
+    def __init__(
+        self,
+        enabled=config.CACHE_ENABLED,
+        ttl=config.CACHE_TTL_SECONDS,
+        max_bytes=config.CACHE_MAX_BYTES,
+        disk_path=config.CACHE_DB_PATH if config.CACHE_DISK_ENABLED else None,
+    ):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        self._memory = OrderedDict()
+        self._disk = None
+        self.current_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def start(self):
+        """Open the disk tier if configured"""
+        if self.enabled and self.disk_path and self._disk is None:
+            self._disk = DiskCache(self.disk_path)
+            logger.info(f"Scrape cache disk tier at {self.disk_path}")
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def _remember(self, key, expires_at, payload):
+        if len(payload) > self.max_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self.current_bytes -= len(old[1])
+        self._memory[key] = (expires_at, payload)
+        self.current_bytes += len(payload)
+        while self.current_bytes > self.max_bytes:
+            _key, (_expires, evicted) = self._memory.popitem(last=False)
+            self.current_bytes -= len(evicted)
+            self.evictions += 1
+
+    async def get(self, key):
+        """Return the cached payload bytes, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, payload = entry
+            if expires_at > time.time():
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return payload
+            del self._memory[key]
+            self.current_bytes -= len(payload)
+
+        if self._disk is not None:
+            entry = await run_in_threadpool(self._disk.get, key)
+            if entry is not None:
+                self._remember(key, *entry)
+                self.disk_hits += 1
+                return entry[1]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key, payload, ttl=None):
+        """Store serialized payload bytes under key for ttl seconds"""
+        if not self.enabled:
+            return
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._remember(key, expires_at, payload)
+        if self._disk is not None:
+            await run_in_threadpool(self._disk.set, key, expires_at, payload)
+
+    def stats(self):
+        """Return hit/miss counters for /health"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._memory),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "disk": self._disk is not None,
+        }
+
+
+result_cache = ResultCache()
@@ -0,0 +1,131 @@
+import html
+import re
+import unicodedata
+
+# Punctuation kept as-is; every other non-word character becomes a space
+KEPT_PUNCTUATION = ".,!?'\"()-:;/%&"
+
+# Typographic punctuation left over after NFKC, spelled the way the lexicon expects
+TYPOGRAPHIC = {
+    "‘": "'", "’": "'", "‚": "'", "‛": "'", "′": "'", "´": "'", "`": "'",
+    "“": '"', "”": '"', "„": '"', "‟": '"', "″": '"', "«": '"', "»": '"',
+    "‐": "-", "‑": "-", "‒": "-", "–": "-", "—": "-", "―": "-", "−": "-",
+    "…": "...",
+}
+
+# Emoji that carry sentiment become emoticons from TextBlob's table, so they still score
+EMOJI_EMOTICONS = {
+    ":)": "☺\U0001f600\U0001f603\U0001f604\U0001f60a\U0001f642\U0001f60c\U0001f44d\U0001f44c\U0001f64f",
+    ":D": "\U0001f601\U0001f602\U0001f606\U0001f923\U0001f929\U0001f973",
+    ";)": "\U0001f609\U0001f61c",
+    "<3": "♥❤\U0001f60d\U0001f970\U0001f618\U0001f495\U0001f496\U0001f497\U0001f49e\U0001f499\U0001f49a\U0001f49b\U0001f49c\U0001f9e1",
+    ":/": "\U0001f615\U0001f612\U0001f644\U0001f61f\U0001f610",
+    ":(": "☹\U0001f61e\U0001f614\U0001f641\U0001f629\U0001f62b\U0001f44e\U0001f494",
+    ":'(": "\U0001f622\U0001f62d\U0001f625",
+    ">:[": "\U0001f620\U0001f621\U0001f92c\U0001f624",
+}
+
+# Emoji presentation selectors follow emoji, not letters
+_VARIATION_SELECTOR_RE = re.compile("[\ufe00-\ufe0f\U000e0100-\U000e01ef]")
+
+
+def _translation(codepoint):
+    """What one character becomes: itself, a space, or replacement text"""
+    char = chr(codepoint)
+    if char in TYPOGRAPHIC:
+        return TYPOGRAPHIC[char]
+    for emoticon, emoji in EMOJI_EMOTICONS.items():
+        if char in emoji:
+            return f" {emoticon} "
+    # Letters, digits and underscore (the regex \w), plus the vowel signs and
+    # other combining marks that Indic and Arabic words are spelled with
+    if char.isalnum() or char == "_" or char in KEPT_PUNCTUATION:
+        return codepoint
+    if unicodedata.category(char) in ("Mn", "Mc") and not _VARIATION_SELECTOR_RE.match(char):
+        return codepoint
+    return " "
+
+
+class _TranslationTable(dict):
+    """str.translate table for non-ASCII characters, filled in the first time each one is seen"""
+
+    def __missing__(self, codepoint):
+        value = self[codepoint] = _translation(codepoint)
+        return value
+
+
+def _ascii_table():
+    """bytes.translate table: ASCII filtered like _translation, UTF-8 lead and continuation bytes untouched"""
+    table = bytearray(range(256))
+    for codepoint in range(128):
+        value = _translation(codepoint)
+        if isinstance(value, str):
+            table[codepoint] = ord(value)
+    return bytes(table)
+
+
+_TABLE = _TranslationTable()
+_ASCII_TABLE = _ascii_table()
+# Non-ASCII letters and digits are kept, so only runs of other non-ASCII characters need a lookup
+# (combining marks are among them, but most map to themselves)
+_NON_ASCII_RUN_RE = re.compile(r"[^\x00-\x7f\w]+")
+# The same few runs (an emoji, a curly quote, a non-Latin comma) repeat across reviews
+_run_cache = {}
+
+
+def _translate_run(match):
+    run = match.group()
+    replacement = _run_cache.get(run)
+    if replacement is None:
+        if len(_run_cache) >= 10000:
+            _run_cache.clear()
+        replacement = _run_cache[run] = run.translate(_TABLE)
+    return replacement
+
+
+def _filter(text):
+    """Map every character through _translation in one pass over the text
+
+    ASCII goes through a 256-byte table on the UTF-8 encoding (multi-byte
+    sequences never contain ASCII bytes, so they pass through intact); only
+    runs of non-ASCII symbols, punctuation and emoji are looked up in the
+    per-character table.
+    """
+    if text.isascii():
+        return text.encode("ascii").translate(_ASCII_TABLE).decode("ascii")
+    text = text.encode("utf-8", "surrogatepass").translate(_ASCII_TABLE).decode("utf-8", "surrogatepass")
+    return _NON_ASCII_RUN_RE.sub(_translate_run, text)
+
+
+def _decode(text):
+    """Unescape HTML entities and NFKC-normalize; both are skipped for text that cannot need them"""
+    if "&" in text:
+        text = html.unescape(text)
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text)
+    return text
+
+
+def clean_text(text):
+    """Normalize review text and reduce it to words, basic punctuation and single spaces
+
+    HTML entities are decoded, text is NFKC-normalized, typographic quotes
+    and dashes become ASCII, sentiment-bearing emoji become emoticons, and
+    anything else outside \\w, combining marks and KEPT_PUNCTUATION becomes
+    a space.
+    """
+    if not text:
+        return ""
+    return " ".join(_filter(_decode(str(text))).split())
+
+
+def clean_texts(texts):
+    """clean_text over a list; repeated texts ("Good product", "Nice") are cleaned once"""
+    cleaned = {}
+    results = []
+    for text in texts:
+        result = cleaned.get(text)
+        if result is None:
+            result = cleaned[text] = clean_text(text)
+        results.append(result)
+    return results
@@ -0,0 +1,142 @@
+import os
+from pathlib import Path
+
+try:
+    from dotenv import load_dotenv
+except ImportError:  # python-dotenv is optional
+    load_dotenv = None
+
+BASE_DIR = Path(__file__).resolve().parent
+
+if load_dotenv is not None:
+    load_dotenv(BASE_DIR / ".env")
+
+
+def env_int(name, default):
+    """Read an integer setting from the environment"""
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_float(name, default):
+    """Read a float setting from the environment"""
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_bool(name, default):
+    """Read a boolean setting from the environment"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+DATA_DIR = Path(os.getenv("DATA_DIR", str(BASE_DIR / "data")))
+
+SERVICE_NAME = "Product Review Sentiment Scraper"
+API_VERSION = "1.0.0"
+
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000").split(",")
+    if origin.strip()
+]
+
+# Fetch engine
+FETCH_MAX_CONNECTIONS = env_int("FETCH_MAX_CONNECTIONS", 100)
+FETCH_MAX_KEEPALIVE = env_int("FETCH_MAX_KEEPALIVE", 20)
+FETCH_PER_HOST_LIMIT = env_int("FETCH_PER_HOST_LIMIT", 8)
+# Adaptive (AIMD) per-host concurrency starts at a site's limit and may grow up to its maximum
+FETCH_ADAPTIVE = env_bool("FETCH_ADAPTIVE", True)
+FETCH_PER_HOST_MAX = env_int("FETCH_PER_HOST_MAX", 32)
+FETCH_AIMD_DECREASE = env_float("FETCH_AIMD_DECREASE", 0.5)
+FETCH_LATENCY_TOLERANCE = env_float("FETCH_LATENCY_TOLERANCE", 2.0)
+FETCH_MAX_RETRIES = env_int("FETCH_MAX_RETRIES", 3)
+FETCH_BACKOFF_BASE = env_float("FETCH_BACKOFF_BASE", 0.5)
+FETCH_BACKOFF_MAX = env_float("FETCH_BACKOFF_MAX", 30.0)
+FETCH_RETRY_AFTER_MAX = env_float("FETCH_RETRY_AFTER_MAX", 120.0)
+FETCH_TIMEOUT = env_float("FETCH_TIMEOUT", 15.0)
+FETCH_HTTP2 = env_bool("FETCH_HTTP2", True)
+FETCH_USER_AGENT = os.getenv(
+    "FETCH_USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+)
+
+# Extra or replacement site adapters (JSON list, see sites.py); built-ins cover Daraz and Lazada
+SITE_ADAPTERS_PATH = os.getenv("SITE_ADAPTERS_PATH", str(BASE_DIR / "sites.json"))
+
+# Conditional page cache (ETag / Last-Modified)
+PAGE_CACHE_ENABLED = env_bool("PAGE_CACHE_ENABLED", True)
+PAGE_CACHE_MAX_BYTES = env_int("PAGE_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+PAGE_CACHE_DB_PATH = os.getenv("PAGE_CACHE_DB_PATH", str(DATA_DIR / "pages.sqlite3"))
+
+# Scraping
+SAMPLE_REVIEW_COUNT = env_int("SAMPLE_REVIEW_COUNT", 50)
+SCRAPE_PAGE_PARAM = os.getenv("SCRAPE_PAGE_PARAM", "page")
+# HTML parser backend: auto (lxml, then selectolax, then bs4), lxml, selectolax or bs4
+SCRAPE_PARSER = os.getenv("SCRAPE_PARSER", "auto")
+SCRAPE_PAGE_CONCURRENCY = env_int("SCRAPE_PAGE_CONCURRENCY", 8)
+SCRAPE_MAX_PAGES = env_int("SCRAPE_MAX_PAGES", 500)
+SCRAPE_MAX_REVIEWS = env_int("SCRAPE_MAX_REVIEWS", 10000)
+SCRAPE_BATCH_MAX_PRODUCTS = env_int("SCRAPE_BATCH_MAX_PRODUCTS", 500)
+SCRAPE_BATCH_CONCURRENCY = env_int("SCRAPE_BATCH_CONCURRENCY", 16)
+SCRAPE_BATCH_PER_HOST = env_int("SCRAPE_BATCH_PER_HOST", 4)
+INCREMENTAL_WATERMARK_KEYS = env_int("INCREMENTAL_WATERMARK_KEYS", 20)
+INCREMENTAL_DB_PATH = os.getenv("INCREMENTAL_DB_PATH", str(DATA_DIR / "history.sqlite3"))
+
+# Sentiment scoring
+SCORING_POOL_SIZE = env_int("SCORING_POOL_SIZE", min(4, os.cpu_count() or 1))
+SCORING_CHUNK_SIZE = env_int("SCORING_CHUNK_SIZE", 500)
+SCORING_INLINE_THRESHOLD = env_int("SCORING_INLINE_THRESHOLD", 200)
+SCORING_MAX_CHUNKS_PER_REQUEST = env_int("SCORING_MAX_CHUNKS_PER_REQUEST", max(1, SCORING_POOL_SIZE // 2))
+SENTIMENT_MEMO_SIZE = env_int("SENTIMENT_MEMO_SIZE", 100000)
+SENTIMENT_MEMO_PERSIST = env_bool("SENTIMENT_MEMO_PERSIST", False)
+SENTIMENT_MEMO_PATH = os.getenv("SENTIMENT_MEMO_PATH", str(DATA_DIR / "sentiment_memo.sqlite3"))
+
+# Scrape result cache
+CACHE_ENABLED = env_bool("CACHE_ENABLED", True)
+CACHE_TTL_SECONDS = env_int("CACHE_TTL_SECONDS", 3600)
+CACHE_MAX_BYTES = env_int("CACHE_MAX_BYTES", 64 * 1024 * 1024)
+CACHE_DISK_ENABLED = env_bool("CACHE_DISK_ENABLED", False)
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", str(DATA_DIR / "scrape_cache.sqlite3"))
+
+# API responses: JSON bodies of at least the minimum size are brotli/gzip-compressed when the client accepts it
+RESPONSE_COMPRESSION = env_bool("RESPONSE_COMPRESSION", True)
+RESPONSE_COMPRESS_MIN_BYTES = env_int("RESPONSE_COMPRESS_MIN_BYTES", 1024)
+RESPONSE_GZIP_LEVEL = env_int("RESPONSE_GZIP_LEVEL", 5)
+RESPONSE_BROTLI_QUALITY = env_int("RESPONSE_BROTLI_QUALITY", 4)
+
+# Review store: every scraped product and review, for history, trend and export queries
+REVIEW_STORE_ENABLED = env_bool("REVIEW_STORE_ENABLED", True)
+REVIEW_STORE_DB_PATH = os.getenv("REVIEW_STORE_DB_PATH", str(DATA_DIR / "reviews.sqlite3"))
+# Largest page /products/{product_id}/reviews returns
+REVIEW_PAGE_MAX_LIMIT = env_int("REVIEW_PAGE_MAX_LIMIT", 500)
+# Rows per CSV chunk, Arrow record batch and Parquet row group in /export
+EXPORT_CHUNK_ROWS = env_int("EXPORT_CHUNK_ROWS", 65536)
+EXPORT_PARQUET_COMPRESSION = os.getenv("EXPORT_PARQUET_COMPRESSION", "zstd")
+
+# Background jobs
+JOBS_WORKERS = env_int("JOBS_WORKERS", 2)
+JOBS_MAX_QUEUED = env_int("JOBS_MAX_QUEUED", 1000)
+JOBS_RETENTION_SECONDS = env_int("JOBS_RETENTION_SECONDS", 24 * 3600)
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", str(DATA_DIR / "jobs.sqlite3"))
+
+# Google Sheets
+GOOGLE_CREDENTIALS_FILE = os.getenv("GOOGLE_CREDENTIALS_FILE", str(BASE_DIR / "credentials.json"))
+GOOGLE_SHEET_SHARE_EMAIL = os.getenv("GOOGLE_SHEET_SHARE_EMAIL", "")
+# Base URL of a local fake Sheets/Drive server (see scripts/fake_sheets_server.py); skips authorization
+GOOGLE_SHEETS_EMULATOR_URL = os.getenv("GOOGLE_SHEETS_EMULATOR_URL", "")
+SHEETS_TIMEOUT = env_float("SHEETS_TIMEOUT", 30.0)
+SHEETS_FLUSH_ROWS = env_int("SHEETS_FLUSH_ROWS", 5000)
+SHEETS_FLUSH_INTERVAL = env_float("SHEETS_FLUSH_INTERVAL", 2.0)
+SHEETS_WRITES_PER_MINUTE = env_int("SHEETS_WRITES_PER_MINUTE", 55)
+SHEETS_MAX_RETRIES = env_int("SHEETS_MAX_RETRIES", 6)
+SHEETS_BACKOFF_BASE = env_float("SHEETS_BACKOFF_BASE", 1.0)
+SHEETS_BACKOFF_MAX = env_float("SHEETS_BACKOFF_MAX", 64.0)
+SHEETS_REGISTRY_PATH = os.getenv("SHEETS_REGISTRY_PATH", str(DATA_DIR / "sheets.sqlite3"))
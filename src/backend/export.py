@@ -0,0 +1,146 @@
+import csv
+import io
+
+import config
+from review_batch import FIELDS, timestamp_from_int
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:  # Arrow and Parquet exports need pyarrow; CSV falls back to the csv module
+    PYARROW_AVAILABLE = False
+
+# Format name -> (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that collects what pyarrow writes until take() hands it out"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def arrow_schema():
+    return pa.schema(
+        [
+            ("product_name", pa.string()),
+            ("review_text", pa.string()),
+            ("rating", pa.float64()),
+            ("sentiment_score", pa.float64()),
+            ("sentiment_label", pa.string()),
+            ("timestamp", pa.timestamp("us")),
+        ]
+    )
+
+
+def _record_batch(columns, schema):
+    return pa.record_batch(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+    )
+
+
+def _format_timestamps(timestamps, stamps):
+    """isoformat() strings for stored timestamps; reviews of one scrape share a value, so stamps memoizes them"""
+    formatted = []
+    for value in timestamps:
+        stamp = stamps.get(value)
+        if stamp is None:
+            stamp = stamps[value] = timestamp_from_int(value)
+        formatted.append(stamp)
+    return formatted
+
+
+def csv_chunks(chunks):
+    """CSV with a header row, one encoded block per chunk
+
+    pyarrow's CSV writer is an order of magnitude faster than the csv
+    module; the two quote strings and print whole-number floats slightly
+    differently, which CSV readers treat the same.
+    """
+    if PYARROW_AVAILABLE:
+        return _arrow_csv_chunks(chunks)
+    return _python_csv_chunks(chunks)
+
+
+def _python_csv_chunks(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(FIELDS)
+    yield buffer.getvalue().encode("utf-8")
+    stamps = {}
+    for names, texts, ratings, scores, labels, timestamps in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(zip(names, texts, ratings, scores, labels, _format_timestamps(timestamps, stamps)))
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _arrow_csv_chunks(chunks):
+    # Timestamps are written as the same isoformat() text the JSON API returns
+    schema = arrow_schema().set(FIELDS.index("timestamp"), pa.field("timestamp", pa.string()))
+    sink = _ChunkSink()
+    stamps = {}
+    with pa_csv.CSVWriter(sink, schema) as writer:
+        yield sink.take()
+        for *columns, timestamps in chunks:
+            writer.write_batch(_record_batch([*columns, _format_timestamps(timestamps, stamps)], schema))
+            yield sink.take()
+    yield sink.take()
+
+
+def arrow_chunks(chunks):
+    """Arrow IPC stream: the schema, then one record batch per chunk"""
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for columns in chunks:
+            writer.write_batch(_record_batch(columns, schema))
+            yield sink.take()
+    yield sink.take()
+
+
+def parquet_chunks(chunks, compression=config.EXPORT_PARQUET_COMPRESSION):
+    """Parquet file written one row group per chunk; the footer goes out last"""
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression=compression) as writer:
+        for columns in chunks:
+            batch = _record_batch(columns, schema)
+            writer.write_batch(batch, row_group_size=batch.num_rows)
+            yield sink.take()
+    yield sink.take()
+
+
+def export_stream(export_format, chunks):
+    """Encoded export bytes for column chunks from ReviewStore.export_chunks(), never holding more than one chunk"""
+    if export_format == "csv":
+        return csv_chunks(chunks)
+    if export_format == "arrow":
+        return arrow_chunks(chunks)
+    return parquet_chunks(chunks)
@@ -0,0 +1,427 @@
+import hashlib
+import json
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from bs4 import BeautifulSoup
+
+import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    import lxml.html
+    from cssselect import HTMLTranslator
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+REVIEW_ID_ATTRIBUTES = ("data-review-id", "data-id", "id")
+NEXT_DATA_SELECTOR = "script#__NEXT_DATA__"
+JSON_LD_SELECTOR = "script[type='application/ld+json']"
+# Field names used for reviews in embedded JSON payloads, most specific first
+JSON_TEXT_KEYS = ("reviewBody", "review_text", "reviewText", "content", "text", "comment", "body")
+JSON_RATING_KEYS = ("ratingValue", "rating", "score", "stars")
+JSON_ID_KEYS = ("@id", "identifier", "reviewId", "review_id", "id")
+JSON_PAGE_COUNT_KEYS = ("totalPages", "total_pages", "pageCount", "page_count")
+# Bump whenever extraction rules change, so pages kept by the page cache are parsed again
+EXTRACTOR_VERSION = 1
+
+
+@dataclass
+class RawReview:
+    review_text: str
+    rating: float
+    review_id: Optional[str] = None
+
+
+@dataclass
+class ParsedPage:
+    product_name: Optional[str]
+    page_count: int
+    reviews: List[RawReview] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class SelectorProfile:
+    """CSS selectors for one review page layout"""
+
+    name: str
+    review_item: str = ".review-item, .mod-reviews .item, [itemprop='review']"
+    review_text: str = ".review-content, .content, [itemprop='reviewBody']"
+    rating_value: str = "[data-rating], [itemprop='ratingValue']"
+    full_star: str = ".star-full, .star-icon-full"
+    pagination: str = "[data-total-pages]"
+    page_link: str = "a[href*='page=']"
+    product_name: str = "meta[property='og:title']"
+    # Look for __NEXT_DATA__ / JSON-LD review payloads before walking the DOM
+    embedded_json: bool = True
+
+
+DEFAULT_PROFILE = SelectorProfile(name="default")
+
+
+def parse_rating(value):
+    """A rating clamped to 0..5, or None if value is not a number"""
+    try:
+        return max(0.0, min(5.0, float(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+def review_key(review):
+    """Stable identity of a RawReview: the site's review id, else a hash of its content
+
+    Incremental watermarks and review store de-duplication both use it, so a
+    review the scrape loop treats as already seen is also one the store skips.
+    """
+    if review.review_id:
+        return review.review_id
+    return hashlib.blake2b(f"{review.rating}\0{review.review_text}".encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _walk_json(data):
+    """Yield every dict and list in a JSON document, depth first in document order"""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            yield node
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            yield node
+            stack.extend(reversed(node))
+
+
+def _json_rating(entry):
+    source = entry.get("reviewRating") if isinstance(entry.get("reviewRating"), dict) else entry
+    for key in JSON_RATING_KEYS:
+        value = source.get(key)
+        if isinstance(value, dict):
+            value = value.get("ratingValue")
+        rating = parse_rating(value)
+        if rating is not None:
+            return rating
+    return None
+
+
+def _json_review(entry, require_rating=False):
+    """RawReview from one embedded review object, or None if it does not look like one"""
+    if not isinstance(entry, dict):
+        return None
+    text = next((entry[key] for key in JSON_TEXT_KEYS if isinstance(entry.get(key), str) and entry[key].strip()), None)
+    rating = _json_rating(entry)
+    if text is None or (require_rating and rating is None):
+        return None
+    review_id = next(
+        (str(entry[key]) for key in JSON_ID_KEYS if isinstance(entry.get(key), (str, int)) and entry[key] != ""), None
+    )
+    return RawReview(review_text=text.strip(), rating=rating or 0.0, review_id=review_id)
+
+
+def reviews_from_json_ld(documents):
+    """Reviews attached to the first schema.org item in JSON-LD blocks that has any; (name, reviews)"""
+    for node in _walk_json(documents):
+        if not isinstance(node, dict):
+            continue
+        entries = node.get("review") or node.get("reviews")
+        if isinstance(entries, dict):
+            entries = [entries]
+        if isinstance(entries, list):
+            reviews = [review for review in map(_json_review, entries) if review is not None]
+            if reviews:
+                name = node.get("name")
+                return (name.strip() if isinstance(name, str) else None), reviews
+    return None, []
+
+
+def reviews_from_next_data(data):
+    """The first list of review-like objects anywhere in a __NEXT_DATA__ payload; (page count, reviews)
+
+    Next.js page props have no fixed schema, so a list counts as reviews when
+    every entry has both a text field and a rating.
+    """
+    reviews = []
+    for node in _walk_json(data):
+        if isinstance(node, list) and node and isinstance(node[0], dict):
+            candidates = [_json_review(entry, require_rating=True) for entry in node]
+            if all(candidates):
+                reviews = candidates
+                break
+    if not reviews:
+        return None, []
+    page_count = next(
+        (
+            node[key]
+            for node in _walk_json(data)
+            if isinstance(node, dict)
+            for key in JSON_PAGE_COUNT_KEYS
+            if isinstance(node.get(key), int) and node[key] > 0
+        ),
+        None,
+    )
+    return page_count, reviews
+
+
+def _load_json(text):
+    try:
+        return json.loads(text)
+    except (TypeError, ValueError):
+        return None
+
+
+class Extractor(ABC):
+    """Pulls the product name, page count and reviews out of a page with one parser backend
+
+    Embedded JSON payloads (__NEXT_DATA__, then JSON-LD) are used when they
+    carry reviews, which skips walking the review DOM. Subclasses provide
+    parsing and selector matching; the extraction rules live here so every
+    backend returns the same result for the same page.
+    """
+
+    name = "base"
+
+    def __init__(self, profile=DEFAULT_PROFILE):
+        self.profile = profile
+
+    @abstractmethod
+    def parse(self, html):
+        """Document root for html"""
+
+    @abstractmethod
+    def select(self, node, selector):
+        """Every descendant of node matching the CSS selector"""
+
+    @abstractmethod
+    def select_one(self, node, selector):
+        """First descendant of node matching the CSS selector, or None"""
+
+    @abstractmethod
+    def attr(self, node, name):
+        """Attribute value, or None when node does not have it"""
+
+    @abstractmethod
+    def text(self, node, separator=" "):
+        """Stripped text of every string under node, joined with separator"""
+
+    @abstractmethod
+    def raw_text(self, node):
+        """Unprocessed text content, for script bodies"""
+
+    def extract(self, html):
+        if not html or not html.strip():
+            return ParsedPage("", 1, [])
+        root = self.parse(html)
+        product_name = self.product_name(root)
+        page_count = self.page_count(root)
+
+        reviews = []
+        # Cheap substring checks keep pages without payloads from paying for the script lookups
+        if self.profile.embedded_json and "__NEXT_DATA__" in html:
+            node = self.select_one(root, NEXT_DATA_SELECTOR)
+            if node is not None:
+                json_page_count, reviews = reviews_from_next_data(_load_json(self.raw_text(node)))
+                page_count = json_page_count or page_count
+        if not reviews and self.profile.embedded_json and "application/ld+json" in html:
+            documents = [_load_json(self.raw_text(node)) for node in self.select(root, JSON_LD_SELECTOR)]
+            json_name, reviews = reviews_from_json_ld(documents)
+            product_name = product_name or json_name or ""
+        if not reviews:
+            reviews = self.dom_reviews(root)
+        return ParsedPage(product_name, page_count, reviews)
+
+    def product_name(self, root):
+        meta = self.select_one(root, self.profile.product_name)
+        if meta is not None and (self.attr(meta, "content") or "").strip():
+            return self.attr(meta, "content").strip()
+        for selector in ("h1", "title"):
+            node = self.select_one(root, selector)
+            if node is not None and self.text(node, ""):
+                return self.text(node, "")
+        return ""
+
+    def page_count(self, root):
+        node = self.select_one(root, self.profile.pagination)
+        if node is not None:
+            try:
+                return max(1, int(self.attr(node, "data-total-pages")))
+            except (TypeError, ValueError):
+                pass
+
+        pages = 1
+        for link in self.select(root, self.profile.page_link):
+            query = parse_qs(urlsplit(self.attr(link, "href") or "").query)
+            for value in query.get(config.SCRAPE_PAGE_PARAM, []):
+                if value.isdigit():
+                    pages = max(pages, int(value))
+        return pages
+
+    def rating(self, item):
+        node = self.select_one(item, self.profile.rating_value)
+        if node is not None:
+            rating = parse_rating(self.attr(node, "data-rating") or self.attr(node, "content") or self.text(node, ""))
+            if rating is not None:
+                return rating
+        stars = self.select(item, self.profile.full_star)
+        return float(len(stars)) if stars else 0.0
+
+    def dom_reviews(self, root):
+        reviews = []
+        for item in self.select(root, self.profile.review_item):
+            text_node = self.select_one(item, self.profile.review_text)
+            text = self.text(text_node if text_node is not None else item)
+            if not text:
+                continue
+            review_id = next((self.attr(item, name) for name in REVIEW_ID_ATTRIBUTES if self.attr(item, name)), None)
+            reviews.append(RawReview(review_text=text, rating=self.rating(item), review_id=review_id))
+        return reviews
+
+
+class SoupExtractor(Extractor):
+    """BeautifulSoup with the pure-Python html.parser; always available"""
+
+    name = "bs4"
+
+    def parse(self, html):
+        return BeautifulSoup(html, "html.parser")
+
+    def select(self, node, selector):
+        return node.select(selector)
+
+    def select_one(self, node, selector):
+        return node.select_one(selector)
+
+    def attr(self, node, name):
+        return node.get(name)
+
+    def text(self, node, separator=" "):
+        return node.get_text(separator, strip=True)
+
+    def raw_text(self, node):
+        return node.string or ""
+
+
+class LxmlExtractor(Extractor):
+    """libxml2 through lxml, with the profile's CSS selectors compiled to XPath once"""
+
+    name = "lxml"
+
+    def __init__(self, profile=DEFAULT_PROFILE):
+        super().__init__(profile)
+        self._translator = HTMLTranslator()
+        # Like BeautifulSoup's get_text, leave out script and style bodies
+        self._text_nodes = etree.XPath(".//text()[not(parent::script or parent::style)]")
+        self._compiled = {}
+        for selector in (
+            profile.review_item,
+            profile.review_text,
+            profile.rating_value,
+            profile.full_star,
+            profile.pagination,
+            profile.page_link,
+            profile.product_name,
+            NEXT_DATA_SELECTOR,
+            JSON_LD_SELECTOR,
+            "h1",
+            "title",
+        ):
+            self._compile(selector)
+
+    def _compile(self, selector):
+        xpath = self._compiled.get(selector)
+        if xpath is None:
+            # descendant:: rather than cssselect's default descendant-or-self:: matches BeautifulSoup's select
+            xpath = etree.XPath(self._translator.css_to_xpath(selector, prefix="descendant::"))
+            self._compiled[selector] = xpath
+        return xpath
+
+    def parse(self, html):
+        try:
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration
+            return lxml.html.document_fromstring(html.encode("utf-8"))
+
+    def select(self, node, selector):
+        return self._compile(selector)(node)
+
+    def select_one(self, node, selector):
+        matches = self._compile(selector)(node)
+        return matches[0] if matches else None
+
+    def attr(self, node, name):
+        return node.get(name)
+
+    def text(self, node, separator=" "):
+        strings = (string.strip() for string in self._text_nodes(node))
+        return separator.join(string for string in strings if string)
+
+    def raw_text(self, node):
+        return node.text or ""
+
+
+class SelectolaxExtractor(Extractor):
+    """The lexbor HTML5 parser through selectolax
+
+    The fastest backend on the fixture pages, but selectolax has no way to
+    compile a selector once, so every lookup parses its CSS again.
+    """
+
+    name = "selectolax"
+
+    def parse(self, html):
+        return LexborHTMLParser(html)
+
+    def select(self, node, selector):
+        return node.css(selector)
+
+    def select_one(self, node, selector):
+        return node.css_first(selector)
+
+    def attr(self, node, name):
+        return node.attributes.get(name)
+
+    def text(self, node, separator=" "):
+        return node.text(deep=True, separator=separator, strip=True)
+
+    def raw_text(self, node):
+        return node.text(deep=True) or ""
+
+
+# Preferred first: "auto" takes lxml for its precompiled selectors and small heap
+EXTRACTORS = {
+    "lxml": (LxmlExtractor, LXML_AVAILABLE),
+    "selectolax": (SelectolaxExtractor, SELECTOLAX_AVAILABLE),
+    "bs4": (SoupExtractor, True),
+}
+_extractors = {}
+
+
+def available_backends():
+    """Installed parser backends, preferred first"""
+    return [name for name, (_cls, available) in EXTRACTORS.items() if available]
+
+
+def get_extractor(backend=None, profile=DEFAULT_PROFILE):
+    """Shared Extractor for a backend name ("auto" picks the preferred installed one) and selector profile"""
+    backend = backend or config.SCRAPE_PARSER
+    if backend == "auto":
+        backend = available_backends()[0]
+    elif backend not in available_backends():
+        logger.warning(f"HTML parser backend {backend!r} is not available, using bs4")
+        backend = "bs4"
+    extractor = _extractors.get((backend, profile))
+    if extractor is None:
+        extractor = EXTRACTORS[backend][0](profile)
+        _extractors[(backend, profile)] = extractor
+    return extractor
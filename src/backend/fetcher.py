@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+import config
+from ratelimit import HostThrottle, parse_retry_after
+from sites import site_registry
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+
+# Answers worth retrying: throttling and server-side overload
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+RETRYABLE_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+
+
+class FetchError(Exception):
+    """Raised when a page cannot be downloaded"""
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status_code: int
+    text: str
+    http_version: str
+    elapsed: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self):
+        return self.status_code == 304
+
+
+class FetchEngine:
+    """Shared keep-alive HTTP client; each host gets its own rate limiter and adaptive concurrency limit"""
+
+    def __init__(
+        self,
+        max_connections=config.FETCH_MAX_CONNECTIONS,
+        max_keepalive=config.FETCH_MAX_KEEPALIVE,
+        timeout=config.FETCH_TIMEOUT,
+        http2=config.FETCH_HTTP2,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.timeout = timeout
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._client = None
+        self._throttles = {}
+        self._latencies = deque(maxlen=1000)
+        self.pages_fetched = 0
+        self.not_modified = 0
+        self.bytes_fetched = 0
+        self.errors = 0
+        self.retries = 0
+
+    async def start(self):
+        """Open the shared client (called once per worker at startup)"""
+        if self._client is not None:
+            return
+        encodings = "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate"
+        self._client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+            ),
+            timeout=httpx.Timeout(self.timeout),
+            follow_redirects=True,
+            headers={
+                "User-Agent": config.FETCH_USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
+                "Accept-Encoding": encodings,
+                "Accept-Language": "en-US,en;q=0.9",
+            },
+        )
+        logger.info(f"Fetch engine started (http2={self.http2}, brotli={BROTLI_AVAILABLE})")
+
+    async def close(self):
+        """Close the shared client and release pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _throttle_for(self, url):
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        throttle = self._throttles.get(host)
+        if throttle is None:
+            throttle = HostThrottle(site_registry.for_host(parts.hostname))
+            self._throttles[host] = throttle
+        return throttle
+
+    async def fetch(self, url, params=None, headers=None):
+        """Download a page under its host's rate and adaptive concurrency limits
+
+        429s, 5xx answers, timeouts and dropped connections are retried up to
+        FETCH_MAX_RETRIES times; the host pauses for any Retry-After and every
+        retry backs off exponentially. Pass If-None-Match / If-Modified-Since
+        in headers for a conditional request; a 304 comes back as a
+        FetchResult with not_modified set and no text.
+        """
+        if self._client is None:
+            await self.start()
+
+        throttle = self._throttle_for(url)
+        attempt = 0
+        while True:
+            response = error = None
+            await throttle.acquire()
+            try:
+                started = time.perf_counter()
+                try:
+                    response = await self._client.get(
+                        url, params=params, headers=headers, timeout=throttle.adapter.timeout
+                    )
+                except httpx.HTTPError as e:
+                    error = e
+                elapsed = time.perf_counter() - started
+                retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+                throttle.record(response.status_code if response is not None else None, elapsed, retry_after)
+            finally:
+                throttle.release()
+
+            self._latencies.append(elapsed)
+            if response is not None and response.status_code < 400:
+                break
+            self.errors += 1
+            if error is not None:
+                message = f"Request to {url} failed: {error}"
+                retryable = isinstance(error, RETRYABLE_ERRORS)
+            else:
+                message = f"Request to {url} returned HTTP {response.status_code}"
+                retryable = response.status_code in RETRYABLE_STATUSES
+            if not retryable or attempt >= config.FETCH_MAX_RETRIES:
+                raise FetchError(message) from error
+            self.retries += 1
+            backoff = min(config.FETCH_BACKOFF_MAX, config.FETCH_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+            logger.info(f"{message}, retrying in {backoff:.2f}s")
+            await asyncio.sleep(backoff)
+            attempt += 1
+
+        if response.status_code == 304:
+            self.not_modified += 1
+        else:
+            self.pages_fetched += 1
+        self.bytes_fetched += len(response.content)
+        return FetchResult(
+            url=str(response.url),
+            status_code=response.status_code,
+            text=response.text,
+            http_version=response.http_version,
+            elapsed=elapsed,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+    def stats(self):
+        """Return counters and latency percentiles for /health"""
+        latencies = sorted(self._latencies)
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            index = min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))
+            return round(latencies[index] * 1000, 2)
+
+        return {
+            "http2": self.http2,
+            "brotli": BROTLI_AVAILABLE,
+            "pages_fetched": self.pages_fetched,
+            "not_modified": self.not_modified,
+            "bytes_fetched": self.bytes_fetched,
+            "errors": self.errors,
+            "retries": self.retries,
+            "hosts": len(self._throttles),
+            "latency_p50_ms": percentile(0.50),
+            "latency_p99_ms": percentile(0.99),
+            # Busiest hosts first, so /health stays small when many hosts have been seen
+            "host_limits": {
+                host: throttle.stats()
+                for host, throttle in sorted(self._throttles.items(), key=lambda item: -item[1].requests)[:20]
+            },
+        }
+
+
+fetch_engine = FetchEngine()
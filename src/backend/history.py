@@ -0,0 +1,81 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+import config
+from review_batch import ReviewBatch
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProductHistory:
+    product_name: str
+    first_page_hash: Optional[str]
+    newest_keys: List[str] = field(default_factory=list)
+    reviews: ReviewBatch = field(default_factory=ReviewBatch.empty)
+
+
+class HistoryStore:
+    """SQLite store of each product's watermark and merged review set for incremental scrapes"""
+
+    def __init__(self, path=config.INCREMENTAL_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def start(self):
+        if self._conn is not None:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS products ("
+            " product_key TEXT PRIMARY KEY, product_name TEXT NOT NULL, first_page_hash TEXT,"
+            " newest_keys TEXT NOT NULL, reviews BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+
+    def get(self, product_key):
+        """Return the stored ProductHistory, or None for a product never scraped incrementally"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT product_name, first_page_hash, newest_keys, reviews FROM products WHERE product_key = ?",
+                (product_key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return ProductHistory(row[0], row[1], json.loads(row[2]), ReviewBatch.from_bytes(row[3]))
+
+    def save(self, product_key, history):
+        reviews = history.reviews.to_bytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO products"
+                " (product_key, product_name, first_page_hash, newest_keys, reviews, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    product_key,
+                    history.product_name,
+                    history.first_page_hash,
+                    json.dumps(history.newest_keys),
+                    reviews,
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+
+history_store = HistoryStore()
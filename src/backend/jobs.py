@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from starlette.concurrency import run_in_threadpool
+
+import config
+from cache import cache_key, result_cache
+from models import ScrapeRequest
+from pipeline import coalesced_scrape_frames, response_from_frames
+from responses import dumps, loads
+from summary import summarize_rows
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobStore:
+    """SQLite table of scrape jobs so queued work survives restarts"""
+
+    def __init__(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL,"
+            " pages_fetched INTEGER NOT NULL DEFAULT 0, reviews_scored INTEGER NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL, error TEXT, result BLOB)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._conn.commit()
+
+    def insert(self, job_id, request_json):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, request, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, request_json, now, now),
+            )
+            self._conn.commit()
+
+    def update(self, job_id, status, pages_fetched=0, reviews_scored=0, error=None, result=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, pages_fetched = ?, reviews_scored = ?, error = ?, result = ?,"
+                " updated_at = ? WHERE id = ?",
+                (status, pages_fetched, reviews_scored, error, result, time.time(), job_id),
+            )
+            self._conn.commit()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    def recover(self, finished_before):
+        """Drop old finished jobs and return the ids of unfinished ones, oldest first
+
+        Jobs left "running" were interrupted by a shutdown and are queued again.
+        """
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (finished_before,)
+            )
+            self._conn.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+            self._conn.commit()
+            rows = self._conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at").fetchall()
+        return [row["id"] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ActiveJob:
+    """Progress of a running job, kept in memory between page updates"""
+
+    def __init__(self):
+        self.pages_fetched = 0
+        self.reviews = []
+        self._summary = None
+        self._summarized = -1
+        self._summary_lock = asyncio.Lock()
+
+    async def summary(self):
+        """Summary of the reviews scored so far
+
+        Recomputed off the event loop only when reviews were appended since
+        the last poll; concurrent polls share one computation.
+        """
+        async with self._summary_lock:
+            count = len(self.reviews)
+            if count != self._summarized:
+                self._summary = await run_in_threadpool(summarize_rows, self.reviews[:count])
+                self._summarized = count
+            return self._summary
+
+
+def _timestamp(epoch):
+    return datetime.fromtimestamp(epoch).isoformat()
+
+
+def _without_reviews(result):
+    """A stored ScrapeResponse with its review list emptied"""
+    response = loads(result)
+    response["data"] = []
+    return dumps(response)
+
+
+class JobQueue:
+    """Bounded pool of in-process workers draining a persistent scrape job queue"""
+
+    def __init__(
+        self,
+        workers=config.JOBS_WORKERS,
+        max_queued=config.JOBS_MAX_QUEUED,
+        retention=config.JOBS_RETENTION_SECONDS,
+        path=config.JOBS_DB_PATH,
+    ):
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.retention = retention
+        self.path = path
+        self._store = None
+        self._queue = None
+        self._tasks = []
+        self._active = {}
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        """Open the job store, re-queue unfinished jobs and start the workers"""
+        if self._store is not None:
+            return
+        self._store = JobStore(self.path)
+        self._queue = asyncio.Queue()
+        pending = self._store.recover(time.time() - self.retention)
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Job queue started with {self.workers} workers ({len(pending)} jobs recovered)")
+
+    async def close(self):
+        """Stop the workers; interrupted jobs are picked up again on the next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    async def submit(self, request):
+        """Persist a scrape request as a queued job and return its id"""
+        if self._queue.qsize() >= self.max_queued:
+            raise JobQueueFull(f"Job queue is full ({self.max_queued} jobs waiting)")
+        job_id = uuid.uuid4().hex
+        await run_in_threadpool(self._store.insert, job_id, request.model_dump_json())
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    async def get(self, job_id, offset=0, include_reviews=True):
+        """Return the job status as a JobResponse dict, or None if it does not exist
+
+        A finished job's result is left as the stored ScrapeResponse JSON bytes.
+        Without include_reviews a finished job's result comes back with empty
+        data, for clients that page reviews from the review store instead; a
+        running job still returns its reviews from offset.
+        """
+        row = await run_in_threadpool(self._store.get, job_id)
+        if row is None:
+            return None
+
+        job = {
+            "job_id": job_id,
+            "status": row["status"],
+            "pages_fetched": row["pages_fetched"],
+            "reviews_scored": row["reviews_scored"],
+            "created_at": _timestamp(row["created_at"]),
+            "updated_at": _timestamp(row["updated_at"]),
+            "error": row["error"],
+        }
+        active = self._active.get(job_id)
+        if active is not None:
+            job["pages_fetched"] = active.pages_fetched
+            job["reviews_scored"] = len(active.reviews)
+            job["reviews"] = active.reviews[offset:]
+            job["summary"] = await active.summary()
+        elif row["result"] is not None:
+            result = row["result"]
+            job["result"] = result.encode("utf-8") if isinstance(result, str) else bytes(result)
+            if not include_reviews:
+                job["result"] = await run_in_threadpool(_without_reviews, job["result"])
+        return job
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception(f"Job {job_id} crashed")
+
+    async def _run(self, job_id):
+        row = await run_in_threadpool(self._store.get, job_id)
+        if row is None or row["status"] != "queued":
+            return
+        request = ScrapeRequest.model_validate_json(row["request"])
+        active = self._active[job_id] = ActiveJob()
+        await run_in_threadpool(self._store.update, job_id, "running")
+
+        def on_page(product):
+            active.pages_fetched = product.pages_fetched
+
+        try:
+            key = cache_key(request)
+            payload = None if request.force_refresh else await result_cache.get(key)
+            if payload is None:
+                summary = None
+                async for frame in coalesced_scrape_frames(request, key, on_page):
+                    if frame["type"] == "review":
+                        active.reviews.append(frame["data"])
+                    elif frame["type"] == "summary":
+                        summary = frame
+                payload = response_from_frames(active.reviews, summary)
+            reviews_scored = loads(payload)["total_reviews"]
+        except asyncio.CancelledError:
+            # Left as "running" in the store so the next start re-queues it
+            self._active.pop(job_id, None)
+            raise
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed")
+            self.failed += 1
+            await run_in_threadpool(
+                self._store.update, job_id, "failed", active.pages_fetched, len(active.reviews), f"Scraping failed: {e}"
+            )
+        else:
+            self.completed += 1
+            await run_in_threadpool(
+                self._store.update, job_id, "done", active.pages_fetched, reviews_scored, None, payload
+            )
+        self._active.pop(job_id, None)
+
+    def stats(self):
+        """Return queue depth and worker activity for /health"""
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": len(self._active),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+job_queue = JobQueue()
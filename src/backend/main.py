@@ -0,0 +1,310 @@
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+import config
+from cache import cache_key, result_cache
+from export import EXPORT_FORMATS, PYARROW_AVAILABLE, export_stream
+from fetcher import fetch_engine
+from history import history_store
+from jobs import JobQueueFull, job_queue
+from models import (
+    BatchScrapeRequest,
+    JobResponse,
+    ProductInfo,
+    ProductSummary,
+    ProductTrend,
+    ReviewPage,
+    ScrapeRequest,
+    ScrapeResponse,
+    SearchResponse,
+)
+from page_cache import page_cache
+from pipeline import coalesced_scrape_frames, response_frames, scrape_batch, scrape_payload
+from responses import CompressionMiddleware, FastJSONResponse, dumps
+from review_store import review_store
+from scoring import scoring_pool
+from sheets import is_configured as sheets_configured
+from sheets import sheets_sink
+from sites import site_registry
+from singleflight import scrape_flights
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    site_registry.start()
+    await fetch_engine.start()
+    page_cache.start()
+    scoring_pool.start()
+    result_cache.start()
+    history_store.start()
+    review_store.start()
+    sheets_sink.start()
+    job_queue.start()
+    yield
+    await job_queue.close()
+    # Blocks until buffered rows are flushed, so it runs off the event loop
+    await run_in_threadpool(sheets_sink.close)
+    review_store.close()
+    history_store.close()
+    result_cache.close()
+    scoring_pool.shutdown()
+    page_cache.close()
+    await fetch_engine.close()
+
+
+app = FastAPI(
+    title=config.SERVICE_NAME,
+    description="Scrapes product reviews, analyzes sentiment with TextBlob and saves results to Google Sheets",
+    version=config.API_VERSION,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=config.CORS_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+if config.RESPONSE_COMPRESSION:
+    app.add_middleware(CompressionMiddleware)
+
+
+@app.get("/")
+async def root():
+    return {
+        "message": f"{config.SERVICE_NAME} API",
+        "version": config.API_VERSION,
+        "docs": "/docs",
+    }
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "healthy",
+        "service": config.SERVICE_NAME,
+        "version": config.API_VERSION,
+        "google_sheets": "configured" if sheets_configured() else "not_configured",
+        "fetch": fetch_engine.stats(),
+        "sites": site_registry.stats(),
+        "page_cache": page_cache.stats(),
+        "scoring": scoring_pool.stats(),
+        "cache": result_cache.stats(),
+        "singleflight": scrape_flights.stats(),
+        "jobs": job_queue.stats(),
+        "reviews": review_store.stats(),
+        "sheets": sheets_sink.stats(),
+    }
+
+
+def validate_product_url(product_url):
+    if not product_url.strip().lower().startswith(("http://", "https://")):
+        raise HTTPException(status_code=400, detail="product_url must be an http(s) URL")
+
+
+@app.post("/scrape", response_model=ScrapeResponse)
+async def scrape(request: ScrapeRequest):
+    validate_product_url(request.product_url)
+
+    key = cache_key(request)
+    if not request.force_refresh:
+        cached = await result_cache.get(key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json", headers={"X-Cache": "HIT"})
+
+    try:
+        payload = await scrape_payload(request, key)
+    except Exception as e:
+        logger.exception("Scrape failed")
+        raise HTTPException(status_code=500, detail=f"Scraping failed: {e}")
+
+    return Response(content=payload, media_type="application/json", headers={"X-Cache": "MISS"})
+
+
+def frame_response(source, http_request, headers=None):
+    """Stream frames as NDJSON, or as SSE when the client accepts text/event-stream"""
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+
+    async def frames():
+        try:
+            async for frame in source:
+                line = dumps(frame)
+                yield b"data: " + line + b"\n\n" if use_sse else line + b"\n"
+        except Exception as e:
+            logger.exception("Streaming scrape failed")
+            error = dumps({"type": "error", "detail": f"Scraping failed: {e}"})
+            yield b"data: " + error + b"\n\n" if use_sse else error + b"\n"
+
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    return StreamingResponse(frames(), media_type=media_type, headers={"Cache-Control": "no-cache", **(headers or {})})
+
+
+@app.post("/scrape/stream")
+async def scrape_stream(request: ScrapeRequest, http_request: Request):
+    """Stream scored reviews as NDJSON (or SSE with Accept: text/event-stream)"""
+    validate_product_url(request.product_url)
+    key = cache_key(request)
+    cached = None if request.force_refresh else await result_cache.get(key)
+
+    async def scrape_frames():
+        if cached is not None:
+            for frame in response_frames(cached):
+                yield frame
+            return
+
+        async for frame in coalesced_scrape_frames(request, key):
+            yield frame
+
+    return frame_response(scrape_frames(), http_request, {"X-Cache": "HIT" if cached is not None else "MISS"})
+
+
+def require_review_store():
+    if not review_store.running:
+        raise HTTPException(status_code=503, detail="Review store is disabled")
+
+
+@app.get("/products", response_model=List[ProductInfo])
+async def list_products(limit: int = Query(100, ge=1, le=1000)):
+    """Products in the review store, most recently scraped first"""
+    require_review_store()
+    return await run_in_threadpool(review_store.products, limit)
+
+
+@app.get("/products/{product_id}/summary", response_model=ProductSummary)
+async def product_summary(product_id: str):
+    """Label counts, score histogram and rating breakdown of a product's latest scrape, without its reviews"""
+    require_review_store()
+    summary = await run_in_threadpool(review_store.get_summary, product_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return summary
+
+
+@app.get("/products/{product_id}/reviews", response_model=ReviewPage)
+async def product_reviews(
+    product_id: str,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=config.REVIEW_PAGE_MAX_LIMIT),
+    sort: Literal["newest", "oldest", "most_positive", "most_negative", "highest_rating", "lowest_rating"] = "newest",
+    label: Optional[List[Literal["Negative", "Neutral", "Positive"]]] = Query(None, description="Only these labels"),
+    min_rating: Optional[float] = Query(None, ge=0, le=5, description="Only reviews rated at least this"),
+):
+    """A page of the product's stored reviews, cursor-paginated over the index for the sort"""
+    require_review_store()
+    if not await run_in_threadpool(review_store.has_product, product_id):
+        raise HTTPException(status_code=404, detail="Product not found")
+    try:
+        return await run_in_threadpool(review_store.page_reviews, product_id, sort, cursor, limit, label, min_rating)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/products/{product_id}/trend", response_model=ProductTrend)
+async def product_trend(
+    product_id: str,
+    bucket: Literal["hour", "day", "week"] = "day",
+    since: Optional[datetime] = Query(None, description="Only reviews scraped at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only reviews scraped before this time"),
+):
+    """Sentiment over time from every stored scrape of the product, read from the (product_id, timestamp) index"""
+    require_review_store()
+    if not await run_in_threadpool(review_store.has_product, product_id):
+        raise HTTPException(status_code=404, detail="Product not found")
+    return await run_in_threadpool(review_store.trend, product_id, bucket, since, until)
+
+
+@app.get("/search", response_model=SearchResponse)
+async def search_reviews(
+    q: str = Query(..., min_length=1, max_length=500, description='Words to find; "phrases", prefix* and OR work'),
+    label: Optional[List[Literal["Negative", "Neutral", "Positive"]]] = Query(None, description="Only these labels"),
+    min_rating: Optional[float] = Query(None, ge=0, le=5, description="Only reviews rated at least this"),
+    max_rating: Optional[float] = Query(None, ge=0, le=5, description="Only reviews rated at most this"),
+    product_id: Optional[List[str]] = Query(None, description="Only these products (repeatable)"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+):
+    """Full-text search over every stored review, best BM25 match first"""
+    require_review_store()
+    if not review_store.search_enabled:
+        raise HTTPException(status_code=501, detail="Review search needs SQLite built with FTS5")
+    try:
+        return await run_in_threadpool(
+            review_store.search, q, label, min_rating, max_rating, product_id, limit, offset
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/export/{export_format}")
+async def export_reviews(
+    export_format: Literal["csv", "arrow", "parquet"],
+    product_id: Optional[List[str]] = Query(None, description="Only these products (repeatable)"),
+    label: Optional[List[Literal["Negative", "Neutral", "Positive"]]] = Query(None, description="Only these labels"),
+    since: Optional[datetime] = Query(None, description="Only reviews scraped at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only reviews scraped before this time"),
+):
+    """Stream stored reviews as CSV, an Arrow IPC stream or Parquet, a chunk of rows (one row group) at a time"""
+    require_review_store()
+    if export_format != "csv" and not PYARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail=f"{export_format} export needs pyarrow installed")
+    media_type, extension = EXPORT_FORMATS[export_format]
+    chunks = review_store.export_chunks(product_id, label, since, until, config.EXPORT_CHUNK_ROWS)
+    return StreamingResponse(
+        export_stream(export_format, chunks),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="reviews.{extension}"'},
+    )
+
+
+@app.post("/scrape/batch")
+async def scrape_batch_endpoint(batch: BatchScrapeRequest, http_request: Request):
+    """Scrape many products; streams one frame per product as it finishes, then a summary"""
+    for product_url in batch.product_urls:
+        validate_product_url(product_url)
+    return frame_response(scrape_batch(batch), http_request)
+
+
+def job_response(job, status_code=200):
+    """JobResponse JSON with a finished job's stored ScrapeResponse spliced in as-is, not parsed and re-encoded"""
+    result = job.pop("result", None)
+    body = dumps({**job, "reviews": job.get("reviews", []), "summary": job.get("summary")})
+    body = body[:-1] + b',"result":' + (result if result is not None else b"null") + b"}"
+    return FastJSONResponse(body, status_code=status_code)
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(request: ScrapeRequest):
+    """Queue a scrape in the background and return its job id immediately"""
+    validate_product_url(request.product_url)
+    try:
+        job_id = await job_queue.submit(request)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return job_response(await job_queue.get(job_id), status_code=202)
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Skip reviews the client already has"),
+    include_reviews: bool = Query(
+        True, description="false: a finished job's result has no reviews; page them from /products/{id}/reviews"
+    ),
+):
+    """Job progress; reviews scored so far while running, the full ScrapeResponse once done"""
+    job = await job_queue.get(job_id, offset, include_reviews)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_response(job)
@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import config
+from sentiment import ANALYZER_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+class SentimentMemo:
+    """Bounded LRU of polarity scores keyed by a hash of cleaned text and analyzer version
+
+    Each process (API worker or scoring pool worker) keeps its own memo. With
+    persistence enabled, processes share one SQLite file: entries are loaded
+    on first use and new scores are appended after every batch.
+    """
+
+    def __init__(self, max_entries=config.SENTIMENT_MEMO_SIZE, path=None, version=ANALYZER_VERSION):
+        self.max_entries = max(1, max_entries)
+        self.path = path
+        self._salt = f"{version}\0".encode("utf-8")
+        self._entries = OrderedDict()
+        self._pending = []
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.lookups = 0
+        if path:
+            self._load()
+
+    def key(self, text):
+        """16-byte blake2b digest of the analyzer version and cleaned text"""
+        return hashlib.blake2b(self._salt + text.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, text):
+        key = self.key(text)
+        with self._lock:
+            self.lookups += 1
+            score = self._entries.get(key)
+            if score is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return score
+
+    def put(self, text, score):
+        key = self.key(text)
+        with self._lock:
+            self._store(key, score)
+            if self._conn is not None:
+                self._pending.append((key, score))
+
+    def _store(self, key, score):
+        self._entries[key] = score
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _connect(self):
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS sentiment_memo (key BLOB PRIMARY KEY, score REAL NOT NULL)")
+        conn.commit()
+        return conn
+
+    def _load(self):
+        try:
+            self._conn = self._connect()
+            # Keys already include the analyzer version, so stale rows simply never match
+            rows = self._conn.execute(
+                "SELECT key, score FROM sentiment_memo ORDER BY rowid DESC LIMIT ?", (self.max_entries,)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Sentiment memo persistence disabled: {e}")
+            self._conn = None
+            return
+        for key, score in reversed(rows):
+            self._store(bytes(key), score)
+        logger.info(f"Loaded {len(rows)} memoized sentiment scores from {self.path}")
+
+    def flush(self):
+        """Persist scores added since the last flush"""
+        with self._lock:
+            if self._conn is None or not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO sentiment_memo (key, score) VALUES (?, ?)", pending)
+                # Keep the file bounded roughly like the in-memory LRU (rowids grow with every write)
+                self._conn.execute(
+                    "DELETE FROM sentiment_memo WHERE rowid <= (SELECT MAX(rowid) FROM sentiment_memo) - ?",
+                    (self.max_entries,),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not persist {len(pending)} memoized scores: {e}")
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "lookups": self.lookups,
+            "hit_ratio": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            "persistent": self._conn is not None,
+        }
+
+
+_memo = None
+
+
+def get_memo():
+    """Return this process's sentiment memo, creating it on first use"""
+    global _memo
+    if _memo is None:
+        path = config.SENTIMENT_MEMO_PATH if config.SENTIMENT_MEMO_PERSIST else None
+        _memo = SentimentMemo(path=path)
+    return _memo
@@ -0,0 +1,156 @@
+from typing import Dict, List, Literal, Optional, Union
+
+from pydantic import BaseModel, Field
+
+import config
+
+
+class ScrapeRequest(BaseModel):
+    product_url: str = Field(..., min_length=1, description="Product page to scrape")
+    max_reviews: Optional[int] = Field(
+        None, ge=1, le=config.SCRAPE_MAX_REVIEWS, description="Stop after this many reviews"
+    )
+    max_concurrency: Optional[int] = Field(
+        None, ge=1, le=64, description="Review pages fetched in parallel for this product"
+    )
+    force_refresh: bool = Field(False, description="Ignore any cached result and scrape again")
+    incremental: bool = Field(
+        False, description="Only fetch and score reviews newer than the last incremental run, then merge"
+    )
+
+
+class BatchScrapeRequest(BaseModel):
+    product_urls: List[str] = Field(
+        ..., min_length=1, max_length=config.SCRAPE_BATCH_MAX_PRODUCTS, description="Product pages to scrape"
+    )
+    max_reviews: Optional[int] = Field(
+        None, ge=1, le=config.SCRAPE_MAX_REVIEWS, description="Stop after this many reviews per product"
+    )
+    max_concurrency: Optional[int] = Field(
+        None, ge=1, le=64, description="Review pages fetched in parallel for each product"
+    )
+    product_concurrency: Optional[int] = Field(
+        None, ge=1, le=256, description="Products scraped at the same time across all hosts"
+    )
+    per_host_concurrency: Optional[int] = Field(
+        None, ge=1, le=64, description="Products scraped at the same time on one host"
+    )
+    force_refresh: bool = Field(False, description="Ignore any cached result and scrape again")
+    incremental: bool = Field(False, description="Only fetch and score reviews newer than the last run")
+
+
+class ReviewData(BaseModel):
+    product_name: str
+    review_text: str
+    rating: float
+    sentiment_score: float
+    sentiment_label: str
+    timestamp: str
+
+
+class StoredReview(ReviewData):
+    id: int = Field(..., description="Review store id, stable across pages")
+
+
+class ReviewPage(BaseModel):
+    product_id: str
+    sort: Literal["newest", "oldest", "most_positive", "most_negative", "highest_rating", "lowest_rating"]
+    total: Optional[int] = Field(None, description="Reviews matching the filters; only on the first page")
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor for the next page; null on the last page")
+    reviews: List[StoredReview]
+
+
+class SearchHit(StoredReview):
+    product_id: str
+    relevance: float = Field(..., description="BM25 score; higher is a better match")
+
+
+class SearchResponse(BaseModel):
+    query: str
+    total: int = Field(..., description="Reviews matching the query and filters")
+    results: List[SearchHit]
+
+
+class ScoreHistogram(BaseModel):
+    edges: List[float] = Field(..., description="Bin edges over [-1, 1]; bin i is edges[i] <= score < edges[i + 1]")
+    counts: List[int]
+
+
+class AspectSummary(BaseModel):
+    mentions: int = Field(..., description="Reviews naming the aspect")
+    mean_score: float = Field(..., description="Mean polarity of the clauses naming it")
+    labels: Dict[str, int] = Field(..., description="Mentions per sentiment label")
+
+
+class ReviewSummary(BaseModel):
+    total: int
+    labels: Dict[str, int] = Field(..., description="Reviews per sentiment label")
+    mean_score: Optional[float] = None
+    mean_rating: Optional[float] = Field(None, description="Over rated reviews only")
+    score_histogram: ScoreHistogram
+    ratings: Dict[str, int] = Field(..., description='Reviews per whole star, "1" to "5"')
+    unrated: int = 0
+    rating_sentiment: Dict[str, Dict[str, int]] = Field(..., description="Star x sentiment label cross-tab")
+    aspects: Optional[Dict[str, AspectSummary]] = Field(
+        None, description="Per-aspect mentions, most discussed first; null while a job is still running"
+    )
+
+
+class ProductInfo(BaseModel):
+    product_id: str
+    product_url: str
+    product_name: str
+    review_count: int = Field(..., description="Distinct reviews stored across all scrapes")
+    first_scraped: str
+    last_scraped: str
+
+
+class TrendPoint(BaseModel):
+    start: str = Field(..., description="Start of the bucket")
+    total: int
+    labels: Dict[str, int]
+    mean_score: Optional[float] = None
+    mean_rating: Optional[float] = None
+
+
+class ProductTrend(BaseModel):
+    product_id: str
+    bucket: Literal["hour", "day", "week"]
+    points: List[TrendPoint]
+
+
+class ProductSummary(BaseModel):
+    product_id: str
+    product_url: str
+    product_name: str
+    updated_at: str
+    summary: ReviewSummary
+
+
+class ScrapeResponse(BaseModel):
+    success: bool
+    data: List[ReviewData]
+    message: str
+    total_reviews: int
+    google_sheets_saved: Union[bool, Literal["pending"]] = Field(
+        ..., description='"pending" while rows wait in the write-behind buffer'
+    )
+    sheet_url: Optional[str] = None
+    new_reviews: Optional[int] = Field(None, description="Reviews added by an incremental scrape")
+    product_id: Optional[str] = Field(None, description="Id for /products/{product_id}/summary")
+    summary: Optional[ReviewSummary] = Field(None, description="Aggregates for charts, so clients need not count reviews")
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str = Field(..., description="queued, running, done or failed")
+    pages_fetched: int = 0
+    reviews_scored: int = 0
+    created_at: str
+    updated_at: str
+    error: Optional[str] = None
+    reviews: List[ReviewData] = Field(
+        default_factory=list, description="While running: reviews scored so far, from the requested offset"
+    )
+    summary: Optional[ReviewSummary] = Field(None, description="While running: aggregates of reviews scored so far")
+    result: Optional[ScrapeResponse] = None
@@ -0,0 +1,152 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedPage:
+    """Validators and parsed content of one review page"""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    product_name: Optional[str]
+    page_count: int
+    # (review_text, rating, review_id) per review, as parsed from the page
+    reviews: List[list] = field(default_factory=list)
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """Size-bounded SQLite store of parsed pages keyed by parser version and URL, for conditional re-fetches
+
+    A page is stored only when the server sent an ETag or Last-Modified. When
+    the total size passes max_bytes, the least recently used pages are evicted
+    until it is back under low_water of the bound.
+    """
+
+    def __init__(
+        self,
+        enabled=config.PAGE_CACHE_ENABLED,
+        path=config.PAGE_CACHE_DB_PATH,
+        max_bytes=config.PAGE_CACHE_MAX_BYTES,
+        low_water=0.9,
+    ):
+        self.enabled = enabled
+        self.path = path
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self._lock = threading.Lock()
+        self._conn = None
+        self.current_bytes = 0
+        self.not_modified = 0
+        self.full_downloads = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @property
+    def running(self):
+        return self._conn is not None
+
+    def start(self):
+        if not self.enabled or self._conn is not None:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body BLOB NOT NULL,"
+            " size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)")
+        self._conn.commit()
+        self.current_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        logger.info(f"Page cache at {self.path} ({self.current_bytes} bytes)")
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+
+    def get(self, url):
+        """Return the CachedPage for url, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT etag, last_modified, body FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        product_name, page_count, reviews = json.loads(row[2])
+        return CachedPage(row[0], row[1], product_name, page_count, reviews)
+
+    def revalidated(self, url):
+        """Record a 304 for url and mark it recently used"""
+        with self._lock:
+            self.not_modified += 1
+            self._conn.execute("UPDATE pages SET last_used = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+    def downloaded(self, url, page):
+        """Record a full download; store the page if it carries validators"""
+        with self._lock:
+            self.full_downloads += 1
+        if not (page.etag or page.last_modified):
+            return
+        body = json.dumps([page.product_name, page.page_count, page.reviews], ensure_ascii=False).encode("utf-8")
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, body, size, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, page.etag, page.last_modified, body, len(body), time.time()),
+            )
+            self.current_bytes += len(body) - (old[0] if old else 0)
+            self.stores += 1
+            if self.current_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        target = self.max_bytes * self.low_water
+        victims = []
+        for url, size in self._conn.execute("SELECT url, size FROM pages ORDER BY last_used"):
+            if self.current_bytes <= target:
+                break
+            victims.append((url,))
+            self.current_bytes -= size
+        self._conn.executemany("DELETE FROM pages WHERE url = ?", victims)
+        self.evictions += len(victims)
+
+    def stats(self):
+        """Return 304 vs full download counters for /health"""
+        fetches = self.not_modified + self.full_downloads
+        return {
+            "enabled": self.running,
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "not_modified": self.not_modified,
+            "full_downloads": self.full_downloads,
+            "not_modified_ratio": round(self.not_modified / fetches, 3) if fetches else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+page_cache = PageCache()
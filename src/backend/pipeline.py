@@ -0,0 +1,376 @@
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from starlette.concurrency import run_in_threadpool
+
+import config
+from cache import cache_key, result_cache
+from extract import review_key
+from fetcher import FetchError
+from history import ProductHistory, history_store
+from models import ScrapeRequest
+from responses import dumps, loads
+from review_batch import ReviewBatch
+from review_store import review_store
+from scoring import scoring_pool
+from scraper import (
+    ScrapedProduct,
+    iter_product_pages,
+    normalize_product_url,
+    product_id,
+    product_name_from_url,
+    scrape_new_reviews,
+    scrape_product,
+)
+from sheets import sheets_sink
+from singleflight import scrape_flights
+from summary import summarize
+
+logger = logging.getLogger(__name__)
+
+
+async def score_reviews(product_name, raw_reviews, timestamp=None):
+    """Clean and score raw reviews into a ReviewBatch"""
+    texts, scores, labels, aspects = await scoring_pool.clean_and_score(raw.review_text for raw in raw_reviews)
+    ratings = [raw.rating for raw in raw_reviews]
+    keys = [review_key(raw) for raw in raw_reviews]
+    return ReviewBatch.from_scored(
+        product_name, texts, ratings, scores, labels, timestamp or datetime.now(), aspects, keys
+    )
+
+
+def response_payload(reviews, **fields):
+    """Serialized ScrapeResponse; the reviews are written straight from the batch's columns"""
+    fields = dumps({"success": True, "new_reviews": None, **fields})
+    return b'{"data":' + reviews.to_json().encode("utf-8") + b"," + fields[1:]
+
+
+def scrape_message(product, total_reviews):
+    """Human readable summary of where the reviews came from"""
+    source = "sample data (demo mode)" if product.is_sample else f"{product.pages_fetched} page(s)"
+    return f"Successfully scraped and analyzed {total_reviews} reviews from {source}"
+
+
+async def save_to_sheets(product, reviews):
+    """Queue reviews for the product's spreadsheet; returns (saved, sheet_url)
+
+    The spreadsheet is kept across scrapes and appended to, so reviews
+    should be the ones record_scrape() found new.
+    """
+    key = normalize_product_url(product.product_url)
+    return await run_in_threadpool(sheets_sink.submit, key, product.product_name, reviews)
+
+
+async def record_scrape(product, reviews, summary):
+    """Add a scrape's reviews to the review store and keep its summary as the product's latest
+
+    Returns the reviews the store did not have yet. Demo-mode sample reviews
+    and scrapes that failed part way are not stored: they would sit among the
+    product's real reviews with nothing to replace them. With the store
+    disabled there is nothing to compare against, so every review is new.
+    """
+    if product.is_sample or product.error is not None:
+        return ReviewBatch.empty()
+    if not review_store.running:
+        return reviews
+    positions = await run_in_threadpool(
+        review_store.save, product_id(product.product_url), product.product_url, product.product_name, reviews, summary
+    )
+    return reviews if len(positions) == len(reviews) else reviews.take(positions)
+
+
+async def run_scrape(request, save_sheets=True):
+    """Run the full scrape pipeline for one product URL; returns the serialized ScrapeResponse"""
+    if request.incremental:
+        return await run_incremental_scrape(request, save_sheets)
+
+    product = await scrape_product(request.product_url, request.max_reviews, request.max_concurrency)
+    reviews = await score_reviews(product.product_name, product.reviews)
+    summary = summarize(reviews)
+    new_reviews = await record_scrape(product, reviews, summary)
+    sheets_saved, sheet_url = False, None
+    if save_sheets:
+        # Only reviews new to the store, or a rescrape would append the whole set again
+        sheets_saved, sheet_url = await save_to_sheets(product, new_reviews)
+
+    return response_payload(
+        reviews,
+        message=scrape_message(product, len(reviews)),
+        total_reviews=len(reviews),
+        google_sheets_saved=sheets_saved,
+        sheet_url=sheet_url,
+        product_id=product_id(request.product_url),
+        summary=summary,
+    )
+
+
+async def run_incremental_scrape(request, save_sheets=True):
+    """Fetch and score only reviews newer than the stored watermark and merge them into the stored set
+
+    The first incremental run of a product is a full scrape that seeds the store.
+    """
+    product_key = normalize_product_url(request.product_url)
+    history = await run_in_threadpool(history_store.get, product_key)
+    watermark_found = False
+
+    if history is None:
+        product = await scrape_product(request.product_url, request.max_reviews, request.max_concurrency)
+        new_raw = product.reviews
+        history = ProductHistory(product_name=product.product_name, first_page_hash=None, reviews=ReviewBatch.empty())
+    else:
+        product = ScrapedProduct(product_url=request.product_url, product_name=history.product_name)
+        try:
+            new_raw, watermark_found = await scrape_new_reviews(
+                product, history.first_page_hash, history.newest_keys, request.max_reviews
+            )
+        except FetchError as e:
+            # Without every page up to the watermark the boundary is unknown; keep the stored set
+            logger.warning(f"Incremental scrape of {request.product_url} failed, serving stored reviews: {e}")
+            product.error = str(e)
+            new_raw, watermark_found = [], True
+
+    reviews = await score_reviews(product.product_name, new_raw)
+    # A lost watermark (reviews re-ordered or deleted upstream) means the fetched set replaces the old one
+    merged = ReviewBatch.concat([reviews, history.reviews]) if watermark_found else reviews
+    merged = merged.head(config.SCRAPE_MAX_REVIEWS)
+    summary = summarize(merged)
+    # Stored reviews are de-duplicated, so only the new ones need writing
+    new_reviews = await record_scrape(product, reviews, summary)
+
+    if not product.is_sample and product.error is None:
+        new_keys = [review_key(raw) for raw in new_raw[:config.INCREMENTAL_WATERMARK_KEYS]]
+        kept_keys = history.newest_keys if watermark_found else []
+        updated = ProductHistory(
+            product_name=product.product_name,
+            first_page_hash=product.first_page_hash,
+            newest_keys=(new_keys + kept_keys)[:config.INCREMENTAL_WATERMARK_KEYS],
+            reviews=merged,
+        )
+        await run_in_threadpool(history_store.save, product_key, updated)
+
+    sheets_saved, sheet_url = False, None
+    if save_sheets and new_reviews:
+        sheets_saved, sheet_url = await save_to_sheets(product, new_reviews)
+
+    return response_payload(
+        merged,
+        message=(
+            f"Found {len(reviews)} new reviews ({len(merged)} total) "
+            f"from {product.pages_fetched} page(s)"
+            + (" (sample data, demo mode)" if product.is_sample else "")
+        ),
+        total_reviews=len(merged),
+        google_sheets_saved=sheets_saved,
+        sheet_url=sheet_url,
+        new_reviews=len(reviews),
+        product_id=product_id(request.product_url),
+        summary=summary,
+    )
+
+
+async def scrape_payload(request, key, save_sheets=True):
+    """Serialized ScrapeResponse for request, scraping at most once per key at a time
+
+    Identical requests arriving while a scrape is running share its result.
+    The caller is expected to have checked the result cache already.
+    Incremental results are not cached: a repeat request has to reach the
+    watermark check to pick up reviews posted since.
+    """
+
+    async def scrape_once():
+        logger.info(f"Scraping reviews for {request.product_url}")
+        payload = await run_scrape(request, save_sheets)
+        if not request.incremental:
+            await result_cache.set(key, payload)
+        return payload
+
+    return await scrape_flights.run(key, scrape_once)
+
+
+async def stream_scrape(request, on_page=None):
+    """Yield scrape frames: one per scored review, then a summary frame
+
+    on_page(product) is called after each page of reviews has been scored.
+    """
+    product = ScrapedProduct(product_url=request.product_url, product_name=product_name_from_url(request.product_url))
+    timestamp = datetime.now()
+    sheets_saved, sheet_url = False, None
+    total = 0
+    scored = []
+
+    async for page_reviews in iter_product_pages(product, request.max_reviews, request.max_concurrency):
+        reviews = await score_reviews(product.product_name, page_reviews, timestamp)
+        scored.append(reviews)
+        for row in reviews.rows():
+            total += 1
+            yield {"type": "review", "data": row}
+        if on_page is not None:
+            on_page(product)
+
+    reviews = ReviewBatch.concat(scored)
+    summary = summarize(reviews)
+    new_reviews = await record_scrape(product, reviews, summary)
+    if sheets_sink.running:
+        # Rows go out once the store has said which reviews are new, as in run_scrape
+        sheets_saved, sheet_url = await save_to_sheets(product, new_reviews)
+    yield {
+        "type": "summary",
+        "success": True,
+        "message": scrape_message(product, total),
+        "total_reviews": total,
+        "google_sheets_saved": sheets_saved,
+        "sheet_url": sheet_url,
+        "product_id": product_id(request.product_url),
+        "summary": summary,
+    }
+
+
+def response_frames(payload):
+    """Replay a serialized ScrapeResponse as stream frames"""
+    response = loads(payload)
+    for review in response.pop("data"):
+        yield {"type": "review", "data": review}
+    yield {"type": "summary", **response}
+
+
+def response_from_frames(reviews, summary):
+    """Serialize streamed review dicts and their summary frame as a ScrapeResponse payload"""
+    response = {"new_reviews": None, **{key: value for key, value in summary.items() if key != "type"}}
+    response["data"] = reviews
+    return dumps(response)
+
+
+async def coalesced_scrape_frames(request, key, on_page=None):
+    """Stream a scrape, joining an identical in-flight scrape if there is one
+
+    The leading scrape caches its result and hands it to coalesced waiters,
+    which replay it as frames.
+    """
+    if request.incremental:
+        # Incremental scrapes usually touch a page or two; they are replayed rather than streamed
+        payload = await scrape_payload(request, key)
+    else:
+        payload = await scrape_flights.wait(key)
+    if payload is not None:
+        for frame in response_frames(payload):
+            yield frame
+        return
+
+    # Streamed reviews are collected so the finished result can be cached
+    # and handed to requests that coalesced onto this scrape
+    scrape_flights.begin(key)
+    reviews = []
+    try:
+        async for frame in stream_scrape(request, on_page):
+            if frame["type"] == "review":
+                reviews.append(frame["data"])
+            elif frame["type"] == "summary":
+                payload = response_from_frames(reviews, frame)
+                scrape_flights.finish(key, payload)
+                await result_cache.set(key, payload)
+            yield frame
+    except BaseException as e:
+        # Includes GeneratorExit when the client disconnects before the summary frame
+        scrape_flights.fail(key, e)
+        raise
+
+
+async def scrape_batch(batch):
+    """Scrape many products, yielding a frame per product as each finishes, then a summary
+
+    Products run under a global limit and a per-host limit; pages within a
+    product are still bounded by the fetch engine's adaptive per-host limit.
+    All rows are queued for one spreadsheet shared by the whole batch.
+    """
+    started = time.perf_counter()
+    global_slots = asyncio.Semaphore(batch.product_concurrency or config.SCRAPE_BATCH_CONCURRENCY)
+    per_host = batch.per_host_concurrency or config.SCRAPE_BATCH_PER_HOST
+    host_slots = {}
+    # Every product's rows go to one spreadsheet per distinct set of URLs
+    sheet_key = "batch:" + hashlib.sha256("\n".join(sorted(batch.product_urls)).encode("utf-8")).hexdigest()
+    sheet_title = f"Batch of {len(batch.product_urls)} products"
+    sheets_saved, sheet_url = False, None
+
+    async def scrape_one(product_url):
+        queued_at = time.perf_counter()
+        request = ScrapeRequest(
+            product_url=product_url,
+            max_reviews=batch.max_reviews,
+            max_concurrency=batch.max_concurrency,
+            force_refresh=batch.force_refresh,
+            incremental=batch.incremental,
+        )
+        host = urlsplit(product_url.strip()).netloc.lower()
+        slot = host_slots.setdefault(host, asyncio.Semaphore(per_host))
+        # Take the host slot first so products waiting on a busy host do not hold global slots
+        async with slot, global_slots:
+            scrape_started = time.perf_counter()
+            frame = {"type": "product", "product_url": product_url, "host": host}
+            try:
+                key = cache_key(request)
+                payload = None if request.force_refresh else await result_cache.get(key)
+                frame["cache"] = "MISS" if payload is None else "HIT"
+                if payload is None:
+                    payload = await scrape_payload(request, key, save_sheets=False)
+                response = loads(payload)
+                frame.update(
+                    success=True,
+                    message=response["message"],
+                    total_reviews=response["total_reviews"],
+                    new_reviews=response.get("new_reviews"),
+                    product_id=response.get("product_id"),
+                    summary=response.get("summary"),
+                    data=response["data"],
+                )
+            except Exception as e:
+                logger.exception(f"Batch scrape of {product_url} failed")
+                frame.update(
+                    success=False,
+                    message=f"Scraping failed: {e}",
+                    total_reviews=0,
+                    new_reviews=None,
+                    product_id=None,
+                    summary=None,
+                    data=[],
+                )
+            finished = time.perf_counter()
+        frame["wait_ms"] = round((scrape_started - queued_at) * 1000, 1)
+        frame["elapsed_ms"] = round((finished - scrape_started) * 1000, 1)
+        return frame
+
+    tasks = [asyncio.ensure_future(scrape_one(url)) for url in batch.product_urls]
+    succeeded = total = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            frame = await next_done
+            if frame["success"]:
+                succeeded += 1
+                total += frame["total_reviews"]
+                # An incremental result lists its new reviews first; only those are new rows
+                rows = frame["data"] if frame["new_reviews"] is None else frame["data"][: frame["new_reviews"]]
+                if sheets_sink.running and rows:
+                    reviews = ReviewBatch.from_rows(rows)
+                    sheets_saved, sheet_url = await run_in_threadpool(
+                        sheets_sink.submit, sheet_key, sheet_title, reviews
+                    )
+            yield frame
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    yield {
+        "type": "summary",
+        "success": succeeded > 0,
+        "message": f"Scraped {succeeded} of {len(batch.product_urls)} products ({total} reviews)",
+        "products": len(batch.product_urls),
+        "succeeded": succeeded,
+        "failed": len(batch.product_urls) - succeeded,
+        "total_reviews": total,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "google_sheets_saved": sheets_saved,
+        "sheet_url": sheet_url,
+    }
@@ -0,0 +1,200 @@
+import asyncio
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+import config
+
+# Smallest request rate a host is ever cut back to, in requests per second
+MIN_RATE = 0.5
+# Weights of the short- and long-term latency averages
+SHORT_LATENCY_WEIGHT = 0.3
+LONG_LATENCY_WEIGHT = 0.02
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class TokenBucket:
+    """Request rate budget; take() reserves a token and sleeps until it is due, so waiters go in order"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._tokens = max(1.0, rate)
+        self._updated = time.monotonic()
+
+    async def take(self):
+        if not self.rate:
+            return
+        now = time.monotonic()
+        # The burst allowance is one second's worth of requests
+        self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit: grows by one slot per round of successes, shrinks multiplicatively on overload
+
+    Overload is a 429/5xx/timeout, or short-term latency running above
+    FETCH_LATENCY_TOLERANCE times the long-term average. At most one decrease
+    happens per round trip, so a burst of failures from one window counts once.
+    The limit only grows while it is actually the bottleneck.
+    """
+
+    def __init__(self, initial, maximum, minimum=1):
+        self.minimum = minimum
+        self.maximum = max(initial, maximum)
+        self.limit = float(initial)
+        self.in_flight = 0
+        self._waiters = deque()
+        self._short_latency = None
+        self._long_latency = None
+        self._last_decrease = 0.0
+
+    async def acquire(self):
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        future = asyncio.get_event_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the cancellation landed
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    def record(self, latency, overloaded):
+        """Feed one finished request (called while it still holds its slot)"""
+        now = time.monotonic()
+        if overloaded:
+            self._decrease(now, config.FETCH_AIMD_DECREASE)
+            return
+        if self._short_latency is None:
+            self._short_latency = self._long_latency = latency
+        self._short_latency += SHORT_LATENCY_WEIGHT * (latency - self._short_latency)
+        self._long_latency += LONG_LATENCY_WEIGHT * (latency - self._long_latency)
+        if self._short_latency > self._long_latency * config.FETCH_LATENCY_TOLERANCE:
+            self._decrease(now, 0.9)
+        elif self._waiters or self.in_flight >= int(self.limit):
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._wake()
+
+    def _decrease(self, now, factor):
+        if now - self._last_decrease < (self._short_latency or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * factor)
+
+    @property
+    def latency(self):
+        return self._short_latency
+
+
+class HostThrottle:
+    """Admission control for one host: Retry-After pause, AIMD concurrency slot, then a rate token
+
+    The rate starts at the site adapter's requests_per_second (unlimited if
+    0). A 429 halves it, starting from the recently observed request rate
+    for hosts without one, at most once a second so one burst of 429s counts
+    once. Each success adds back about one request per second per second, up
+    to the adapter's rate.
+    """
+
+    def __init__(self, adapter, adaptive=config.FETCH_ADAPTIVE):
+        self.adapter = adapter
+        maximum = adapter.max_per_host_limit if adaptive else adapter.per_host_limit
+        self.limiter = AdaptiveLimiter(adapter.per_host_limit, maximum)
+        self.adaptive = adaptive
+        self.max_rate = adapter.requests_per_second or None
+        self.bucket = TokenBucket(adapter.requests_per_second)
+        self.blocked_until = 0.0
+        self._last_rate_decrease = 0.0
+        self._started = deque(maxlen=1000)
+        self.requests = 0
+        self.throttled = 0
+        self.overloaded = 0
+
+    async def acquire(self):
+        while True:
+            pause = self.blocked_until - time.monotonic()
+            if pause <= 0:
+                break
+            await asyncio.sleep(pause)
+        await self.limiter.acquire()
+        try:
+            await self.bucket.take()
+        except BaseException:
+            self.limiter.release()
+            raise
+        self.requests += 1
+        self._started.append(time.monotonic())
+
+    def release(self):
+        self.limiter.release()
+
+    def record(self, status, latency, retry_after=None):
+        """Feed one response status (None for a timeout or connection error) and its latency"""
+        overloaded = status is None or status == 429 or status >= 500
+        if status == 429:
+            self.throttled += 1
+        elif overloaded:
+            self.overloaded += 1
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + min(retry_after, config.FETCH_RETRY_AFTER_MAX))
+        if not self.adaptive:
+            return
+        self.limiter.record(latency, overloaded)
+        if status == 429:
+            now = time.monotonic()
+            if now - self._last_rate_decrease >= 1.0:
+                self._last_rate_decrease = now
+                current = self.bucket.rate or self.observed_rate()
+                self.bucket.rate = max(MIN_RATE, current * config.FETCH_AIMD_DECREASE)
+        elif not overloaded and self.bucket.rate:
+            rate = self.bucket.rate + 1.0 / self.bucket.rate
+            self.bucket.rate = min(self.max_rate, rate) if self.max_rate else rate
+
+    def observed_rate(self):
+        """Requests started in the last second"""
+        now = time.monotonic()
+        return float(sum(1 for started in self._started if now - started <= 1.0)) or MIN_RATE
+
+    def stats(self):
+        return {
+            "adaptive": self.adaptive,
+            "concurrency": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "rate": round(self.bucket.rate, 2) if self.bucket.rate else None,
+            "latency_ms": round(self.limiter.latency * 1000, 1) if self.limiter.latency is not None else None,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "overloaded": self.overloaded,
+            "paused_for_s": round(max(0.0, self.blocked_until - time.monotonic()), 1),
+        }
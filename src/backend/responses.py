@@ -0,0 +1,144 @@
+import gzip
+import json
+
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+import config
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:  # orjson is optional; the json module produces the same documents
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi as brotli
+
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+# Preferred first when the client weighs them equally
+SUPPORTED_ENCODINGS = ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+
+# Bodies above this size are compressed off the event loop
+_THREADPOOL_MIN_BYTES = 256 * 1024
+
+
+def dumps(value):
+    """Compact UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data):
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps(); bytes content is taken as already-serialized JSON"""
+
+    def render(self, content):
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        return dumps(content)
+
+
+def negotiate_encoding(accept_encoding):
+    """Best supported content coding for an Accept-Encoding header, or None for identity"""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        name = name.strip()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body, encoding, gzip_level=config.RESPONSE_GZIP_LEVEL, brotli_quality=config.RESPONSE_BROTLI_QUALITY):
+    if encoding == "br":
+        return brotli.compress(body, mode=brotli.MODE_TEXT, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """Compress whole JSON responses with brotli or gzip, as negotiated from Accept-Encoding
+
+    Only responses sent in a single body message are touched: /scrape
+    payloads, job results and the like. Streamed NDJSON and SSE frames go
+    out as written so each one reaches the client as soon as it is ready.
+    """
+
+    def __init__(self, app, minimum_size=config.RESPONSE_COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Held back until the first body message shows whether the response is worth compressing
+                start = message
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            pending, start = start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=pending["headers"])
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith("application/json")
+            ):
+                await send(pending)
+                await send(message)
+                return
+
+            if len(body) >= _THREADPOOL_MIN_BYTES:
+                body = await run_in_threadpool(compress, body, encoding)
+            else:
+                body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(pending)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
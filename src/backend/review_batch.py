@@ -0,0 +1,326 @@
+import json
+import struct
+from datetime import datetime, timedelta
+from json.encoder import encode_basestring
+
+import numpy as np
+
+from aspects import ASPECTS, no_aspects
+from sentiment import SENTIMENT_LABELS
+
+# ReviewData field order, used for rows and serialized JSON
+FIELDS = ("product_name", "review_text", "rating", "sentiment_score", "sentiment_label", "timestamp")
+
+# Naive local timestamps are kept as microseconds since this wall-clock epoch,
+# so each one formats back to exactly the isoformat() string it came from
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# to_bytes() layout: magic, header length, JSON header (products, count, aspect names, review_keys),
+# the columns in _COLUMNS order, the float32 aspect matrix (one column per header "aspects" name) and the text
+_MAGIC = b"RVB2"
+_COLUMNS = (
+    ("product_codes", "<i4"),
+    ("offsets", "<i8"),
+    ("ratings", "<f8"),
+    ("scores", "<f8"),
+    ("labels", "i1"),
+    ("timestamps", "<i8"),
+)
+
+
+def timestamp_to_int(value):
+    """Microseconds since the epoch for a naive datetime or its isoformat() string"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def timestamp_from_int(value):
+    return (_EPOCH + timedelta(microseconds=int(value))).isoformat()
+
+
+class ReviewBatch:
+    """Scored reviews of a scrape, stored column by column
+
+    Ratings and scores are float64 arrays, sentiment labels int8 codes into
+    SENTIMENT_LABELS, product names int32 codes into a small tuple, and
+    timestamps int64 microseconds. aspects is a float32 matrix with a column
+    per aspects.ASPECTS holding the polarity of the review's mentions of that
+    aspect, NaN where it names none. review_keys lists each review's
+    extract.review_key, None where it is unknown. All review texts share one
+    UTF-8 buffer sliced by an offsets array, so a review costs a few dozen bytes
+    plus its text instead of a Pydantic model and its boxed fields. Dicts are
+    only built at the API boundary by rows(); to_json() writes the response
+    straight from the columns.
+    """
+
+    __slots__ = (
+        "products", "product_codes", "text", "offsets", "ratings", "scores", "labels", "timestamps", "aspects",
+        "review_keys",
+    )
+
+    def __init__(
+        self,
+        products,
+        product_codes,
+        text,
+        offsets,
+        ratings,
+        scores,
+        labels,
+        timestamps,
+        aspects=None,
+        review_keys=None,
+    ):
+        self.products = tuple(products)
+        self.product_codes = product_codes
+        self.text = text
+        self.offsets = offsets
+        self.ratings = ratings
+        self.scores = scores
+        self.labels = labels
+        self.timestamps = timestamps
+        self.aspects = no_aspects(len(ratings)) if aspects is None else aspects
+        self.review_keys = [None] * len(ratings) if review_keys is None else list(review_keys)
+
+    @classmethod
+    def empty(cls):
+        return cls.from_texts((), [], [], [], [], [], [])
+
+    @classmethod
+    def from_texts(
+        cls, products, product_codes, texts, ratings, scores, labels, timestamps, aspects=None, review_keys=None
+    ):
+        """Build a batch from per-review sequences; texts are encoded into the shared buffer
+
+        Without an aspect matrix every review is recorded as naming no aspect,
+        and without review_keys every key is unknown.
+        """
+        encoded = [text.encode("utf-8") for text in texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+        return cls(
+            products,
+            np.asarray(product_codes, dtype=np.int32),
+            b"".join(encoded),
+            offsets,
+            np.asarray(ratings, dtype=np.float64),
+            np.asarray(scores, dtype=np.float64),
+            np.asarray(labels, dtype=np.int8),
+            np.asarray(timestamps, dtype=np.int64),
+            None if aspects is None else np.asarray(aspects, dtype=np.float32),
+            review_keys,
+        )
+
+    @classmethod
+    def from_scored(cls, product_name, texts, ratings, scores, labels, timestamp, aspects=None, review_keys=None):
+        """One product's cleaned texts with their ratings and scores; reviews left empty by cleaning are dropped"""
+        keep = [index for index, text in enumerate(texts) if text]
+        if len(keep) == len(texts):
+            keep = slice(None)
+        elif review_keys is not None:
+            review_keys = [review_keys[index] for index in keep]
+        return cls.from_texts(
+            (product_name,),
+            np.zeros(len(texts), dtype=np.int32)[keep],
+            [texts[index] for index in keep] if isinstance(keep, list) else texts,
+            np.asarray(ratings, dtype=np.float64)[keep],
+            # round() rather than np.round, which is off by one in the last digit for some halves
+            np.array([round(score, 3) for score in np.asarray(scores, dtype=np.float64).tolist()])[keep],
+            np.asarray(labels, dtype=np.int8)[keep],
+            np.full(len(texts), timestamp_to_int(timestamp), dtype=np.int64)[keep],
+            None if aspects is None else np.asarray(aspects, dtype=np.float32)[keep],
+            review_keys,
+        )
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Batch from ReviewData-shaped dicts (response rows, stream frames)"""
+        products = {}
+        stamps = {}
+        codes, texts, ratings, scores, labels, timestamps = [], [], [], [], [], []
+        label_codes = {label: code for code, label in enumerate(SENTIMENT_LABELS)}
+        for row in rows:
+            codes.append(products.setdefault(row["product_name"], len(products)))
+            texts.append(row["review_text"])
+            ratings.append(row["rating"])
+            scores.append(row["sentiment_score"])
+            labels.append(label_codes[row["sentiment_label"]])
+            stamp = row["timestamp"]
+            if stamp not in stamps:
+                stamps[stamp] = timestamp_to_int(stamp)
+            timestamps.append(stamps[stamp])
+        return cls.from_texts(products, codes, texts, ratings, scores, labels, timestamps)
+
+    @classmethod
+    def concat(cls, batches):
+        batches = [batch for batch in batches if len(batch)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+        products = {}
+        codes = []
+        for batch in batches:
+            remap = np.array([products.setdefault(name, len(products)) for name in batch.products], dtype=np.int32)
+            codes.append(remap[batch.product_codes])
+        offsets = [np.zeros(1, dtype=np.int64)]
+        base = 0
+        for batch in batches:
+            offsets.append(batch.offsets[1:] - batch.offsets[0] + base)
+            base += int(batch.offsets[-1] - batch.offsets[0])
+        return cls(
+            products,
+            np.concatenate(codes),
+            b"".join(batch.text[batch.offsets[0]:batch.offsets[-1]] for batch in batches),
+            np.concatenate(offsets),
+            np.concatenate([batch.ratings for batch in batches]),
+            np.concatenate([batch.scores for batch in batches]),
+            np.concatenate([batch.labels for batch in batches]),
+            np.concatenate([batch.timestamps for batch in batches]),
+            np.concatenate([batch.aspects for batch in batches]),
+            [key for batch in batches for key in batch.review_keys],
+        )
+
+    def __len__(self):
+        return len(self.ratings)
+
+    def head(self, count):
+        """The first count reviews, sharing this batch's buffers"""
+        if count >= len(self):
+            return self
+        return ReviewBatch(
+            self.products,
+            self.product_codes[:count],
+            self.text,
+            self.offsets[: count + 1],
+            self.ratings[:count],
+            self.scores[:count],
+            self.labels[:count],
+            self.timestamps[:count],
+            self.aspects[:count],
+            self.review_keys[:count],
+        )
+
+    def take(self, positions):
+        """The reviews at positions, in that order, as a new batch"""
+        texts = self.texts()
+        index = np.asarray(positions, dtype=np.intp)
+        return ReviewBatch.from_texts(
+            self.products,
+            self.product_codes[index],
+            [texts[position] for position in positions],
+            self.ratings[index],
+            self.scores[index],
+            self.labels[index],
+            self.timestamps[index],
+            self.aspects[index],
+            [self.review_keys[position] for position in positions],
+        )
+
+    @property
+    def nbytes(self):
+        """Bytes held by the columns and the text buffer"""
+        arrays = (
+            self.product_codes, self.offsets, self.ratings, self.scores, self.labels, self.timestamps, self.aspects
+        )
+        return len(self.text) + sum(array.nbytes for array in arrays)
+
+    def texts(self):
+        """Review texts as a list of str"""
+        bounds = self.offsets.tolist()
+        text = self.text
+        if text.isascii():
+            # Byte offsets are character offsets, so one decode serves every review
+            decoded = text.decode("ascii")
+            return [decoded[start:end] for start, end in zip(bounds, bounds[1:])]
+        return [text[start:end].decode("utf-8") for start, end in zip(bounds, bounds[1:])]
+
+    def columns(self):
+        """One Python list per ReviewData field, in FIELDS order"""
+        stamps = {value: timestamp_from_int(value) for value in np.unique(self.timestamps).tolist()}
+        return (
+            [self.products[code] for code in self.product_codes.tolist()],
+            self.texts(),
+            self.ratings.tolist(),
+            self.scores.tolist(),
+            [SENTIMENT_LABELS[code] for code in self.labels.tolist()],
+            [stamps[value] for value in self.timestamps.tolist()],
+        )
+
+    def rows(self):
+        """ReviewData-shaped dicts"""
+        return [dict(zip(FIELDS, values)) for values in zip(*self.columns())]
+
+    def to_json(self):
+        """JSON array of ReviewData objects, written from the columns without building dicts"""
+        if not len(self):
+            return "[]"
+        names = [encode_basestring(name) for name in self.products]
+        labels = [encode_basestring(label) for label in SENTIMENT_LABELS]
+        stamps = {value: encode_basestring(timestamp_from_int(value)) for value in np.unique(self.timestamps).tolist()}
+        rows = [
+            f'{{"product_name":{names[code]},"review_text":{encode_basestring(text)},"rating":{rating!r},'
+            f'"sentiment_score":{score!r},"sentiment_label":{labels[label]},"timestamp":{stamps[stamp]}}}'
+            for code, text, rating, score, label, stamp in zip(
+                self.product_codes.tolist(),
+                self.texts(),
+                self.ratings.tolist(),
+                self.scores.tolist(),
+                self.labels.tolist(),
+                self.timestamps.tolist(),
+            )
+        ]
+        return "[" + ",".join(rows) + "]"
+
+    def to_bytes(self):
+        """Compact binary form for storage; from_bytes() reads it back without parsing each review"""
+        start, end = int(self.offsets[0]), int(self.offsets[-1])
+        columns = dict(
+            product_codes=self.product_codes,
+            offsets=self.offsets - start,
+            ratings=self.ratings,
+            scores=self.scores,
+            labels=self.labels,
+            timestamps=self.timestamps,
+        )
+        header = json.dumps(
+            {"products": self.products, "count": len(self), "aspects": ASPECTS, "review_keys": self.review_keys},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        parts = [_MAGIC, struct.pack("<I", len(header)), header]
+        parts.extend(np.ascontiguousarray(columns[name], dtype=dtype).tobytes() for name, dtype in _COLUMNS)
+        parts.append(np.ascontiguousarray(self.aspects, dtype="<f4").tobytes())
+        parts.append(self.text[start:end])
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if not data.startswith(_MAGIC):
+            raise ValueError("not a serialized ReviewBatch")
+        (header_size,) = struct.unpack_from("<I", data, len(_MAGIC))
+        position = len(_MAGIC) + 4
+        header = json.loads(data[position:position + header_size])
+        position += header_size
+        count = header["count"]
+        columns = {}
+        for name, dtype in _COLUMNS:
+            length = count + 1 if name == "offsets" else count
+            columns[name] = np.frombuffer(data, dtype=dtype, count=length, offset=position)
+            position += columns[name].nbytes
+        names = header["aspects"]
+        stored = np.frombuffer(data, dtype="<f4", count=count * len(names), offset=position)
+        stored = stored.reshape(count, len(names))
+        position += stored.nbytes
+        if tuple(names) == ASPECTS:
+            aspects = stored
+        else:
+            # Written with another aspect list: keep the columns that still exist
+            aspects = no_aspects(count)
+            for column, name in enumerate(names):
+                if name in ASPECTS:
+                    aspects[:, ASPECTS.index(name)] = stored[:, column]
+        return cls(
+            header["products"], text=data[position:], aspects=aspects, review_keys=header["review_keys"], **columns
+        )
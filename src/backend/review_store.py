@@ -0,0 +1,503 @@
+import base64
+import binascii
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from itertools import repeat
+from pathlib import Path
+
+import config
+from review_batch import timestamp_from_int, timestamp_to_int
+from sentiment import SENTIMENT_LABELS
+
+logger = logging.getLogger(__name__)
+
+# Trend bucket widths in seconds
+TREND_BUCKETS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+
+# Review page orders: sort name -> (column, direction); ties are broken by id in the same direction
+REVIEW_SORTS = {
+    "newest": ("timestamp", "DESC"),
+    "oldest": ("timestamp", "ASC"),
+    "most_positive": ("sentiment_score", "DESC"),
+    "most_negative": ("sentiment_score", "ASC"),
+    "highest_rating": ("rating", "DESC"),
+    "lowest_rating": ("rating", "ASC"),
+}
+
+# Search box syntax: "quoted phrases" or bare words
+_QUERY_TOKEN = re.compile(r'"([^"]*)"?|(\S+)')
+_QUERY_WORD = re.compile(r"\w+")
+
+_MIN_TIMESTAMP = -(2**62)
+_MAX_TIMESTAMP = 2**62
+
+
+def _timestamp_bound(value, default):
+    """Stored-timestamp value of a since/until bound; aware datetimes are converted to local time first"""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return timestamp_to_int(value)
+
+
+def fts_query(text):
+    """FTS5 MATCH expression for a search box query, or None if it has no words
+
+    Words must all appear, "quoted phrases" must appear in order, a trailing
+    * matches a prefix and OR between two terms matches either. Every term is
+    quoted, so punctuation in what people type cannot break FTS5's syntax.
+    """
+    parts = []
+    for phrase, word in _QUERY_TOKEN.findall(text):
+        if word.upper() == "OR":
+            if parts and parts[-1] != "OR":
+                parts.append("OR")
+            continue
+        words = _QUERY_WORD.findall(phrase or word)
+        if words:
+            parts.append(f'"{" ".join(words)}"' + ("*" if word.endswith("*") else ""))
+    if parts and parts[-1] == "OR":
+        parts.pop()
+    return " ".join(parts) or None
+
+
+def encode_cursor(sort, value, review_id):
+    """Opaque page cursor: the sort and the last row's sort key and id"""
+    return base64.urlsafe_b64encode(json.dumps([sort, value, review_id]).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    """(sort key, id) of a cursor from encode_cursor(); ValueError if it is malformed or was made for another sort"""
+    try:
+        cursor_sort, value, review_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort or not isinstance(review_id, int) or not isinstance(value, (int, float)):
+        raise ValueError(f"Cursor does not belong to sort {sort!r}")
+    return value, review_id
+
+
+class ReviewStore:
+    """SQLite (WAL) store of every scraped product and review, indexed for history, trend and full-text queries
+
+    Each scrape is written in one transaction and reviews already stored for
+    the product (same extract.review_key, carried in the batch's review_keys)
+    are skipped. Writes go through one connection under a lock; reads use a
+    connection per thread so WAL lets them run alongside a write. Timestamps are stored as microseconds, like ReviewBatch, so range
+    and bucket queries are integer arithmetic on the (product_id, timestamp)
+    index.
+    """
+
+    def __init__(self, enabled=config.REVIEW_STORE_ENABLED, path=config.REVIEW_STORE_DB_PATH):
+        self.enabled = enabled
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._local = threading.local()
+        self._readers = []
+        self.search_enabled = False
+        self.inserted = 0
+        self.duplicates = 0
+
+    @property
+    def running(self):
+        return self._conn is not None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent on a crash with NORMAL; only the last commits may be lost on power failure
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def start(self):
+        if not self.enabled or self._conn is not None:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = self._connect()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS products ("
+            " product_id TEXT PRIMARY KEY, product_url TEXT NOT NULL, product_name TEXT NOT NULL,"
+            " review_count INTEGER NOT NULL DEFAULT 0, summary TEXT,"
+            " first_scraped REAL NOT NULL, last_scraped REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reviews ("
+            " id INTEGER PRIMARY KEY, product_id TEXT NOT NULL, review_key TEXT NOT NULL,"
+            " review_text TEXT NOT NULL, rating REAL NOT NULL, sentiment_score REAL NOT NULL,"
+            " sentiment_label TEXT NOT NULL, timestamp INTEGER NOT NULL,"
+            " UNIQUE (product_id, review_key))"
+        )
+        self.search_enabled = self._create_search_index()
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reviews_product_time ON reviews (product_id, timestamp)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reviews_label ON reviews (sentiment_label)")
+        # Review pages sorted by score or rating walk these; index entries end in the rowid (id), the tiebreaker
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reviews_product_score ON reviews (product_id, sentiment_score)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reviews_product_rating ON reviews (product_id, rating)")
+        self._conn.commit()
+        logger.info(f"Review store at {self.path}")
+
+    def _create_search_index(self):
+        """Create the FTS5 index over review_text; False if this SQLite has no FTS5
+
+        The index is external-content (it stores no copy of the text) and is
+        created with the reviews table. save() adds each scrape's new reviews
+        to it in the same transaction that stores them, so skipped duplicates
+        never touch it.
+        """
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5("
+                " review_text, content='reviews', content_rowid='id', tokenize='porter unicode61')"
+            )
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Review search disabled, this SQLite has no FTS5: {e}")
+            return False
+        return True
+
+    def close(self):
+        with self._lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers = []
+            self._local = threading.local()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _reader(self):
+        """This thread's read connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    def save(self, product_id, product_url, product_name, reviews, summary):
+        """Store a scrape's ReviewBatch and summary in one transaction; returns the positions of the new reviews"""
+        texts = reviews.texts()
+        ratings = reviews.ratings.tolist()
+        labels = [SENTIMENT_LABELS[code] for code in reviews.labels.tolist()]
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO products"
+                    " (product_id, product_url, product_name, summary, first_scraped, last_scraped)"
+                    " VALUES (?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (product_id) DO UPDATE SET product_url = excluded.product_url,"
+                    " product_name = excluded.product_name, summary = excluded.summary,"
+                    " last_scraped = excluded.last_scraped",
+                    (product_id, product_url, product_name, json.dumps(summary), now, now),
+                )
+                last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM reviews").fetchone()[0]
+                inserted = self._conn.executemany(
+                    "INSERT OR IGNORE INTO reviews"
+                    " (product_id, review_key, review_text, rating, sentiment_score, sentiment_label, timestamp)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    zip(
+                        repeat(product_id),
+                        reviews.review_keys,
+                        texts,
+                        ratings,
+                        reviews.scores.tolist(),
+                        labels,
+                        reviews.timestamps.tolist(),
+                    ),
+                ).rowcount
+                # New rows get ids past the old maximum
+                new_keys = set()
+                if inserted:
+                    new_keys = {
+                        key for (key,) in self._conn.execute("SELECT review_key FROM reviews WHERE id > ?", (last_id,))
+                    }
+                if self.search_enabled and inserted:
+                    # One INSERT ... SELECT indexes them several times faster than a per-row trigger would
+                    self._conn.execute(
+                        "INSERT INTO reviews_fts (rowid, review_text) SELECT id, review_text FROM reviews WHERE id > ?",
+                        (last_id,),
+                    )
+                self._conn.execute(
+                    "UPDATE products SET review_count = review_count + ? WHERE product_id = ?", (inserted, product_id)
+                )
+        self.inserted += inserted
+        self.duplicates += len(reviews) - inserted
+        # A key repeated within the scrape was inserted at its first position
+        positions = []
+        for position, key in enumerate(reviews.review_keys):
+            if key in new_keys:
+                new_keys.discard(key)
+                positions.append(position)
+        return positions
+
+    def get_summary(self, product_id):
+        """Return a ProductSummary dict for the product's latest scrape, or None for an unknown product"""
+        row = self._reader().execute(
+            "SELECT product_url, product_name, summary, last_scraped FROM products WHERE product_id = ?",
+            (product_id,),
+        ).fetchone()
+        if row is None or row[2] is None:
+            return None
+        return {
+            "product_id": product_id,
+            "product_url": row[0],
+            "product_name": row[1],
+            "updated_at": datetime.fromtimestamp(row[3]).isoformat(),
+            "summary": json.loads(row[2]),
+        }
+
+    def products(self, limit=100):
+        """Stored products, most recently scraped first"""
+        rows = self._reader().execute(
+            "SELECT product_id, product_url, product_name, review_count, first_scraped, last_scraped"
+            " FROM products ORDER BY last_scraped DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [
+            {
+                "product_id": row[0],
+                "product_url": row[1],
+                "product_name": row[2],
+                "review_count": row[3],
+                "first_scraped": datetime.fromtimestamp(row[4]).isoformat(),
+                "last_scraped": datetime.fromtimestamp(row[5]).isoformat(),
+            }
+            for row in rows
+        ]
+
+    def has_product(self, product_id):
+        return self._reader().execute("SELECT 1 FROM products WHERE product_id = ?", (product_id,)).fetchone() is not None
+
+    def trend(self, product_id, bucket="day", since=None, until=None):
+        """Sentiment per time bucket for one product: label counts, mean score and mean rating
+
+        since and until are naive datetimes or isoformat strings; reviews are
+        bucketed by the time they were scraped.
+        """
+        width = TREND_BUCKETS[bucket] * 1_000_000
+        start = _timestamp_bound(since, _MIN_TIMESTAMP)
+        end = _timestamp_bound(until, _MAX_TIMESTAMP)
+        rows = self._reader().execute(
+            "SELECT timestamp / ? AS bucket, sentiment_label, COUNT(*), SUM(sentiment_score),"
+            " SUM(CASE WHEN rating >= 1 THEN rating END), COUNT(CASE WHEN rating >= 1 THEN 1 END)"
+            " FROM reviews WHERE product_id = ? AND timestamp >= ? AND timestamp < ?"
+            " GROUP BY bucket, sentiment_label ORDER BY bucket",
+            (width, product_id, start, end),
+        ).fetchall()
+
+        points = []
+        totals = {}
+        for bucket_index, label, count, score_sum, rating_sum, rated in rows:
+            if bucket_index not in totals:
+                point = {"start": timestamp_from_int(bucket_index * width), "labels": dict.fromkeys(SENTIMENT_LABELS, 0)}
+                points.append(point)
+                totals[bucket_index] = [point, 0, 0.0, 0.0, 0]
+            entry = totals[bucket_index]
+            entry[0]["labels"][label] = count
+            entry[1] += count
+            entry[2] += score_sum
+            entry[3] += rating_sum or 0.0
+            entry[4] += rated
+        for point, count, score_sum, rating_sum, rated in totals.values():
+            point["total"] = count
+            point["mean_score"] = round(score_sum / count, 3)
+            point["mean_rating"] = round(rating_sum / rated, 2) if rated else None
+        return {"product_id": product_id, "bucket": bucket, "points": points}
+
+    def page_reviews(self, product_id, sort="newest", cursor=None, limit=50, labels=None, min_rating=None):
+        """One page of a product's stored reviews in REVIEW_SORTS order, by keyset rather than OFFSET
+
+        The cursor holds the last row's (sort key, id), so each page is a
+        range scan of the product's index for that sort starting where the
+        previous page stopped: page 1000 costs the same as page 1. total
+        (reviews matching the filters) is only counted for the first page.
+        Raises ValueError for a cursor that does not decode.
+        """
+        column, direction = REVIEW_SORTS[sort]
+        conditions = ["product_id = ?"]
+        params = [product_id]
+        if labels:
+            conditions.append(f"sentiment_label IN ({', '.join('?' * len(labels))})")
+            params.extend(labels)
+        if min_rating is not None:
+            conditions.append("rating >= ?")
+            params.append(min_rating)
+        filters = " AND ".join(conditions)
+
+        conn = self._reader()
+        total = None
+        if cursor is None:
+            total = conn.execute(f"SELECT COUNT(*) FROM reviews WHERE {filters}", params).fetchone()[0]
+        else:
+            conditions.append(f"({column}, id) {'<' if direction == 'DESC' else '>'} (?, ?)")
+            params.extend(decode_cursor(cursor, sort))
+
+        rows = conn.execute(
+            f"SELECT id, review_text, rating, sentiment_score, sentiment_label, timestamp, {column} FROM reviews"
+            f" WHERE {' AND '.join(conditions)} ORDER BY {column} {direction}, id {direction} LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(sort, rows[-1][6], rows[-1][0])
+
+        name = conn.execute("SELECT product_name FROM products WHERE product_id = ?", (product_id,)).fetchone()
+        name = name[0] if name else ""
+        return {
+            "product_id": product_id,
+            "sort": sort,
+            "total": total,
+            "next_cursor": next_cursor,
+            "reviews": [
+                {
+                    "id": review_id,
+                    "product_name": name,
+                    "review_text": text,
+                    "rating": rating,
+                    "sentiment_score": score,
+                    "sentiment_label": label,
+                    "timestamp": timestamp_from_int(timestamp),
+                }
+                for review_id, text, rating, score, label, timestamp, _key in rows
+            ],
+        }
+
+    def search(self, query, labels=None, min_rating=None, max_rating=None, product_ids=None, limit=20, offset=0):
+        """Stored reviews matching a search box query (see fts_query), best BM25 match first
+
+        Raises ValueError if the query has no words to search for.
+        """
+        match = fts_query(query)
+        if match is None:
+            raise ValueError("Query has no words to search for")
+        conditions = []
+        params = [match]
+        if labels:
+            conditions.append(f"r.sentiment_label IN ({', '.join('?' * len(labels))})")
+            params.extend(labels)
+        if min_rating is not None:
+            conditions.append("r.rating >= ?")
+            params.append(min_rating)
+        if max_rating is not None:
+            conditions.append("r.rating <= ?")
+            params.append(max_rating)
+        if product_ids:
+            conditions.append(f"r.product_id IN ({', '.join('?' * len(product_ids))})")
+            params.extend(product_ids)
+        scored = "SELECT rowid, bm25(reviews_fts) AS score FROM reviews_fts WHERE reviews_fts MATCH ?"
+        columns = "r.id, r.product_id, r.review_text, r.rating, r.sentiment_score, r.sentiment_label, r.timestamp, m.score"
+
+        conn = self._reader()
+        # BM25 scores every match; without filters only the page's rows are joined to reviews. CROSS JOIN keeps
+        # the FTS scan as the outer loop, so a filter's index never makes SQLite run the MATCH once per review.
+        if conditions:
+            filtered = f"CROSS JOIN reviews AS r ON r.id = m.rowid WHERE {' AND '.join(conditions)}"
+            # Every filtered match is joined to be ranked, so the window count costs little more
+            rows = conn.execute(
+                f"SELECT {columns}, COUNT(*) OVER () FROM ({scored}) AS m {filtered} ORDER BY m.score LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+            if rows:
+                total = rows[0][-1]
+                rows = [row[:-1] for row in rows]
+            else:
+                total = conn.execute(
+                    f"SELECT COUNT(*) FROM (SELECT rowid FROM reviews_fts WHERE reviews_fts MATCH ?) AS m {filtered}",
+                    params,
+                ).fetchone()[0]
+        else:
+            rows = conn.execute(
+                f"SELECT {columns} FROM ({scored} ORDER BY score LIMIT ? OFFSET ?) AS m"
+                " CROSS JOIN reviews AS r ON r.id = m.rowid ORDER BY m.score",
+                (match, limit, offset),
+            ).fetchall()
+            total = conn.execute("SELECT COUNT(*) FROM reviews_fts WHERE reviews_fts MATCH ?", (match,)).fetchone()[0]
+
+        found = sorted({row[1] for row in rows})
+        names = dict(
+            conn.execute(
+                f"SELECT product_id, product_name FROM products WHERE product_id IN ({', '.join('?' * len(found))})",
+                found,
+            )
+        )
+        return {
+            "query": query,
+            "total": total,
+            "results": [
+                {
+                    "id": review_id,
+                    "product_id": product_id,
+                    "product_name": names.get(product_id, ""),
+                    "review_text": text,
+                    "rating": rating,
+                    "sentiment_score": score,
+                    "sentiment_label": label,
+                    "timestamp": timestamp_from_int(timestamp),
+                    # bm25() is lower for better matches; flipped so higher means more relevant
+                    "relevance": round(-bm25, 4),
+                }
+                for review_id, product_id, text, rating, score, label, timestamp, bm25 in rows
+            ],
+        }
+
+    def export_chunks(self, product_ids=None, labels=None, since=None, until=None, chunk_size=65536):
+        """Yield matching reviews in chunks of at most chunk_size, as FIELDS-ordered column tuples
+
+        Timestamps stay integer microseconds. The query runs on its own
+        connection, so a long export reads one consistent snapshot without
+        holding up other readers or writers.
+        """
+        conditions = ["timestamp >= ?", "timestamp < ?"]
+        params = [_timestamp_bound(since, _MIN_TIMESTAMP), _timestamp_bound(until, _MAX_TIMESTAMP)]
+        if product_ids:
+            conditions.append(f"product_id IN ({', '.join('?' * len(product_ids))})")
+            params.extend(product_ids)
+        if labels:
+            conditions.append(f"sentiment_label IN ({', '.join('?' * len(labels))})")
+            params.extend(labels)
+
+        conn = self._connect()
+        try:
+            names = dict(conn.execute("SELECT product_id, product_name FROM products"))
+            cursor = conn.execute(
+                "SELECT product_id, review_text, rating, sentiment_score, sentiment_label, timestamp FROM reviews"
+                f" WHERE {' AND '.join(conditions)}",
+                params,
+            )
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                ids, texts, ratings, scores, label_values, timestamps = zip(*rows)
+                yield [names[product_id] for product_id in ids], texts, ratings, scores, label_values, timestamps
+        finally:
+            conn.close()
+
+    def stats(self):
+        """Return stored and de-duplicated counts for /health"""
+        if not self.running:
+            return {"enabled": False}
+        products, reviews = self._reader().execute(
+            "SELECT COUNT(*), COALESCE(SUM(review_count), 0) FROM products"
+        ).fetchone()
+        return {
+            "enabled": True,
+            "products": products,
+            "reviews": reviews,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "search": self.search_enabled,
+        }
+
+
+review_store = ReviewStore()
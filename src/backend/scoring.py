@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+import config
+from cleaning import clean_texts
+from aspects import ASPECTS, no_aspects
+from memo import get_memo
+from sentiment import get_lexicon, score_batch
+
+logger = logging.getLogger(__name__)
+
+# Cleaned text never contains control characters (they count as whitespace),
+# so a chunk travels to a worker as one joined string instead of a list of str.
+SEPARATOR = "\x1f"
+
+
+def clean_and_score(texts):
+    """Clean and score texts in-process; returns (cleaned texts, scores, label codes, aspect matrix)"""
+    cleaned = clean_texts(texts)
+    scores, codes, aspects = score_batch(cleaned, memo=get_memo(), aspects=True)
+    return cleaned, scores, codes, aspects
+
+
+def _init_worker():
+    """Load the sentiment lexicon and memo once when a pool worker starts"""
+    get_lexicon()
+    get_memo()
+
+
+def _score_chunk(payload):
+    """Worker entry point: joined raw texts in, joined cleaned texts, raw arrays and memo counts out"""
+    memo = get_memo()
+    hits, lookups = memo.hits, memo.lookups
+    cleaned, scores, codes, aspects = clean_and_score(payload.split(SEPARATOR))
+    return (
+        SEPARATOR.join(cleaned),
+        scores.tobytes(),
+        codes.tobytes(),
+        aspects.tobytes(),
+        memo.hits - hits,
+        memo.lookups - lookups,
+    )
+
+
+class ScoringPool:
+    """Process pool that cleans and scores reviews off the event loop"""
+
+    def __init__(
+        self,
+        size=config.SCORING_POOL_SIZE,
+        chunk_size=config.SCORING_CHUNK_SIZE,
+        inline_threshold=config.SCORING_INLINE_THRESHOLD,
+        max_chunks_per_request=config.SCORING_MAX_CHUNKS_PER_REQUEST,
+    ):
+        self.size = size
+        self.chunk_size = max(1, chunk_size)
+        self.inline_threshold = inline_threshold
+        self.max_chunks_per_request = max(1, max_chunks_per_request)
+        self._executor = None
+        self._slots = None
+        self.busy_chunks = 0
+        self.queued_chunks = 0
+        self.chunks_scored = 0
+        self.reviews_scored = 0
+        self.worker_memo_hits = 0
+        self.worker_memo_lookups = 0
+
+    def start(self):
+        """Start the worker processes (called once at startup)"""
+        if self.size <= 0 or self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        self._slots = asyncio.Semaphore(self.size)
+        logger.info(f"Scoring pool started with {self.size} workers (chunk size {self.chunk_size})")
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _run_chunk(self, texts, request_slots):
+        payload = SEPARATOR.join(text.replace(SEPARATOR, " ") for text in texts)
+        self.queued_chunks += 1
+        started = False
+        try:
+            async with request_slots, self._slots:
+                self.queued_chunks -= 1
+                started = True
+                self.busy_chunks += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    joined, scores, codes, aspects, memo_hits, memo_lookups = await loop.run_in_executor(
+                        self._executor, _score_chunk, payload
+                    )
+                finally:
+                    self.busy_chunks -= 1
+        finally:
+            if not started:
+                self.queued_chunks -= 1
+        self.chunks_scored += 1
+        self.worker_memo_hits += memo_hits
+        self.worker_memo_lookups += memo_lookups
+        return (
+            joined.split(SEPARATOR),
+            np.frombuffer(scores, dtype=np.float64),
+            np.frombuffer(codes, dtype=np.int8),
+            np.frombuffer(aspects, dtype=np.float32).reshape(-1, len(ASPECTS)),
+        )
+
+    async def clean_and_score(self, texts):
+        """Clean and score texts; large batches are chunked across the worker processes
+
+        Returns (cleaned texts, scores, label codes, aspect matrix).
+        """
+        texts = list(texts)
+        if not texts:
+            return [], np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int8), no_aspects(0)
+
+        if self._executor is None or len(texts) < self.inline_threshold:
+            cleaned, scores, codes, aspects = await run_in_threadpool(clean_and_score, texts)
+        else:
+            # Cap in-flight chunks per request so one large scrape cannot hold every worker
+            request_slots = asyncio.Semaphore(self.max_chunks_per_request)
+            chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+            results = await asyncio.gather(*(self._run_chunk(chunk, request_slots) for chunk in chunks))
+            cleaned = [text for result in results for text in result[0]]
+            scores = np.concatenate([result[1] for result in results])
+            codes = np.concatenate([result[2] for result in results])
+            aspects = np.concatenate([result[3] for result in results])
+
+        self.reviews_scored += len(texts)
+        return cleaned, scores, codes, aspects
+
+    def stats(self):
+        """Return pool utilisation for /health"""
+        workers = self.size if self._executor is not None else 0
+        memo = get_memo().stats()
+        memo_hits = memo["hits"] + self.worker_memo_hits
+        memo_lookups = memo["lookups"] + self.worker_memo_lookups
+        return {
+            "mode": "process" if workers else "thread",
+            "workers": workers,
+            "chunk_size": self.chunk_size,
+            "busy_chunks": self.busy_chunks,
+            "queued_chunks": self.queued_chunks,
+            "utilisation": round(self.busy_chunks / workers, 2) if workers else 0.0,
+            "chunks_scored": self.chunks_scored,
+            "reviews_scored": self.reviews_scored,
+            "memo": {
+                "hits": memo_hits,
+                "lookups": memo_lookups,
+                "hit_ratio": round(memo_hits / memo_lookups, 3) if memo_lookups else 0.0,
+                "entries_in_api_process": memo["entries"],
+                "persistent": memo["persistent"],
+            },
+        }
+
+
+scoring_pool = ScoringPool()
@@ -0,0 +1,264 @@
+import asyncio
+import hashlib
+import logging
+import math
+import random
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from starlette.concurrency import run_in_threadpool
+
+import config
+from extract import ParsedPage, RawReview, review_key
+from fetcher import FetchError, fetch_engine
+from page_cache import CachedPage, page_cache
+from sites import site_registry
+
+logger = logging.getLogger(__name__)
+
+TRACKING_PARAM_PREFIXES = ("utm_", "spm", "clickTrackInfo", "fbclid", "gclid")
+
+SAMPLE_REVIEWS = [
+    ("Excellent product! Exactly as described and the quality is amazing.", 5),
+    ("Good product, fast delivery. Would recommend to others.", 5),
+    ("Very happy with this purchase, works perfectly.", 5),
+    ("Great value for money, the build quality is solid.", 4),
+    ("Nice product but the packaging could be better.", 4),
+    ("Decent quality for the price, does the job.", 4),
+    ("It is okay, nothing special but works as expected.", 3),
+    ("Average product. Delivery took longer than expected.", 3),
+    ("The size is a bit smaller than shown in the pictures.", 3),
+    ("Not as described, the color is completely different.", 2),
+    ("Poor quality, stopped working after a week.", 2),
+    ("Disappointed with the product, battery drains very fast.", 2),
+    ("Terrible experience, received a damaged item.", 1),
+    ("Worst purchase ever, complete waste of money.", 1),
+    ("Fake product, do not buy from this seller.", 1),
+]
+
+
+@dataclass
+class ScrapedProduct:
+    product_url: str
+    product_name: str
+    reviews: List[RawReview] = field(default_factory=list)
+    pages_fetched: int = 0
+    is_sample: bool = False
+    error: Optional[str] = None
+    first_page_hash: Optional[str] = None
+
+
+def normalize_product_url(product_url):
+    """Canonical form of a product URL: lowercase host, no fragment, tracking or page params, sorted query"""
+    parts = urlsplit(product_url.strip())
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key != config.SCRAPE_PAGE_PARAM and not key.startswith(TRACKING_PARAM_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def product_id(product_url):
+    """Short stable id of a product: a hash of its normalized URL"""
+    return hashlib.blake2b(normalize_product_url(product_url).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def product_name_from_url(product_url):
+    """Derive a readable product name from the URL slug"""
+    path = urlsplit(product_url).path.rstrip("/")
+    slug = path.rsplit("/", 1)[-1] if path else ""
+    slug = re.sub(r"\.html?$", "", slug)
+    slug = re.sub(r"-i\d+(-s\d+)?$", "", slug)
+    words = [word for word in re.split(r"[-_]+", slug) if word]
+    return " ".join(word.capitalize() for word in words) or "Sample Product"
+
+
+def page_fingerprint(reviews):
+    """Content hash of a page of reviews, used to detect an unchanged first page"""
+    return hashlib.sha256("\n".join(review_key(review) for review in reviews).encode("utf-8")).hexdigest()
+
+
+def watermark_position(keys, newest_keys):
+    """Find where the previous run's newest reviews start in keys (newest first)
+
+    Returns (index, confirmed). A match that runs off the end of keys is
+    returned unconfirmed: the next page is needed to be sure. Matching a run
+    of keys rather than one key keeps repeated short reviews ("Good product")
+    from ending the scan early. Returns (None, False) if there is no match.
+    """
+    if not newest_keys:
+        return None, False
+    for index in range(len(keys)):
+        window = keys[index:index + len(newest_keys)]
+        if window == newest_keys[:len(window)]:
+            return index, len(window) == len(newest_keys)
+    return None, False
+
+
+def generate_sample_reviews(product_url, count=config.SAMPLE_REVIEW_COUNT):
+    """Generate deterministic sample reviews for demo mode"""
+    seed = int(hashlib.md5(product_url.encode("utf-8")).hexdigest()[:8], 16)
+    rng = random.Random(seed)
+    reviews = []
+    for index in range(count):
+        text, rating = rng.choice(SAMPLE_REVIEWS)
+        # The same texts repeat, so each sample review gets its own id, stable across re-scrapes
+        reviews.append(RawReview(review_text=text, rating=float(rating), review_id=f"sample-{index}"))
+    return reviews
+
+
+def pages_needed(page_count, page_size, max_reviews):
+    """Number of pages to fetch so that max_reviews can be satisfied"""
+    pages = min(page_count, config.SCRAPE_MAX_PAGES)
+    if max_reviews and page_size:
+        pages = min(pages, math.ceil(max_reviews / page_size))
+    return max(1, pages)
+
+
+async def fetch_page(adapter, product_url, page_number):
+    """Fetch and parse one page of reviews, revalidating a cached copy with a conditional request
+
+    The site adapter decides the request (product page, page param or JSON
+    review API) and how to parse it. A 304 reuses the reviews parsed on the
+    last full download, so the page is neither transferred nor parsed again.
+    Pages are cached per adapter parse_version, so a changed profile or
+    extractor never replays reviews an older parser produced.
+    """
+    url, params = adapter.page_request(product_url, page_number)
+    if not page_cache.running:
+        return adapter.parse((await fetch_engine.fetch(url, params=params)).text, product_url)
+
+    # Cached reviews are only valid for the parser that produced them, so its version leads the key.
+    # A raw space never appears in a URL, so it safely separates the parts.
+    cache_url = f"{adapter.parse_version} {url}"
+    if params:
+        cache_url = f"{cache_url} {urlencode(sorted(params.items()))}"
+    cached = await run_in_threadpool(page_cache.get, cache_url)
+    headers = cached.conditional_headers() if cached is not None else None
+    page = await fetch_engine.fetch(url, params=params, headers=headers)
+    if page.not_modified and cached is not None:
+        await run_in_threadpool(page_cache.revalidated, cache_url)
+        return ParsedPage(cached.product_name, cached.page_count, [RawReview(*review) for review in cached.reviews])
+
+    parsed = adapter.parse(page.text, product_url)
+    entry = CachedPage(
+        etag=page.etag,
+        last_modified=page.last_modified,
+        product_name=parsed.product_name,
+        page_count=parsed.page_count,
+        reviews=[[review.review_text, review.rating, review.review_id] for review in parsed.reviews],
+    )
+    await run_in_threadpool(page_cache.downloaded, cache_url, entry)
+    return parsed
+
+
+async def fetch_review_page(adapter, product_url, page_number):
+    """Fetch and parse one review page"""
+    page = await fetch_page(adapter, product_url, page_number)
+    return page.reviews
+
+
+async def iter_product_pages(product, max_reviews=None, max_concurrency=None):
+    """Yield each page of reviews in page order as soon as it is available"""
+    adapter = site_registry.for_url(product.product_url)
+    concurrency = max_concurrency or adapter.page_concurrency
+    limit = max_reviews or config.SCRAPE_MAX_REVIEWS
+    remaining = limit
+    tasks = []
+
+    try:
+        first_page = await fetch_page(adapter, product.product_url, 1)
+        product.pages_fetched = 1
+        product.product_name = first_page.product_name or product.product_name
+        reviews = first_page.reviews
+        product.first_page_hash = page_fingerprint(reviews)
+        reviews = reviews[:remaining]
+        if reviews:
+            remaining -= len(reviews)
+            yield reviews
+
+        page_count = pages_needed(first_page.page_count, len(reviews), max_reviews)
+        if page_count > 1 and reviews and remaining > 0:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def fetch_one(page_number):
+                async with semaphore:
+                    try:
+                        return await fetch_review_page(adapter, product.product_url, page_number)
+                    except FetchError as e:
+                        logger.warning(f"Skipping page {page_number}: {e}")
+                        return None
+
+            # Pages download in parallel but are yielded strictly in page order
+            tasks = [asyncio.ensure_future(fetch_one(number)) for number in range(2, page_count + 1)]
+            for task in tasks:
+                page_reviews = await task
+                if page_reviews is None:
+                    continue
+                product.pages_fetched += 1
+                page_reviews = page_reviews[:remaining]
+                if page_reviews:
+                    remaining -= len(page_reviews)
+                    yield page_reviews
+                if remaining <= 0:
+                    break
+    except FetchError as e:
+        logger.warning(str(e))
+        product.error = str(e)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if remaining == limit:
+        logger.info(f"No reviews scraped from {product.product_url}, using sample data")
+        product.is_sample = True
+        yield generate_sample_reviews(product.product_url, min(config.SAMPLE_REVIEW_COUNT, limit))
+
+
+async def scrape_product(product_url, max_reviews=None, max_concurrency=None):
+    """Fetch all review pages of a product, falling back to sample data"""
+    product = ScrapedProduct(product_url=product_url, product_name=product_name_from_url(product_url))
+    async for page_reviews in iter_product_pages(product, max_reviews, max_concurrency):
+        product.reviews.extend(page_reviews)
+    return product
+
+
+async def scrape_new_reviews(product, first_page_hash, newest_keys, max_reviews=None):
+    """Fetch review pages newest first until the previous run's newest reviews show up
+
+    Returns (new reviews, watermark_found). An unchanged first page costs a
+    single request. If the watermark never shows up, every fetched review is
+    returned with watermark_found False. Raises FetchError if a page fails,
+    since the boundary with the stored reviews would be unknown.
+    """
+    limit = max_reviews or config.SCRAPE_MAX_REVIEWS
+    adapter = site_registry.for_url(product.product_url)
+    first_page = await fetch_page(adapter, product.product_url, 1)
+    product.pages_fetched = 1
+    product.product_name = first_page.product_name or product.product_name
+    reviews = first_page.reviews
+    product.first_page_hash = page_fingerprint(reviews)
+    if product.first_page_hash == first_page_hash:
+        return [], True
+
+    page_count = min(first_page.page_count, config.SCRAPE_MAX_PAGES)
+    fresh = []
+    keys = []
+    page_number = 1
+    # Pages are fetched one at a time: a daily refresh usually stops on the first or second page
+    while True:
+        fresh.extend(reviews)
+        keys.extend(review_key(review) for review in reviews)
+        position, confirmed = watermark_position(keys, newest_keys)
+        last_page = len(fresh) >= limit or page_number >= page_count
+        if position is not None and (confirmed or last_page):
+            return fresh[:min(position, limit)], True
+        if last_page:
+            return fresh[:limit], False
+        page_number += 1
+        reviews = await fetch_review_page(adapter, product.product_url, page_number)
+        product.pages_fetched += 1
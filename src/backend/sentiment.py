@@ -0,0 +1,199 @@
+import logging
+
+import numpy as np
+
+from aspects import get_extractor, no_aspects
+
+logger = logging.getLogger(__name__)
+
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+# Label codes returned by score_batch index into this tuple
+SENTIMENT_LABELS = ("Negative", "Neutral", "Positive")
+NEGATIVE, NEUTRAL, POSITIVE = 0, 1, 2
+
+# Bump the suffix whenever scoring rules change so memoized scores are not reused
+try:
+    from importlib.metadata import version as _package_version
+
+    ANALYZER_VERSION = f"pattern-{_package_version('textblob')}-1"
+except Exception:
+    ANALYZER_VERSION = "pattern-unknown-1"
+
+
+def label_for_score(score):
+    """Map a polarity score (-1..1) to a sentiment label"""
+    if score > POSITIVE_THRESHOLD:
+        return "Positive"
+    if score < NEGATIVE_THRESHOLD:
+        return "Negative"
+    return "Neutral"
+
+
+class SentimentLexicon:
+    """TextBlob's pattern sentiment lexicon compiled into flat lookup tables
+
+    score_tokens() replays PatternAnalyzer's assessment rules (modifiers,
+    negation, "!" boost, "(!)" irony, emoticons) without building per-word
+    dicts, so it returns the same polarity as TextBlob(text).sentiment.
+    """
+
+    def __init__(self):
+        from textblob._text import EMOTICONS, PUNCTUATION
+        from textblob.en import sentiment as pattern_sentiment
+
+        "good" in pattern_sentiment  # lazydict: force the XML lexicon to load
+
+        self.tokenizer = pattern_sentiment.tokenizer
+        self.negations = frozenset(pattern_sentiment.negations)
+        self.punctuation = PUNCTUATION
+
+        # token -> (polarity, intensity, is_modifier); PatternAnalyzer looks words up with pos=None
+        self.words = {}
+        for word, senses in dict.items(pattern_sentiment):
+            if None in senses:
+                polarity, _subjectivity, intensity = senses[None]
+                self.words[word] = (polarity, intensity, "RB" in senses)
+
+        # emoticon -> polarity, first match wins as in pattern's scan order
+        self.emoticons = {}
+        for (_type, polarity), faces in EMOTICONS.items():
+            for face in faces:
+                self.emoticons.setdefault(face.lower(), polarity)
+
+        logger.info(f"Compiled sentiment lexicon with {len(self.words)} words")
+
+    def tokenize(self, text):
+        """Split text into the lowercase tokens PatternAnalyzer assesses"""
+        return " ".join(self.tokenizer(text)).lower().split()
+
+    def score_tokens(self, tokens):
+        """Polarity (-1..1) of one tokenized text"""
+        words = self.words
+        negations = self.negations
+        total = 0.0
+        count = 0
+        # The most recent assessment stays open: pattern keeps editing a[-1]
+        has_last = False
+        last_p = 0.0
+        last_i = 1.0
+        last_negated = False
+        modifier = None
+        negation = None
+
+        for w in tokens:
+            entry = words.get(w)
+            if entry is not None:
+                p, i, is_modifier = entry
+                if modifier is None:
+                    if has_last:
+                        total += last_p * -0.5 if last_negated else last_p
+                        count += 1
+                    has_last, last_p, last_i, last_negated = True, p, i, False
+                else:
+                    last_p = max(-1.0, min(p * last_i, 1.0))
+                    last_i = i
+                if negation is not None:
+                    last_i = 1.0 / last_i
+                    last_negated = True
+                modifier = w if is_modifier else None
+                negation = w if w in negations else None
+                continue
+
+            if w in negations:
+                negation = w
+            elif negation and len(w.strip("'")) > 1:
+                negation = None
+            if negation is not None and modifier is not None and modifier.endswith("ly"):
+                last_negated = True
+                negation = None
+            elif modifier and len(w) > 2:
+                modifier = None
+
+            if w == "!" and has_last:
+                last_p = max(-1.0, min(last_p * 1.25, 1.0))
+            # "(!)" marks irony; it is not in the emoticon table so the two never overlap
+            added = None
+            if w == "(!)":
+                added = 0.0
+            elif not w.isalpha() and len(w) <= 5 and w not in self.punctuation:
+                added = self.emoticons.get(w)
+            if added is not None:
+                if has_last:
+                    total += last_p * -0.5 if last_negated else last_p
+                    count += 1
+                has_last, last_p, last_i, last_negated = True, added, 1.0, False
+
+        if has_last:
+            total += last_p * -0.5 if last_negated else last_p
+            count += 1
+        return total / float(count or 1)
+
+
+_lexicon = None
+
+
+def get_lexicon():
+    """Return the compiled lexicon, building it on first use"""
+    global _lexicon
+    if _lexicon is None:
+        _lexicon = SentimentLexicon()
+    return _lexicon
+
+
+def labels_for_scores(scores):
+    """Vectorized label_for_score; returns int8 codes into SENTIMENT_LABELS"""
+    codes = np.full(len(scores), NEUTRAL, dtype=np.int8)
+    codes[scores > POSITIVE_THRESHOLD] = POSITIVE
+    codes[scores < NEGATIVE_THRESHOLD] = NEGATIVE
+    return codes
+
+
+def score_batch(texts, memo=None, aspects=False):
+    """Score cleaned texts in one pass; returns (polarity float64 array, label code int8 array)
+
+    With aspects=True a third value is returned: the float32 aspect matrix
+    (one row per text, one column per aspects.ASPECTS, NaN where the text
+    does not name the aspect). Aspects are extracted from the same tokens the
+    sentiment pass produced, so a text is tokenized at most once.
+    """
+    lexicon = get_lexicon()
+    extractor = get_extractor() if aspects else None
+    # Identical texts (very common for short reviews) are tokenized and scored once
+    unique = {}
+    # text -> [(aspect code, polarity)] for texts naming at least one aspect
+    found = {}
+    for text in texts:
+        if text in unique:
+            continue
+        if not text:
+            unique[text] = 0.0
+            continue
+        tokens = None
+        score = memo.get(text) if memo is not None else None
+        if score is None:
+            tokens = lexicon.tokenize(text)
+            score = lexicon.score_tokens(tokens)
+            if memo is not None:
+                memo.put(text, score)
+        unique[text] = score
+        if extractor is not None and extractor.mentions(text):
+            mentions = extractor.extract(tokens if tokens is not None else lexicon.tokenize(text), lexicon.score_tokens)
+            if mentions:
+                found[text] = mentions
+    if memo is not None:
+        memo.flush()
+    scores = np.fromiter((unique[text] for text in texts), dtype=np.float64, count=len(texts))
+    if extractor is None:
+        return scores, labels_for_scores(scores)
+
+    matrix = no_aspects(len(texts))
+    if found:
+        for row, text in enumerate(texts):
+            mentions = found.get(text)
+            if mentions:
+                for code, polarity in mentions:
+                    matrix[row, code] = polarity
+    return scores, labels_for_scores(scores), matrix
+
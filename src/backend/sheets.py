@@ -0,0 +1,454 @@
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import requests
+
+import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    from google.auth.transport.requests import AuthorizedSession
+    from google.oauth2.service_account import Credentials
+except ImportError:  # Google Sheets support is optional
+    AuthorizedSession = None
+
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
+SHEETS_API_URL = "https://sheets.googleapis.com"
+DRIVE_API_URL = "https://www.googleapis.com"
+DOCS_URL = "https://docs.google.com"
+SPREADSHEET_MIME_TYPE = "application/vnd.google-apps.spreadsheet"
+
+SHEET_HEADERS = ["Product Name", "Review Text", "Rating", "Sentiment Score", "Sentiment Label", "Timestamp"]
+WORKSHEET_TITLE = "Reviews"
+# Drive file ids kept in reserve so submit() never waits on an API call for a new product
+ID_POOL_SIZE = 50
+
+
+class SheetsError(Exception):
+    """Raised when a Sheets or Drive API call fails"""
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        # No status means the request never got an answer (timeout, connection reset)
+        return self.status is None or self.status == 429 or self.status >= 500
+
+
+def is_configured():
+    """Check whether service account credentials (or a local emulator) are available"""
+    if config.GOOGLE_SHEETS_EMULATOR_URL:
+        return True
+    return AuthorizedSession is not None and os.path.exists(config.GOOGLE_CREDENTIALS_FILE)
+
+
+def reviews_to_rows(reviews):
+    """Spreadsheet rows from a ReviewBatch (its columns are already in SHEET_HEADERS order)"""
+    return [list(values) for values in zip(*reviews.columns())]
+
+
+class SheetsClient:
+    """Sheets v4 and Drive v3 REST calls over one authorized session"""
+
+    def __init__(
+        self,
+        session,
+        sheets_url=SHEETS_API_URL,
+        drive_url=DRIVE_API_URL,
+        docs_url=DOCS_URL,
+        timeout=config.SHEETS_TIMEOUT,
+    ):
+        self.session = session
+        self.sheets_url = sheets_url.rstrip("/")
+        self.drive_url = drive_url.rstrip("/")
+        self.docs_url = docs_url.rstrip("/")
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls):
+        """Authorize once with the service account, or talk to the emulator unauthenticated"""
+        if config.GOOGLE_SHEETS_EMULATOR_URL:
+            url = config.GOOGLE_SHEETS_EMULATOR_URL
+            return cls(requests.Session(), sheets_url=url, drive_url=url, docs_url=url)
+        credentials = Credentials.from_service_account_file(config.GOOGLE_CREDENTIALS_FILE, scopes=SCOPES)
+        return cls(AuthorizedSession(credentials))
+
+    def _call(self, method, url, body):
+        try:
+            response = self.session.request(method, url, json=body, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise SheetsError(f"{method} {url} failed: {e}")
+        if response.status_code >= 400:
+            retry_after = response.headers.get("Retry-After")
+            raise SheetsError(
+                f"{method} {url} returned HTTP {response.status_code}: {response.text[:200]}",
+                status=response.status_code,
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+        return response.json() if response.content else {}
+
+    def generate_ids(self, count):
+        """Reserve Drive file ids, so a spreadsheet's URL is known before it is created"""
+        url = f"{self.drive_url}/drive/v3/files/generateIds?count={count}&space=drive&type=files"
+        return self._call("GET", url, None)["ids"]
+
+    def spreadsheet_url(self, spreadsheet_id):
+        return f"{self.docs_url}/spreadsheets/d/{spreadsheet_id}/edit"
+
+    def create_spreadsheet(self, spreadsheet_id, title):
+        """Create a spreadsheet under a reserved id with a bold, frozen header row"""
+        body = {"id": spreadsheet_id, "name": title, "mimeType": SPREADSHEET_MIME_TYPE}
+        self._call("POST", f"{self.drive_url}/drive/v3/files", body)
+
+    def format_spreadsheet(self, spreadsheet_id):
+        """Rename the first sheet, freeze and fill the header row"""
+        header = [
+            {"userEnteredValue": {"stringValue": name}, "userEnteredFormat": {"textFormat": {"bold": True}}}
+            for name in SHEET_HEADERS
+        ]
+        body = {
+            "requests": [
+                {
+                    "updateSheetProperties": {
+                        "properties": {"sheetId": 0, "title": WORKSHEET_TITLE, "gridProperties": {"frozenRowCount": 1}},
+                        "fields": "title,gridProperties.frozenRowCount",
+                    }
+                },
+                {
+                    "updateCells": {
+                        "start": {"sheetId": 0, "rowIndex": 0, "columnIndex": 0},
+                        "rows": [{"values": header}],
+                        "fields": "userEnteredValue,userEnteredFormat.textFormat.bold",
+                    }
+                },
+            ]
+        }
+        self._call("POST", f"{self.sheets_url}/v4/spreadsheets/{spreadsheet_id}:batchUpdate", body)
+
+    def share(self, spreadsheet_id, email):
+        body = {"type": "user", "role": "writer", "emailAddress": email}
+        self._call("POST", f"{self.drive_url}/drive/v3/files/{spreadsheet_id}/permissions", body)
+
+    def batch_update_values(self, spreadsheet_id, data):
+        """Write several ranges in one values:batchUpdate call"""
+        body = {"valueInputOption": "RAW", "data": data}
+        return self._call("POST", f"{self.sheets_url}/v4/spreadsheets/{spreadsheet_id}/values:batchUpdate", body)
+
+
+class SpreadsheetRegistry:
+    """SQLite map of sheet key to spreadsheet and next free row, so restarts reuse spreadsheets
+
+    A spreadsheet is registered under its reserved id as soon as a scrape
+    asks for it and marked created once the writer thread has made it.
+    """
+
+    def __init__(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS spreadsheets ("
+            " key TEXT PRIMARY KEY, spreadsheet_id TEXT NOT NULL, url TEXT NOT NULL, next_row INTEGER NOT NULL,"
+            " title TEXT NOT NULL, created INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT spreadsheet_id, url, next_row FROM spreadsheets WHERE key = ?", (key,)
+            ).fetchone()
+
+    def add(self, key, spreadsheet_id, url, title):
+        """Register a spreadsheet that is yet to be created"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO spreadsheets (key, spreadsheet_id, url, next_row, title, created)"
+                " VALUES (?, ?, ?, 2, ?, 0)",
+                (key, spreadsheet_id, url, title),
+            )
+            self._conn.commit()
+
+    def uncreated(self, spreadsheet_id):
+        """The title of a registered spreadsheet that has not been created yet, else None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title FROM spreadsheets WHERE spreadsheet_id = ? AND created = 0", (spreadsheet_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_created(self, spreadsheet_id):
+        with self._lock:
+            self._conn.execute("UPDATE spreadsheets SET created = 1 WHERE spreadsheet_id = ?", (spreadsheet_id,))
+            self._conn.commit()
+
+    def advance(self, spreadsheet_id, rows):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE spreadsheets SET next_row = next_row + ? WHERE spreadsheet_id = ?", (rows, spreadsheet_id)
+            )
+            self._conn.commit()
+
+    def next_row(self, spreadsheet_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT next_row FROM spreadsheets WHERE spreadsheet_id = ?", (spreadsheet_id,)
+            ).fetchone()
+        return row[0] if row else 2
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM spreadsheets").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SheetsSink:
+    """Write-behind Google Sheets writer
+
+    submit() only buffers the rows. A new product's spreadsheet gets an id
+    from a pool of reserved Drive file ids, so its URL is returned at once
+    while the background thread creates it before the first write. That
+    thread flushes buffered rows on a size or time trigger as one
+    values:batchUpdate call per spreadsheet, paced under the write quota and
+    retried with exponential backoff that honours Retry-After.
+    """
+
+    def __init__(
+        self,
+        flush_rows=config.SHEETS_FLUSH_ROWS,
+        flush_interval=config.SHEETS_FLUSH_INTERVAL,
+        max_retries=config.SHEETS_MAX_RETRIES,
+        backoff_base=config.SHEETS_BACKOFF_BASE,
+        backoff_max=config.SHEETS_BACKOFF_MAX,
+        writes_per_minute=config.SHEETS_WRITES_PER_MINUTE,
+        registry_path=config.SHEETS_REGISTRY_PATH,
+    ):
+        self.flush_rows = max(1, flush_rows)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.min_write_interval = 60.0 / writes_per_minute if writes_per_minute > 0 else 0.0
+        self.registry_path = registry_path
+        self._client = None
+        self._registry = None
+        self._thread = None
+        self._ids = []
+        self._ids_lock = threading.Lock()
+        # sheet key -> lock, so concurrent scrapes of one product register a single spreadsheet
+        self._key_locks = {}
+        self._key_locks_guard = threading.Lock()
+        self._pace_lock = threading.Lock()
+        self._wake = threading.Condition()
+        self._pending = OrderedDict()
+        self._pending_rows = 0
+        self._writing_rows = 0
+        self._stopping = False
+        self._next_write_at = 0.0
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.write_requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    def start(self):
+        """Authorize the client and start the writer thread when Sheets is configured"""
+        if self._thread is not None or not is_configured():
+            return
+        try:
+            self._client = SheetsClient.from_config()
+        except Exception as e:
+            logger.error(f"Google Sheets disabled, could not authorize: {e}")
+            return
+        self._registry = SpreadsheetRegistry(self.registry_path)
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="sheets-writer", daemon=True)
+        self._thread.start()
+        logger.info(f"Google Sheets writer started (flush every {self.flush_rows} rows or {self.flush_interval}s)")
+
+    def close(self, timeout=30.0):
+        """Flush buffered rows and stop the writer thread"""
+        if self._thread is None:
+            return
+        with self._wake:
+            self._stopping = True
+            self._wake.notify()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Google Sheets writer still busy, {self._pending_rows} rows may be lost")
+        self._thread = None
+        self._registry.close()
+        self._registry = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def _refill_ids(self):
+        """Top the reserved id pool back up (called from the writer thread)"""
+        if len(self._ids) >= ID_POOL_SIZE // 2:
+            return
+        try:
+            ids = self._client.generate_ids(ID_POOL_SIZE)
+        except SheetsError as e:
+            logger.warning(f"Could not reserve spreadsheet ids: {e}")
+            return
+        with self._ids_lock:
+            self._ids.extend(ids)
+
+    def _take_id(self):
+        with self._ids_lock:
+            if self._ids:
+                return self._ids.pop()
+        # Pool drained faster than the writer refills it: one unpaced read call
+        return self._client.generate_ids(1)[0]
+
+    def _spreadsheet_for(self, key, title):
+        row = self._registry.get(key)
+        if row is not None:
+            return row[0], row[1]
+        with self._key_locks_guard:
+            lock = self._key_locks.setdefault(key, threading.Lock())
+        with lock:
+            row = self._registry.get(key)
+            if row is not None:
+                return row[0], row[1]
+            spreadsheet_id = self._take_id()
+            url = self._client.spreadsheet_url(spreadsheet_id)
+            self._registry.add(key, spreadsheet_id, url, f"Reviews - {title[:60]}")
+        with self._key_locks_guard:
+            self._key_locks.pop(key, None)
+        return spreadsheet_id, url
+
+    def submit(self, key, title, reviews):
+        """Buffer a ReviewBatch for the spreadsheet identified by key; returns (saved, sheet_url)
+
+        saved is "pending" once the rows are buffered, or False when Sheets is
+        unavailable. Never waits on the Sheets API unless the id pool is empty.
+        """
+        if not self.running:
+            return False, None
+        try:
+            spreadsheet_id, url = self._spreadsheet_for(key, title)
+        except SheetsError as e:
+            logger.error(f"Failed to reserve a spreadsheet for {title}: {e}")
+            return False, None
+
+        rows = reviews_to_rows(reviews)
+        with self._wake:
+            # An empty entry still gets a new spreadsheet created on the next flush
+            self._pending.setdefault(spreadsheet_id, []).extend(rows)
+            self._pending_rows += len(rows)
+            if self._pending_rows >= self.flush_rows:
+                self._wake.notify()
+        return "pending", url
+
+    def _run(self):
+        while True:
+            self._refill_ids()
+            with self._wake:
+                if self._pending_rows < self.flush_rows and not self._stopping:
+                    self._wake.wait(self.flush_interval)
+                pending, self._pending = self._pending, OrderedDict()
+                self._writing_rows, self._pending_rows = self._pending_rows, 0
+                stopping = self._stopping
+            for spreadsheet_id, rows in pending.items():
+                self._write(spreadsheet_id, rows)
+                self._writing_rows -= len(rows)
+            if stopping and not pending:
+                return
+
+    def _create(self, spreadsheet_id, title):
+        """Create and format a registered spreadsheet; False if it could not be created"""
+        try:
+            try:
+                self._call_with_backoff(self._client.create_spreadsheet, spreadsheet_id, title)
+            except SheetsError as e:
+                # 409: created before a restart that came ahead of mark_created
+                if e.status != 409:
+                    raise
+            self._call_with_backoff(self._client.format_spreadsheet, spreadsheet_id)
+            if config.GOOGLE_SHEET_SHARE_EMAIL:
+                self._call_with_backoff(self._client.share, spreadsheet_id, config.GOOGLE_SHEET_SHARE_EMAIL)
+        except SheetsError as e:
+            self.failures += 1
+            logger.error(f"Failed to create spreadsheet {title}: {e}")
+            return False
+        self._registry.mark_created(spreadsheet_id)
+        logger.info(f"Created spreadsheet {title}: {self._client.spreadsheet_url(spreadsheet_id)}")
+        return True
+
+    def _write(self, spreadsheet_id, rows):
+        title = self._registry.uncreated(spreadsheet_id)
+        if title is not None and not self._create(spreadsheet_id, title):
+            self.rows_dropped += len(rows)
+            return
+        # Large buffers are split so a single request stays well under the API payload limit
+        for start in range(0, len(rows), self.flush_rows):
+            chunk = rows[start:start + self.flush_rows]
+            first_row = self._registry.next_row(spreadsheet_id)
+            data = [{"range": f"{WORKSHEET_TITLE}!A{first_row}", "values": chunk}]
+            try:
+                self._call_with_backoff(self._client.batch_update_values, spreadsheet_id, data)
+            except SheetsError as e:
+                self.failures += 1
+                self.rows_dropped += len(rows) - start
+                logger.error(f"Dropping {len(rows) - start} rows for spreadsheet {spreadsheet_id}: {e}")
+                return
+            self._registry.advance(spreadsheet_id, len(chunk))
+            self.rows_written += len(chunk)
+
+    def _call_with_backoff(self, call, *args):
+        for attempt in range(self.max_retries + 1):
+            # Pace every API call so steady load stays under the per-minute write quota
+            with self._pace_lock:
+                now = time.monotonic()
+                slot = max(now, self._next_write_at)
+                self._next_write_at = slot + self.min_write_interval
+                self.write_requests += 1
+            if slot > now:
+                time.sleep(slot - now)
+            try:
+                return call(*args)
+            except SheetsError as e:
+                if not e.retryable or attempt == self.max_retries:
+                    raise
+                # Retry-After is a lower bound; keep growing the delay while the quota stays exhausted
+                backoff = max(e.retry_after or 0.0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                backoff *= random.uniform(1.0, 1.25)
+                self.retries += 1
+                logger.warning(f"Google Sheets call failed ({e.status}), retrying in {backoff:.1f}s")
+                # Hold back every other call too: the quota is per project, not per request
+                with self._pace_lock:
+                    self._next_write_at = max(self._next_write_at, time.monotonic() + backoff)
+                time.sleep(backoff)
+
+    def stats(self):
+        """Return writer counters for /health"""
+        return {
+            "running": self.running,
+            "pending_rows": self._pending_rows + self._writing_rows,
+            "rows_written": self.rows_written,
+            "rows_dropped": self.rows_dropped,
+            "write_requests": self.write_requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "spreadsheets": self._registry.count() if self._registry is not None else 0,
+        }
+
+
+sheets_sink = SheetsSink()
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key onto one in-flight job"""
+
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.waiting = 0
+
+    def in_flight(self, key):
+        return key in self._calls
+
+    def begin(self, key):
+        """Register the caller as the leader for key"""
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.leaders += 1
+        return future
+
+    def finish(self, key, result):
+        future = self._calls.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    def fail(self, key, error):
+        future = self._calls.pop(key, None)
+        if future is None or future.done():
+            return
+        if isinstance(error, Exception):
+            future.set_exception(error)
+            # Retrieve it so a job without followers does not log "exception never retrieved"
+            future.exception()
+        else:
+            # Leader was cancelled (client went away); followers retry on their own
+            future.cancel()
+
+    async def wait(self, key):
+        """Wait for the in-flight job for key
+
+        Returns None if nothing is in flight or the leader was cancelled, in
+        which case the caller should run the job itself (jobs never return None).
+        """
+        while key in self._calls:
+            future = self._calls[key]
+            self.coalesced += 1
+            self.waiting += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                logger.info("Coalesced job was cancelled by its leader")
+            finally:
+                self.waiting -= 1
+        return None
+
+    async def run(self, key, fn):
+        """Run fn() once per key at a time; concurrent callers share its result"""
+        result = await self.wait(key)
+        if result is not None:
+            return result
+
+        self.begin(key)
+        try:
+            result = await fn()
+        except BaseException as e:
+            self.fail(key, e)
+            raise
+        self.finish(key, result)
+        return result
+
+    def stats(self):
+        """Return coalescing metrics for /health"""
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced_waiters": self.coalesced,
+            "waiting": self.waiting,
+        }
+
+
+scrape_flights = SingleFlight()
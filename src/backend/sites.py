@@ -0,0 +1,263 @@
+import hashlib
+import json
+import logging
+import re
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+
+import config
+from extract import (
+    DEFAULT_PROFILE,
+    EXTRACTOR_VERSION,
+    ParsedPage,
+    RawReview,
+    SelectorProfile,
+    get_extractor,
+    parse_rating,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _dig(data, path):
+    """Value at a dotted path ("model.paging.totalPages") in decoded JSON, or None"""
+    for part in path.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(part)
+    return data
+
+
+@dataclass(frozen=True)
+class ReviewApi:
+    """A JSON endpoint that lists a product's reviews page by page
+
+    url is a template filled with {domain} (product host without "www."),
+    {item_id} (first group of item_id_pattern matched against the product
+    URL), {page} and {page_size}.
+    """
+
+    url: str
+    item_id_pattern: str
+    items_path: str
+    text_field: str
+    rating_field: str
+    id_field: Optional[str] = None
+    page_count_path: Optional[str] = None
+    page_size: int = 20
+
+
+@dataclass(frozen=True)
+class SiteAdapter:
+    """How one storefront's reviews are fetched and parsed, and how hard its hosts may be hit"""
+
+    name: str
+    hosts: Tuple[str, ...] = ()
+    profile: SelectorProfile = DEFAULT_PROFILE
+    parser: Optional[str] = None
+    api: Optional[ReviewApi] = None
+    page_param: str = config.SCRAPE_PAGE_PARAM
+    per_host_limit: int = config.FETCH_PER_HOST_LIMIT
+    # Ceiling for the adaptive per-host concurrency limit
+    max_per_host_limit: int = config.FETCH_PER_HOST_MAX
+    page_concurrency: int = config.SCRAPE_PAGE_CONCURRENCY
+    # Requests per second per host; 0 leaves pacing to the concurrency limit until a 429 sets one
+    requests_per_second: float = 0.0
+    timeout: float = config.FETCH_TIMEOUT
+
+    @property
+    def parse_version(self):
+        """Names the adapter and everything that decides what parse() returns, for the page cache key"""
+        rules = repr((self.profile, self.api, self.page_param)).encode("utf-8")
+        return f"{self.name}/{EXTRACTOR_VERSION}/{hashlib.sha1(rules).hexdigest()[:12]}"
+
+    def item_id(self, product_url):
+        if self.api is None:
+            return None
+        match = re.search(self.api.item_id_pattern, product_url)
+        return match.group(1) if match else None
+
+    def page_request(self, product_url, page_number):
+        """(url, params) of one page of reviews; page 1 of an HTML site is the product URL itself"""
+        item_id = self.item_id(product_url)
+        if item_id is not None:
+            domain = re.sub(r"^www\.", "", urlsplit(product_url.strip()).hostname or "")
+            url = self.api.url.format(domain=domain, item_id=item_id, page=page_number, page_size=self.api.page_size)
+            return url, None
+        if page_number == 1:
+            return product_url, None
+        return product_url, {self.page_param: page_number}
+
+    def parse(self, text, product_url):
+        """ParsedPage from a response to page_request"""
+        if self.item_id(product_url) is None:
+            return get_extractor(self.parser, self.profile).extract(text)
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            logger.warning(f"{self.name} review API returned a non-JSON page for {product_url}")
+            return ParsedPage(None, 1, [])
+        reviews = []
+        for item in _dig(payload, self.api.items_path) or []:
+            review_text = str(_dig(item, self.api.text_field) or "").strip()
+            if not review_text:
+                continue
+            review_id = _dig(item, self.api.id_field) if self.api.id_field else None
+            reviews.append(
+                RawReview(
+                    review_text=review_text,
+                    rating=parse_rating(_dig(item, self.api.rating_field)) or 0.0,
+                    review_id=None if review_id is None else str(review_id),
+                )
+            )
+        page_count = _dig(payload, self.api.page_count_path) if self.api.page_count_path else None
+        return ParsedPage(None, page_count if isinstance(page_count, int) and page_count > 0 else 1, reviews)
+
+
+# Daraz and Lazada share one storefront platform and its PDP review endpoint
+MARKETPLACE_REVIEW_API = ReviewApi(
+    url="https://my.{domain}/pdp/review/getReviewList?itemId={item_id}&pageSize={page_size}&filter=0&sort=0&pageNo={page}",
+    item_id_pattern=r"-i(\d+)(?:-s\d+)?(?:\.html)?",
+    items_path="model.items",
+    text_field="reviewContent",
+    rating_field="rating",
+    id_field="reviewRateId",
+    page_count_path="model.paging.totalPages",
+    page_size=20,
+)
+MARKETPLACE_PROFILE = SelectorProfile(
+    name="marketplace",
+    review_item=".mod-reviews .item",
+    review_text=".item-content .content",
+    rating_value="[data-rating]",
+    full_star=".container-star .star-icon-full",
+    pagination=".next-pagination [data-total-pages]",
+    page_link=".next-pagination a[href*='page=']",
+    embedded_json=False,
+)
+
+BUILTIN_ADAPTERS = (
+    SiteAdapter(
+        name="daraz",
+        hosts=("daraz.pk", "daraz.com.bd", "daraz.lk", "daraz.com.np", "shop.com.mm"),
+        profile=MARKETPLACE_PROFILE,
+        api=MARKETPLACE_REVIEW_API,
+        per_host_limit=4,
+        max_per_host_limit=8,
+        page_concurrency=4,
+        requests_per_second=5.0,
+        timeout=20.0,
+    ),
+    SiteAdapter(
+        name="lazada",
+        hosts=("lazada.sg", "lazada.com.my", "lazada.co.th", "lazada.com.ph", "lazada.vn", "lazada.co.id"),
+        profile=MARKETPLACE_PROFILE,
+        api=MARKETPLACE_REVIEW_API,
+        per_host_limit=4,
+        max_per_host_limit=8,
+        page_concurrency=4,
+        requests_per_second=5.0,
+        timeout=20.0,
+    ),
+)
+GENERIC_ADAPTER = SiteAdapter(name="generic")
+
+
+def adapter_from_dict(data):
+    """SiteAdapter from a JSON object, with nested "profile" and "api" objects"""
+    data = dict(data)
+    if "profile" in data:
+        data["profile"] = SelectorProfile(**{"name": data["name"], **data["profile"]})
+    if data.get("api"):
+        data["api"] = ReviewApi(**data["api"])
+    data["hosts"] = tuple(data.get("hosts", ()))
+    known = {field.name for field in fields(SiteAdapter)}
+    unknown = set(data) - known
+    if unknown:
+        raise ValueError(f"unknown adapter fields: {', '.join(sorted(unknown))}")
+    return SiteAdapter(**data)
+
+
+class SiteRegistry:
+    """Site adapters keyed by host, built once at startup
+
+    A host resolves to the adapter registered for it or for its closest
+    parent domain (www.daraz.pk and my.daraz.pk both use daraz.pk), else to
+    the generic adapter. Resolutions are memoized, so the hot path is one
+    dict lookup per request.
+    """
+
+    def __init__(self, adapters=BUILTIN_ADAPTERS, path=config.SITE_ADAPTERS_PATH, default=GENERIC_ADAPTER):
+        self.path = path
+        self.default = default
+        self._adapters = {}
+        self._by_host = {}
+        self._resolved = {}
+        self.lookups = 0
+        self.generic_lookups = 0
+        for adapter in adapters:
+            self.register(adapter)
+
+    def register(self, adapter):
+        self._adapters[adapter.name] = adapter
+        for host in adapter.hosts:
+            self._by_host[host.lower()] = adapter
+        self._resolved.clear()
+
+    def start(self):
+        """Load extra adapters from SITE_ADAPTERS_PATH; an adapter with a built-in's name replaces it"""
+        if not self.path or not Path(self.path).exists():
+            return
+        try:
+            entries = json.loads(Path(self.path).read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read site adapters from {self.path}: {e}")
+            return
+        for entry in entries:
+            try:
+                adapter = adapter_from_dict(entry)
+            except (TypeError, ValueError, KeyError) as e:
+                logger.error(f"Skipping site adapter {entry.get('name', '?')!r} in {self.path}: {e}")
+                continue
+            previous = self._adapters.get(adapter.name)
+            if previous is not None:
+                self._by_host = {host: found for host, found in self._by_host.items() if found is not previous}
+            self.register(adapter)
+        logger.info(f"Site adapters: {', '.join(sorted(self._adapters))} ({len(self._by_host)} hosts)")
+
+    def for_host(self, host):
+        self.lookups += 1
+        adapter = self._resolved.get(host)
+        if adapter is None:
+            adapter = self._resolve(host)
+            if len(self._resolved) >= 10000:
+                self._resolved.clear()
+            self._resolved[host] = adapter
+        if adapter is self.default:
+            self.generic_lookups += 1
+        return adapter
+
+    def _resolve(self, host):
+        name = (host or "").lower()
+        while name:
+            adapter = self._by_host.get(name)
+            if adapter is not None:
+                return adapter
+            name = name.partition(".")[2]
+        return self.default
+
+    def for_url(self, url):
+        return self.for_host(urlsplit(url.strip()).hostname)
+
+    def stats(self):
+        return {
+            "adapters": sorted(self._adapters),
+            "hosts": len(self._by_host),
+            "lookups": self.lookups,
+            "generic_lookups": self.generic_lookups,
+        }
+
+
+site_registry = SiteRegistry()
@@ -0,0 +1,88 @@
+import numpy as np
+
+from aspects import ASPECTS
+from sentiment import NEGATIVE_THRESHOLD, POSITIVE_THRESHOLD, SENTIMENT_LABELS
+
+# sentiment_score histogram: SCORE_BINS equal bins over [-1, 1]
+SCORE_BINS = 20
+# Rounded so an edge like -0.3 equals the score -0.3 exactly rather than -0.29999999999999993
+SCORE_EDGES = np.linspace(-1.0, 1.0, SCORE_BINS + 1).round(6)
+# Whole stars as the reviews table shows them (rating floored); 0 means unrated
+STARS = 6
+
+
+def summarize_aspects(aspects):
+    """Per-aspect mentions, mean polarity and label counts from an aspect matrix (ReviewBatch.aspects)
+
+    Column sums over the NaN mask; aspects no review names are left out and
+    the rest are ordered by mentions, most discussed first.
+    """
+    aspects = np.asarray(aspects, dtype=np.float32).reshape(-1, len(ASPECTS))
+    mentioned = ~np.isnan(aspects)
+    mentions = mentioned.sum(axis=0)
+    sums = np.where(mentioned, aspects, np.float32(0.0)).sum(axis=0, dtype=np.float64)
+    # NaN compares False, so only mentions are counted
+    with np.errstate(invalid="ignore"):
+        positive = (aspects > POSITIVE_THRESHOLD).sum(axis=0)
+        negative = (aspects < NEGATIVE_THRESHOLD).sum(axis=0)
+    neutral = mentions - positive - negative
+
+    summary = {}
+    for code in sorted(np.flatnonzero(mentions).tolist(), key=lambda code: -mentions[code]):
+        summary[ASPECTS[code]] = {
+            "mentions": int(mentions[code]),
+            "mean_score": round(float(sums[code] / mentions[code]), 3),
+            "labels": dict(zip(SENTIMENT_LABELS, (int(negative[code]), int(neutral[code]), int(positive[code])))),
+        }
+    return summary
+
+
+def summarize_columns(ratings, scores, labels, aspects=None):
+    """Dashboard aggregates of scored reviews, from their rating, score and label code columns
+
+    Label counts, mean score and rating, a sentiment_score histogram, the
+    star distribution and a star x sentiment cross-tab, computed with a
+    few bincounts so no per-review Python runs. "aspects" is None unless an
+    aspect matrix is given.
+    """
+    ratings = np.asarray(ratings, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    labels = np.asarray(labels, dtype=np.int64)
+    total = len(labels)
+
+    stars = np.clip(np.floor(np.nan_to_num(ratings)), 0, STARS - 1).astype(np.int64)
+    cross = np.bincount(stars * len(SENTIMENT_LABELS) + labels, minlength=STARS * len(SENTIMENT_LABELS))
+    cross = cross.reshape(STARS, len(SENTIMENT_LABELS))
+    rated = stars > 0
+    # Bin i holds EDGES[i] <= score < EDGES[i + 1]; a score of exactly 1.0 falls in the last bin
+    bins = np.clip(np.searchsorted(SCORE_EDGES, scores, side="right") - 1, 0, SCORE_BINS - 1)
+
+    return {
+        "total": total,
+        "labels": dict(zip(SENTIMENT_LABELS, cross.sum(axis=0).tolist())),
+        "mean_score": round(float(scores.mean()), 3) if total else None,
+        "mean_rating": round(float(ratings[rated].mean()), 2) if rated.any() else None,
+        "score_histogram": {"edges": SCORE_EDGES.tolist(), "counts": np.bincount(bins, minlength=SCORE_BINS).tolist()},
+        "ratings": {str(star): count for star, count in enumerate(cross.sum(axis=1).tolist()) if star},
+        "unrated": int(cross[0].sum()),
+        "rating_sentiment": {
+            str(star): dict(zip(SENTIMENT_LABELS, row)) for star, row in enumerate(cross.tolist()) if star
+        },
+        "aspects": None if aspects is None else summarize_aspects(aspects),
+    }
+
+
+def summarize(reviews):
+    """summarize_columns over a ReviewBatch"""
+    return summarize_columns(reviews.ratings, reviews.scores, reviews.labels, reviews.aspects)
+
+
+def summarize_rows(rows):
+    """summarize_columns over ReviewData-shaped dicts (a running job's reviews)"""
+    codes = {label: code for code, label in enumerate(SENTIMENT_LABELS)}
+    count = len(rows)
+    return summarize_columns(
+        np.fromiter((row["rating"] for row in rows), dtype=np.float64, count=count),
+        np.fromiter((row["sentiment_score"] for row in rows), dtype=np.float64, count=count),
+        np.fromiter((codes[row["sentiment_label"]] for row in rows), dtype=np.int64, count=count),
+    )
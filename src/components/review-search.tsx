@@ -0,0 +1,184 @@
+"use client"
+
+import { useState } from "react"
+import Badge from "./ui/badge"
+import { Button } from "./ui/button"
+import { Input } from "./ui/input"
+import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "./ui/card"
+import { Loader2, Search, Star } from "lucide-react"
+import { motion } from "framer-motion"
+
+interface SearchHit {
+  id: number
+  product_id: string
+  product_name: string
+  review_text: string
+  rating: number
+  sentiment_score: number
+  sentiment_label: string
+  timestamp: string
+  relevance: number
+}
+
+interface SearchResponse {
+  query: string
+  total: number
+  results: SearchHit[]
+}
+
+const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
+
+const resultsPerPage = 20
+
+const selectClassName =
+  "bg-white/10 text-white text-sm rounded-md border border-white/20 px-3 h-12 focus:outline-none focus:border-purple-400"
+
+const getSentimentColor = (label: string) => {
+  switch (label) {
+    case "Positive":
+      return "bg-green-500/20 text-green-300 border-green-500/30"
+    case "Negative":
+      return "bg-red-500/20 text-red-300 border-red-500/30"
+    default:
+      return "bg-yellow-500/20 text-yellow-300 border-yellow-500/30"
+  }
+}
+
+export function ReviewSearch() {
+  const [query, setQuery] = useState("")
+  const [label, setLabel] = useState("All")
+  const [minRating, setMinRating] = useState("")
+  const [results, setResults] = useState<SearchHit[]>([])
+  const [total, setTotal] = useState<number | null>(null)
+  const [loading, setLoading] = useState(false)
+  const [error, setError] = useState<string | null>(null)
+
+  // Searches every stored review on the backend's full-text index; offset > 0 appends the next page
+  const runSearch = async (offset: number) => {
+    if (!query.trim()) return
+    const params = new URLSearchParams({ q: query, limit: String(resultsPerPage), offset: String(offset) })
+    if (label !== "All") params.set("label", label)
+    if (minRating) params.set("min_rating", minRating)
+
+    setLoading(true)
+    setError(null)
+    try {
+      const response = await fetch(`${API_URL}/search?${params}`)
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({ detail: `HTTP ${response.status}` }))
+        throw new Error(typeof errorData.detail === "string" ? errorData.detail : `HTTP ${response.status}`)
+      }
+      const data: SearchResponse = await response.json()
+      setResults((prev) => (offset === 0 ? data.results : [...prev, ...data.results]))
+      setTotal(data.total)
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "Search failed")
+    } finally {
+      setLoading(false)
+    }
+  }
+
+  return (
+    <Card className="bg-white/10 backdrop-blur-md border-white/20 shadow-2xl">
+      <CardHeader className="pb-4">
+        <CardTitle className="flex items-center gap-3 text-white text-xl">
+          <div className="p-2 bg-gradient-to-r from-blue-500 to-cyan-500 rounded-lg">
+            <Search className="h-5 w-5 text-white" />
+          </div>
+          Search Reviews
+        </CardTitle>
+        <CardDescription className="text-white/60 text-base">
+          Find reviews across every scraped product, e.g. battery OR delivery, &quot;stopped working&quot; or refund*
+        </CardDescription>
+      </CardHeader>
+      <CardContent className="space-y-4">
+        <form
+          className="flex flex-col sm:flex-row gap-4"
+          onSubmit={(e) => {
+            e.preventDefault()
+            runSearch(0)
+          }}
+        >
+          <Input
+            placeholder="battery OR delivery"
+            value={query}
+            onChange={(e: React.ChangeEvent<HTMLInputElement>) => setQuery(e.target.value)}
+            className="flex-1 bg-white/10 border-white/20 text-white placeholder:text-white/50 focus:border-purple-400 focus:ring-purple-400/20 h-12 text-base"
+          />
+          <select
+            aria-label="Filter by sentiment"
+            value={label}
+            onChange={(e) => setLabel(e.target.value)}
+            className={selectClassName}
+          >
+            {["All", "Positive", "Neutral", "Negative"].map((option) => (
+              <option key={option} value={option} className="bg-slate-900">
+                {option === "All" ? "All sentiments" : option}
+              </option>
+            ))}
+          </select>
+          <select
+            aria-label="Minimum rating"
+            value={minRating}
+            onChange={(e) => setMinRating(e.target.value)}
+            className={selectClassName}
+          >
+            <option value="" className="bg-slate-900">
+              Any rating
+            </option>
+            {[4, 3, 2, 1].map((stars) => (
+              <option key={stars} value={stars} className="bg-slate-900">
+                {stars}+ stars
+              </option>
+            ))}
+          </select>
+          <Button
+            type="submit"
+            disabled={loading || !query.trim()}
+            className="bg-gradient-to-r from-blue-600 to-cyan-600 hover:from-blue-700 hover:to-cyan-700 text-white border-0 h-12 px-8 font-semibold shadow-lg"
+          >
+            {loading ? <Loader2 className="h-5 w-5 animate-spin" /> : "Search"}
+          </Button>
+        </form>
+
+        {error && <p className="text-sm text-red-300">{error}</p>}
+
+        {total !== null && (
+          <div className="space-y-3">
+            <p className="text-sm text-white/60">
+              {total === 0 ? "No reviews match" : `${total} matching reviews, best matches first`}
+            </p>
+            {results.map((hit, index) => (
+              <motion.div
+                key={hit.id}
+                className="rounded-lg border border-white/10 bg-white/5 p-4 space-y-2"
+                initial={{ opacity: 0, y: 10 }}
+                animate={{ opacity: 1, y: 0 }}
+                transition={{ duration: 0.3, delay: (index % resultsPerPage) * 0.03 }}
+              >
+                <div className="flex flex-wrap items-center gap-3 text-sm">
+                  <span className="font-medium text-white/90">{hit.product_name}</span>
+                  <span className="flex items-center gap-1 text-white/70">
+                    <Star className="h-4 w-4 text-yellow-400 fill-current" />
+                    {hit.rating.toFixed(1)}
+                  </span>
+                  <Badge className={`${getSentimentColor(hit.sentiment_label)} w-fit`}>{hit.sentiment_label}</Badge>
+                </div>
+                <p className="text-sm text-white/80 leading-relaxed">{hit.review_text}</p>
+              </motion.div>
+            ))}
+            {results.length < total && (
+              <button
+                onClick={() => runSearch(results.length)}
+                disabled={loading}
+                className="px-3 py-1 text-sm bg-white/10 text-white rounded border border-white/20 hover:bg-white/20 disabled:opacity-50 disabled:cursor-not-allowed transition-colors duration-200"
+              >
+                Load more
+              </button>
+            )}
+          </div>
+        )}
+      </CardContent>
+    </Card>
+  )
+}
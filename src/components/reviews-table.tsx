@@ -4,11 +4,11 @@
 import Badge from "./ui/badge"
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "./ui/card"
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "./ui/table"
-import { Star, TrendingUp, TrendingDown, Minus } from "lucide-react"
+import { Star, TrendingUp, TrendingDown, Minus, Loader2 } from "lucide-react"
 import { motion } from "framer-motion"
-import { useState } from "react"
+import { useEffect, useState } from "react"
 
-interface ReviewData {
+interface ReviewRow {
   product_name: string
   review_text: string
   rating: number
@@ -17,18 +17,101 @@ interface ReviewData {
   timestamp: string
 }
 
+interface StoredReview extends ReviewRow {
+  id: number
+}
+
+type SortOption = "newest" | "oldest" | "most_positive" | "most_negative" | "highest_rating" | "lowest_rating"
+
+interface ReviewPage {
+  product_id: string
+  sort: SortOption
+  total: number | null
+  next_cursor: string | null
+  reviews: StoredReview[]
+}
+
+// productId pages stored reviews from the backend; without it the table pages rows held by the caller:
+// the reviews a running job has scored so far (running), or a finished result the store does not have
 interface ReviewsTableProps {
-  reviews: ReviewData[]
+  productId?: string | null
+  rows?: ReviewRow[]
+  running?: boolean
 }
 
-export function ReviewsTable({ reviews }: ReviewsTableProps) {
-  const [currentPage, setCurrentPage] = useState(1)
-  const reviewsPerPage = 10
-  const totalPages = Math.ceil(reviews.length / reviewsPerPage)
+const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
 
+const reviewsPerPage = 10
+
+const SORT_OPTIONS: { value: SortOption; label: string }[] = [
+  { value: "newest", label: "Newest" },
+  { value: "oldest", label: "Oldest" },
+  { value: "most_positive", label: "Most positive" },
+  { value: "most_negative", label: "Most negative" },
+  { value: "highest_rating", label: "Highest rating" },
+  { value: "lowest_rating", label: "Lowest rating" },
+]
+
+const selectClassName =
+  "bg-white/10 text-white text-sm rounded border border-white/20 px-2 py-1 focus:outline-none focus:border-purple-400"
+
+export function ReviewsTable({ productId, rows = [], running = false }: ReviewsTableProps) {
+  const local = !productId
+  const [sort, setSort] = useState<SortOption>("newest")
+  const [label, setLabel] = useState("All")
+  const [minRating, setMinRating] = useState("")
+  // One cursor per page visited so far; the last one fetches the current page (null is the first page)
+  const [cursors, setCursors] = useState<(string | null)[]>([null])
+  const [page, setPage] = useState<ReviewPage | null>(null)
+  const [total, setTotal] = useState<number | null>(null)
+  const [loading, setLoading] = useState(!local)
+  const [error, setError] = useState<string | null>(null)
+  const [localPage, setLocalPage] = useState(1)
+
+  const cursor = cursors[cursors.length - 1]
+  const currentPage = local ? localPage : cursors.length
   const startIndex = (currentPage - 1) * reviewsPerPage
-  const endIndex = startIndex + reviewsPerPage
-  const currentReviews = reviews.slice(startIndex, endIndex)
+  const currentReviews: (ReviewRow & { id?: number })[] = local
+    ? rows.slice(startIndex, startIndex + reviewsPerPage)
+    : page?.reviews ?? []
+  const shownTotal = local ? rows.length : total
+  const hasNextPage = local ? startIndex + reviewsPerPage < rows.length : Boolean(page?.next_cursor)
+
+  // Only the visible page is fetched; the backend seeks to it through its index instead of sending every review
+  useEffect(() => {
+    if (!productId) return
+    const controller = new AbortController()
+    const params = new URLSearchParams({ sort, limit: String(reviewsPerPage) })
+    if (cursor) params.set("cursor", cursor)
+    if (label !== "All") params.set("label", label)
+    if (minRating) params.set("min_rating", minRating)
+
+    setLoading(true)
+    fetch(`${API_URL}/products/${encodeURIComponent(productId)}/reviews?${params}`, { signal: controller.signal })
+      .then(async (response) => {
+        if (!response.ok) {
+          throw new Error(`HTTP ${response.status}`)
+        }
+        const data: ReviewPage = await response.json()
+        setPage(data)
+        if (data.total !== null) {
+          setTotal(data.total)
+        }
+        setError(null)
+        setLoading(false)
+      })
+      .catch((err) => {
+        if (err instanceof Error && err.name === "AbortError") return
+        setError(err instanceof Error ? err.message : "Failed to load reviews")
+        setLoading(false)
+      })
+    return () => controller.abort()
+  }, [productId, sort, label, minRating, cursor])
+
+  const changeFilter = (apply: () => void) => {
+    apply()
+    setCursors([null])
+  }
 
   const getSentimentIcon = (label: string) => {
     switch (label) {
@@ -59,7 +142,7 @@ export function ReviewsTable({ reviews }: ReviewsTableProps) {
     ))
   }
 
-  if (!reviews || reviews.length === 0) {
+  if (!loading && !error && shownTotal === 0 && label === "All" && !minRating) {
     return (
       <Card className="bg-white/10 backdrop-blur-md border-white/20 shadow-xl">
         <CardHeader>
@@ -79,12 +162,65 @@ export function ReviewsTable({ reviews }: ReviewsTableProps) {
     <motion.div initial={{ opacity: 0, y: 20 }} animate={{ opacity: 1, y: 0 }} transition={{ duration: 0.5 }}>
       <Card className="bg-white/10 backdrop-blur-md border-white/20 shadow-xl hover:shadow-2xl transition-all duration-300">
         <CardHeader className="pb-4">
-          <CardTitle className="text-white text-lg">Product Reviews ({reviews.length})</CardTitle>
+          <CardTitle className="text-white text-lg flex items-center gap-2">
+            Product Reviews {shownTotal !== null && `(${shownTotal})`}
+            {(loading || running) && <Loader2 className="h-4 w-4 animate-spin text-white/60" />}
+          </CardTitle>
           <CardDescription className="text-white/60">
-            Scraped reviews with AI-powered sentiment analysis results
+            {running
+              ? "Reviews scored so far; sorting and filters are available once the scrape finishes"
+              : local
+                ? "Scraped reviews with AI-powered sentiment analysis results; sorting and filters need the review store"
+                : "Scraped reviews with AI-powered sentiment analysis results"}
           </CardDescription>
         </CardHeader>
         <CardContent>
+          {!local && (
+            <div className="flex flex-wrap items-center gap-3 mb-4">
+              <select
+                aria-label="Sort reviews"
+                value={sort}
+                onChange={(e) => changeFilter(() => setSort(e.target.value as SortOption))}
+                className={selectClassName}
+              >
+                {SORT_OPTIONS.map((option) => (
+                  <option key={option.value} value={option.value} className="bg-slate-900">
+                    {option.label}
+                  </option>
+                ))}
+              </select>
+              <select
+                aria-label="Filter by sentiment"
+                value={label}
+                onChange={(e) => changeFilter(() => setLabel(e.target.value))}
+                className={selectClassName}
+              >
+                {["All", "Positive", "Neutral", "Negative"].map((option) => (
+                  <option key={option} value={option} className="bg-slate-900">
+                    {option === "All" ? "All sentiments" : option}
+                  </option>
+                ))}
+              </select>
+              <select
+                aria-label="Minimum rating"
+                value={minRating}
+                onChange={(e) => changeFilter(() => setMinRating(e.target.value))}
+                className={selectClassName}
+              >
+                <option value="" className="bg-slate-900">
+                  Any rating
+                </option>
+                {[4, 3, 2, 1].map((stars) => (
+                  <option key={stars} value={stars} className="bg-slate-900">
+                    {stars}+ stars
+                  </option>
+                ))}
+              </select>
+            </div>
+          )}
+
+          {error && <p className="text-sm text-red-300 mb-4">Could not load reviews: {error}</p>}
+
           <div className="overflow-hidden rounded-lg border border-white/10">
             <div className="overflow-x-auto">
               <Table>
@@ -99,7 +235,7 @@ export function ReviewsTable({ reviews }: ReviewsTableProps) {
                 <TableBody>
                   {currentReviews.map((review, index) => (
                     <motion.tr
-                      key={startIndex + index}
+                      key={review.id ?? startIndex + index}
                       className="border-white/10 hover:bg-white/5 transition-colors duration-200"
                       initial={{ opacity: 0, x: -20 }}
                       animate={{ opacity: 1, x: 0 }}
@@ -140,26 +276,39 @@ export function ReviewsTable({ reviews }: ReviewsTableProps) {
             </div>
           </div>
 
-          {/* Pagination */}
-          {totalPages > 1 && (
+          {!loading && currentReviews.length === 0 && (
+            <p className="text-sm text-white/50 text-center py-8">No reviews match these filters</p>
+          )}
+
+          {/* Pagination: Next follows the page's cursor, Previous goes back to the cursor before it */}
+          {(currentPage > 1 || hasNextPage) && (
             <div className="flex flex-col sm:flex-row items-center justify-between gap-4 mt-6 pt-4 border-t border-white/10">
               <p className="text-sm text-white/60">
-                Showing {startIndex + 1} to {Math.min(endIndex, reviews.length)} of {reviews.length} reviews
+                Showing {startIndex + 1} to {startIndex + currentReviews.length}
+                {shownTotal !== null && ` of ${shownTotal}`} reviews
               </p>
               <div className="flex items-center gap-2">
                 <button
-                  onClick={() => setCurrentPage((prev) => Math.max(prev - 1, 1))}
-                  disabled={currentPage === 1}
+                  onClick={() => (local ? setLocalPage((prev) => prev - 1) : setCursors((prev) => prev.slice(0, -1)))}
+                  disabled={currentPage === 1 || loading}
                   className="px-3 py-1 text-sm bg-white/10 text-white rounded border border-white/20 hover:bg-white/20 disabled:opacity-50 disabled:cursor-not-allowed transition-colors duration-200"
                 >
                   Previous
                 </button>
                 <span className="px-3 py-1 text-sm text-white/80">
-                  Page {currentPage} of {totalPages}
+                  Page {currentPage}
+                  {shownTotal !== null && ` of ${Math.max(1, Math.ceil(shownTotal / reviewsPerPage))}`}
                 </span>
                 <button
-                  onClick={() => setCurrentPage((prev) => Math.min(prev + 1, totalPages))}
-                  disabled={currentPage === totalPages}
+                  onClick={() => {
+                    if (local) {
+                      setLocalPage((prev) => prev + 1)
+                      return
+                    }
+                    const next = page?.next_cursor
+                    if (next) setCursors((prev) => [...prev, next])
+                  }}
+                  disabled={!hasNextPage || loading}
                   className="px-3 py-1 text-sm bg-white/10 text-white rounded border border-white/20 hover:bg-white/20 disabled:opacity-50 disabled:cursor-not-allowed transition-colors duration-200"
                 >
                   Next
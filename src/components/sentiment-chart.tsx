@@ -1,24 +1,47 @@
 "use client"
 
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "./ui/card"
-import { PieChart, Pie, Cell, ResponsiveContainer, BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip } from "recharts"
+import {
+  PieChart,
+  Pie,
+  Cell,
+  ResponsiveContainer,
+  BarChart,
+  Bar,
+  XAxis,
+  YAxis,
+  CartesianGrid,
+  Tooltip,
+  Legend,
+} from "recharts"
 import { motion } from "framer-motion"
 
-interface ReviewData {
-  product_name: string
-  review_text: string
-  rating: number
-  sentiment_score: number
-  sentiment_label: string
-  timestamp: string
+// Aggregates computed by the backend (ScrapeResponse.summary), so charts never see raw reviews
+export interface ReviewSummary {
+  total: number
+  labels: Record<string, number>
+  mean_score: number | null
+  mean_rating: number | null
+  score_histogram: { edges: number[]; counts: number[] }
+  ratings: Record<string, number>
+  unrated: number
+  rating_sentiment: Record<string, Record<string, number>>
+  // Most discussed first; null while a job is still running
+  aspects?: Record<string, { mentions: number; mean_score: number; labels: Record<string, number> }> | null
 }
 
 interface SentimentChartProps {
-  data: ReviewData[]
+  summary: ReviewSummary | null
 }
 
-export function SentimentChart({ data }: SentimentChartProps) {
-  if (!data || data.length === 0) {
+const SENTIMENT_COLORS: Record<string, string> = {
+  Positive: "#10b981",
+  Negative: "#ef4444",
+  Neutral: "#f59e0b",
+}
+
+export function SentimentChart({ summary }: SentimentChartProps) {
+  if (!summary || summary.total === 0) {
     return (
       <Card className="bg-white/10 backdrop-blur-md border-white/20 shadow-xl">
         <CardHeader>
@@ -34,23 +57,28 @@ export function SentimentChart({ data }: SentimentChartProps) {
     )
   }
 
-  const sentimentData = data.reduce(
-    (acc, review) => {
-      const sentiment = review.sentiment_label || "Neutral"
-      const existing = acc.find((item) => item.sentiment === sentiment)
-      if (existing) {
-        existing.count += 1
-      } else {
-        acc.push({
-          sentiment: sentiment,
-          count: 1,
-          color: sentiment === "Positive" ? "#10b981" : sentiment === "Negative" ? "#ef4444" : "#f59e0b",
-        })
-      }
-      return acc
-    },
-    [] as Array<{ sentiment: string; count: number; color: string }>,
-  )
+  const sentimentData = Object.entries(summary.labels)
+    .filter(([, count]) => count > 0)
+    .map(([sentiment, count]) => ({ sentiment, count, color: SENTIMENT_COLORS[sentiment] ?? SENTIMENT_COLORS.Neutral }))
+
+  const { edges, counts } = summary.score_histogram
+  const histogramData = counts.map((count, index) => ({
+    range: `${edges[index].toFixed(1)} to ${edges[index + 1].toFixed(1)}`,
+    bin: edges[index].toFixed(1),
+    count,
+  }))
+
+  const ratingData = Object.entries(summary.rating_sentiment).map(([stars, labels]) => ({
+    stars: `${stars}★`,
+    ...labels,
+  }))
+
+  const aspectData = Object.entries(summary.aspects ?? {}).map(([aspect, { mentions, mean_score, labels }]) => ({
+    aspect: aspect.charAt(0).toUpperCase() + aspect.slice(1),
+    mentions,
+    mean_score,
+    ...labels,
+  }))
 
   const CustomTooltip = ({ active, payload, label }: any) => {
     if (active && payload && payload.length) {
@@ -58,7 +86,7 @@ export function SentimentChart({ data }: SentimentChartProps) {
         <div className="bg-black/80 backdrop-blur-md p-3 border border-white/20 rounded-lg shadow-xl">
           <p className="font-medium text-white">{payload[0].payload.sentiment || label}</p>
           <p className="text-sm text-white/70">Count: {payload[0].value}</p>
-          <p className="text-sm text-white/70">Percentage: {((payload[0].value / data.length) * 100).toFixed(1)}%</p>
+          <p className="text-sm text-white/70">Percentage: {((payload[0].value / summary.total) * 100).toFixed(1)}%</p>
         </div>
       )
     }
@@ -77,7 +105,7 @@ export function SentimentChart({ data }: SentimentChartProps) {
           <CardHeader className="pb-4">
             <CardTitle className="text-white text-lg">Sentiment Distribution</CardTitle>
             <CardDescription className="text-white/60">
-              Overall sentiment breakdown of {data.length} reviews
+              Overall sentiment breakdown of {summary.total} reviews
             </CardDescription>
           </CardHeader>
           <CardContent>
@@ -140,6 +168,112 @@ export function SentimentChart({ data }: SentimentChartProps) {
           </CardContent>
         </Card>
       </motion.div>
+
+      {/* Score Histogram */}
+      <motion.div
+        initial={{ opacity: 0, scale: 0.9 }}
+        animate={{ opacity: 1, scale: 1 }}
+        transition={{ duration: 0.5, delay: 0.4 }}
+      >
+        <Card className="bg-white/10 backdrop-blur-md border-white/20 shadow-xl hover:shadow-2xl transition-all duration-300">
+          <CardHeader className="pb-4">
+            <CardTitle className="text-white text-lg">Sentiment Scores</CardTitle>
+            <CardDescription className="text-white/60">
+              Distribution of scores from -1 to 1
+              {summary.mean_score !== null && ` (mean ${summary.mean_score.toFixed(2)})`}
+            </CardDescription>
+          </CardHeader>
+          <CardContent>
+            <div className="h-[200px] sm:h-[240px]">
+              <ResponsiveContainer width="100%" height="100%">
+                <BarChart data={histogramData} margin={{ top: 20, right: 30, left: 20, bottom: 5 }}>
+                  <CartesianGrid strokeDasharray="3 3" stroke="rgba(255,255,255,0.1)" />
+                  <XAxis dataKey="bin" stroke="rgba(255,255,255,0.7)" fontSize={10} interval={3} />
+                  <YAxis stroke="rgba(255,255,255,0.7)" fontSize={12} />
+                  <Tooltip
+                    contentStyle={{ background: "rgba(0,0,0,0.8)", border: "1px solid rgba(255,255,255,0.2)" }}
+                    labelFormatter={(_bin, items) => items?.[0]?.payload.range ?? ""}
+                  />
+                  <Bar dataKey="count" fill="#8b5cf6" radius={[2, 2, 0, 0]} />
+                </BarChart>
+              </ResponsiveContainer>
+            </div>
+          </CardContent>
+        </Card>
+      </motion.div>
+
+      {/* Rating vs Sentiment */}
+      <motion.div
+        initial={{ opacity: 0, scale: 0.9 }}
+        animate={{ opacity: 1, scale: 1 }}
+        transition={{ duration: 0.5, delay: 0.6 }}
+      >
+        <Card className="bg-white/10 backdrop-blur-md border-white/20 shadow-xl hover:shadow-2xl transition-all duration-300">
+          <CardHeader className="pb-4">
+            <CardTitle className="text-white text-lg">Rating vs Sentiment</CardTitle>
+            <CardDescription className="text-white/60">
+              Sentiment of reviews at each star rating
+              {summary.mean_rating !== null && ` (average ${summary.mean_rating.toFixed(1)}★)`}
+            </CardDescription>
+          </CardHeader>
+          <CardContent>
+            <div className="h-[220px] sm:h-[260px]">
+              <ResponsiveContainer width="100%" height="100%">
+                <BarChart data={ratingData} margin={{ top: 20, right: 30, left: 20, bottom: 5 }}>
+                  <CartesianGrid strokeDasharray="3 3" stroke="rgba(255,255,255,0.1)" />
+                  <XAxis dataKey="stars" stroke="rgba(255,255,255,0.7)" fontSize={12} />
+                  <YAxis stroke="rgba(255,255,255,0.7)" fontSize={12} />
+                  <Tooltip contentStyle={{ background: "rgba(0,0,0,0.8)", border: "1px solid rgba(255,255,255,0.2)" }} />
+                  <Legend wrapperStyle={{ fontSize: 12 }} />
+                  {Object.keys(SENTIMENT_COLORS).map((label) => (
+                    <Bar key={label} dataKey={label} stackId="sentiment" fill={SENTIMENT_COLORS[label]} />
+                  ))}
+                </BarChart>
+              </ResponsiveContainer>
+            </div>
+          </CardContent>
+        </Card>
+      </motion.div>
+
+      {/* Aspects */}
+      {aspectData.length > 0 && (
+        <motion.div
+          initial={{ opacity: 0, scale: 0.9 }}
+          animate={{ opacity: 1, scale: 1 }}
+          transition={{ duration: 0.5, delay: 0.8 }}
+        >
+          <Card className="bg-white/10 backdrop-blur-md border-white/20 shadow-xl hover:shadow-2xl transition-all duration-300">
+            <CardHeader className="pb-4">
+              <CardTitle className="text-white text-lg">Aspects</CardTitle>
+              <CardDescription className="text-white/60">
+                What reviews talk about, and the sentiment of the sentences that mention it
+              </CardDescription>
+            </CardHeader>
+            <CardContent>
+              <div className="h-[240px] sm:h-[280px]">
+                <ResponsiveContainer width="100%" height="100%">
+                  <BarChart data={aspectData} layout="vertical" margin={{ top: 5, right: 30, left: 20, bottom: 5 }}>
+                    <CartesianGrid strokeDasharray="3 3" stroke="rgba(255,255,255,0.1)" />
+                    <XAxis type="number" stroke="rgba(255,255,255,0.7)" fontSize={12} />
+                    <YAxis type="category" dataKey="aspect" stroke="rgba(255,255,255,0.7)" fontSize={12} width={90} />
+                    <Tooltip
+                      contentStyle={{ background: "rgba(0,0,0,0.8)", border: "1px solid rgba(255,255,255,0.2)" }}
+                      labelFormatter={(aspect, items) => {
+                        const entry = items?.[0]?.payload
+                        return entry ? `${aspect}: ${entry.mentions} mentions, mean ${entry.mean_score.toFixed(2)}` : aspect
+                      }}
+                    />
+                    <Legend wrapperStyle={{ fontSize: 12 }} />
+                    {Object.keys(SENTIMENT_COLORS).map((label) => (
+                      <Bar key={label} dataKey={label} stackId="aspect" fill={SENTIMENT_COLORS[label]} />
+                    ))}
+                  </BarChart>
+                </ResponsiveContainer>
+              </div>
+            </CardContent>
+          </Card>
+        </motion.div>
+      )}
     </div>
   )
 }
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from aspects import ASPECTS, get_extractor, no_aspects  # noqa: E402
+from bench_sentiment import GOLDEN_CORPUS  # noqa: E402
+from sentiment import get_lexicon, score_batch  # noqa: E402
+from summary import summarize_aspects  # noqa: E402
+
+# Review -> {aspect: sign of its polarity}; 0 is neutral
+GOLDEN_ASPECTS = [
+    ("Great quality :) but slow delivery :(", {"quality": 1, "delivery": -1}),
+    ("Not as described", {"description": -1}),
+    ("Size is small; color is different; quality is poor!", {"size": -1, "design": 0, "quality": -1}),
+    ("Super fast delivery and the battery lasts very long", {"delivery": 1, "battery": 1}),
+    ("Cheap plastic, feels fragile and flimsy. Not worth the price.", {"price": -1}),
+    ("Excellent build quality, although the battery life is terrible", {"quality": 1, "battery": -1}),
+    ("Customer service never answered and no refund", {"service": -1}),
+    ("Good value for money. Arrived on time.", {"price": 1, "delivery": 0}),
+    ("Terribly bad packaging, extremely disappointed.", {"packaging": -1}),
+    ("Good product", {}),
+]
+
+
+def check_golden_aspects():
+    """Aspects found and the sign of their polarity on hand-labelled reviews"""
+    _scores, _codes, matrix = score_batch([text for text, _expected in GOLDEN_ASPECTS], aspects=True)
+    failures = 0
+    for (text, expected), row in zip(GOLDEN_ASPECTS, matrix):
+        found = {ASPECTS[code]: int(np.sign(row[code])) for code in np.flatnonzero(~np.isnan(row)).tolist()}
+        if found != expected:
+            failures += 1
+            print(f"   ❌ {text!r}: found {found}, expected {expected}")
+    if failures:
+        print(f"❌ {failures} of {len(GOLDEN_ASPECTS)} golden reviews have the wrong aspects")
+        return False
+    print(f"✅ Aspects and their sentiment are right on {len(GOLDEN_ASPECTS)} golden reviews")
+    return True
+
+
+def build_corpus(size):
+    """Benchmark corpus of golden reviews joined three at a time"""
+    rng = random.Random(42)
+    pool = [text for text in GOLDEN_CORPUS if text] + [text for text, _expected in GOLDEN_ASPECTS]
+    return [" ".join(rng.choice(pool) for _ in range(3)) for _ in range(size)]
+
+
+def separate_passes(texts):
+    """Sentiment and aspects as two independent passes, each tokenizing every review"""
+    lexicon = get_lexicon()
+    extractor = get_extractor()
+    scores, codes = score_batch(texts)
+    matrix = no_aspects(len(texts))
+    for row, text in enumerate(texts):
+        for code, polarity in extractor.extract(lexicon.tokenize(text), lexicon.score_tokens):
+            matrix[row, code] = polarity
+    return scores, codes, matrix
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def benchmark(size, rows):
+    corpus = build_corpus(size)
+    score_batch(corpus[:10], aspects=True)  # compile the lexicon and extractor outside the timed region
+
+    (_scores, _codes), sentiment_time = timed(score_batch, corpus)
+    (scores, _codes, shared), shared_time = timed(lambda texts: score_batch(texts, aspects=True), corpus)
+    (separate_scores, _codes, separate), separate_time = timed(separate_passes, corpus)
+    identical = np.array_equal(scores, separate_scores) and np.array_equal(shared, separate, equal_nan=True)
+
+    print(f"\n📊 Aspect extraction ({size} reviews, {len(set(corpus))} distinct)")
+    print("=" * 60)
+    print(f"   Sentiment only:                  {size / sentiment_time:10.0f} reviews/sec")
+    print(f"   Sentiment + aspects, one pass:   {size / shared_time:10.0f} reviews/sec")
+    print(f"   Sentiment, then aspects apart:   {size / separate_time:10.0f} reviews/sec")
+    print(f"   Aspect overhead: {shared_time / sentiment_time - 1:+.0%} shared tokens,"
+          f" {separate_time / sentiment_time - 1:+.0%} separate passes")
+    print(f"   Identical results:               {identical}")
+
+    # Aggregation over a product-sized matrix: aspects mentioned by ~15% of reviews each
+    rng = np.random.default_rng(0)
+    matrix = rng.uniform(-1.0, 1.0, size=(rows, len(ASPECTS))).astype(np.float32)
+    matrix[rng.random(matrix.shape) > 0.15] = np.nan
+    summary, aggregate_time = timed(summarize_aspects, matrix)
+    mentions = sum(entry["mentions"] for entry in summary.values())
+    print(f"\n📊 Per-product aggregation of {rows:,} reviews x {len(ASPECTS)} aspects")
+    print(f"   summarize_aspects: {aggregate_time * 1000:.1f} ms ({mentions:,} mentions)")
+    return identical and mentions == int((~np.isnan(matrix)).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aspect extraction cost on top of sentiment scoring")
+    parser.add_argument("--size", type=int, default=20000, help="Reviews in the extraction corpus")
+    parser.add_argument("--rows", type=int, default=1000000, help="Reviews in the aggregation benchmark")
+    options = parser.parse_args()
+
+    print("🧪 Checking golden aspects...")
+    if not check_golden_aspects():
+        return False
+    return benchmark(options.size, options.rows)
+
+
+if __name__ == "__main__":
+    if main():
+        print("\n✅ Aspect benchmark completed!")
+    else:
+        print("\n❌ Aspect benchmark failed!")
+        sys.exit(1)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from cleaning import clean_text, clean_texts  # noqa: E402
+from scraper import SAMPLE_REVIEWS  # noqa: E402
+
+GOLDEN_PATH = Path(__file__).resolve().parent / "fixtures" / "cleaning_golden.json"
+
+# The cleaner this replaced: two regex passes and a strip
+_WHITESPACE_RE = re.compile(r"\s+")
+_SPECIAL_CHARS_RE = re.compile(r"[^\w\s.,!?'\"()\-:;/%&]")
+
+
+def regex_clean_text(text):
+    if not text:
+        return ""
+    return _WHITESPACE_RE.sub(" ", _SPECIAL_CHARS_RE.sub(" ", str(text))).strip()
+
+
+def check_golden():
+    """clean_text and clean_texts must both reproduce the saved outputs"""
+    cases = json.loads(GOLDEN_PATH.read_text(encoding="utf-8"))
+    inputs = [case["input"] for case in cases]
+    expected = [case["expected"] for case in cases]
+    ok = True
+    for case in cases:
+        cleaned = clean_text(case["input"])
+        if cleaned != case["expected"]:
+            print(f"   ❌ {case['name']}: {cleaned!r} != {case['expected']!r}")
+            ok = False
+    if clean_texts(inputs + inputs) != expected + expected:
+        print("   ❌ clean_texts differs from clean_text on the golden cases")
+        ok = False
+    # Scoring chunks are joined with \x1f, so cleaned text must never contain control characters
+    if any(char < " " for text in expected for char in text):
+        print("   ❌ control characters survive cleaning")
+        ok = False
+    if ok:
+        print(f"✅ {len(cases)} golden cases match")
+    return ok
+
+
+def build_corpus(count, seed=7, unique=True):
+    """Review-like texts: mostly plain English, some with emoji, entities and non-Latin scripts"""
+    rng = random.Random(seed)
+    golden = [case["input"] for case in json.loads(GOLDEN_PATH.read_text(encoding="utf-8"))]
+    plain = [text for text, _rating in SAMPLE_REVIEWS]
+    corpus = []
+    for i in range(count):
+        parts = rng.sample(plain, rng.randint(1, 4))
+        if rng.random() < 0.2:
+            parts.append(rng.choice(golden))
+        # A unique suffix keeps clean_texts from winning by de-duplication alone
+        corpus.append(" ".join(parts) + (f" #{i}" if unique else ""))
+    return corpus
+
+
+def measure(function, texts, repeats):
+    """Best MB/s of UTF-8 input over repeats"""
+    size = sum(len(text.encode("utf-8", "surrogatepass")) for text in texts) / 1e6
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function(texts)
+        best = min(best, time.perf_counter() - started)
+    return size / best
+
+
+def benchmark(count, repeats):
+    corpus = build_corpus(count)
+    ascii_corpus = [text for text in corpus if text.isascii()]
+    repeated_corpus = build_corpus(count, unique=False)
+    print(f"\n📊 Cleaning throughput (best of {repeats}, MB/s of input)")
+    print("=" * 60)
+    print(f"   {'cleaner':24}{'mixed':>10}{'ASCII only':>12}{'repeated':>10}")
+    runs = [
+        ("regex (previous)", lambda texts: [regex_clean_text(text) for text in texts]),
+        ("clean_text", lambda texts: [clean_text(text) for text in texts]),
+        ("clean_texts (batch)", clean_texts),
+    ]
+    for name, function in runs:
+        print(
+            f"   {name:24}{measure(function, corpus, repeats):>10.1f}"
+            f"{measure(function, ascii_corpus, repeats):>12.1f}{measure(function, repeated_corpus, repeats):>10.1f}"
+        )
+    print(
+        f"   ({len(corpus)} reviews, {len(ascii_corpus)} of them ASCII; "
+        f"repeated has {len(set(repeated_corpus))} distinct texts)"
+    )
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Golden-output check and throughput benchmark for review cleaning")
+    parser.add_argument("--reviews", type=int, default=50000)
+    parser.add_argument("--repeats", type=int, default=5)
+    options = parser.parse_args()
+
+    print("🧪 Checking text cleaning against golden outputs...")
+    if not check_golden():
+        return False
+    return benchmark(options.reviews, options.repeats)
+
+
+if __name__ == "__main__":
+    if main():
+        print("\n✅ Cleaning benchmark completed!")
+    else:
+        print("\n❌ Cleaning benchmark failed!")
+        sys.exit(1)
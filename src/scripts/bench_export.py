@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import io
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from bench_review_batch import scored_reviews  # noqa: E402
+from export import PYARROW_AVAILABLE, export_stream  # noqa: E402
+from review_batch import ReviewBatch  # noqa: E402
+from review_store import ReviewStore  # noqa: E402
+from summary import summarize  # noqa: E402
+
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+
+def build_store(path, products, per_product):
+    """A review store holding products x per_product reviews, one scrape a day per product"""
+    store = ReviewStore(enabled=True, path=path)
+    store.start()
+    texts, ratings, scores, codes = scored_reviews(per_product)
+    started = datetime(2024, 1, 1)
+    for index in range(products):
+        batch = ReviewBatch.from_scored(
+            f"Product {index}",
+            texts,
+            ratings,
+            scores,
+            codes,
+            started + timedelta(days=index),
+            review_keys=[f"{index}-{number}" for number in range(len(texts))],
+        )
+        store.save(f"product-{index}", f"https://shop.example/products/{index}", f"Product {index}", batch, summarize(batch))
+    return store
+
+
+def count_rows(export_format, body):
+    """Rows in an export body, read back with the format's own reader"""
+    if export_format == "csv":
+        return sum(1 for _ in csv.reader(io.StringIO(body.decode("utf-8")))) - 1
+    if export_format == "arrow":
+        return pa.ipc.open_stream(body).read_all().num_rows
+    return pq.read_metadata(pa.BufferReader(body)).num_rows
+
+
+def run_export(store, export_format, chunk_rows, keep=False, **filters):
+    """Drain one export; returns (seconds, bytes, chunks, body if keep)"""
+    started = time.perf_counter()
+    size = pieces = 0
+    kept = []
+    for piece in export_stream(export_format, store.export_chunks(chunk_size=chunk_rows, **filters)):
+        size += len(piece)
+        pieces += 1
+        if keep:
+            kept.append(piece)
+    return time.perf_counter() - started, size, pieces, b"".join(kept) if keep else None
+
+
+def peak_heap(store, export_format, chunk_rows):
+    """Largest Python heap held at once while exporting everything"""
+    tracemalloc.start()
+    run_export(store, export_format, chunk_rows)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def benchmark(products, per_product, chunk_rows):
+    formats = ["csv"] + (["arrow", "parquet"] if PYARROW_AVAILABLE else [])
+    workdir = tempfile.mkdtemp(prefix="bench_export_")
+    try:
+        started = time.perf_counter()
+        store = build_store(str(Path(workdir) / "reviews.sqlite3"), products, per_product)
+        total = products * per_product
+        print(f"   Built a {total}-review store in {time.perf_counter() - started:.1f}s")
+
+        # Read-back check on a filtered export small enough to hold in memory
+        filters = dict(product_ids=["product-0", "product-1"], labels=["Negative"])
+        expected = None
+        for export_format in formats:
+            _elapsed, _size, _pieces, body = run_export(store, export_format, chunk_rows, keep=True, **filters)
+            rows = count_rows(export_format, body)
+            expected = rows if expected is None else expected
+            if rows != expected or rows == 0:
+                print(f"❌ {export_format} export read back {rows} rows, expected {expected}")
+                return False
+        print(f"✅ Filtered exports read back identically ({expected} negative reviews of 2 products)")
+
+        print(f"\n📊 Exporting all {total} reviews ({chunk_rows} rows per chunk / row group)")
+        print("=" * 72)
+        print(f"   {'format':10}{'seconds':>10}{'MB out':>10}{'MB/s':>10}{'rows/s':>12}{'chunks':>8}{'peak heap':>12}")
+        for export_format in formats:
+            elapsed, size, pieces, _body = run_export(store, export_format, chunk_rows)
+            heap = peak_heap(store, export_format, chunk_rows)
+            print(
+                f"   {export_format:10}{elapsed:>10.2f}{size / 1e6:>10.1f}{size / 1e6 / elapsed:>10.1f}"
+                f"{total / elapsed:>12,.0f}{pieces:>8}{heap / 1e6:>10.1f} MB"
+            )
+
+        print(f"\n📊 Filtered: one product, Negative only, last {products // 2} days")
+        print("=" * 72)
+        since = datetime(2024, 1, 1) + timedelta(days=products // 2)
+        for export_format in formats:
+            elapsed, size, _pieces, _body = run_export(
+                store, export_format, chunk_rows, product_ids=[f"product-{products - 1}"], labels=["Negative"], since=since
+            )
+            print(f"   {export_format:10}{elapsed * 1000:>10.1f} ms{size / 1e6:>10.2f} MB")
+        store.close()
+        return True
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export throughput of CSV, Arrow and Parquet from the review store")
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--reviews", type=int, default=50000, help="Reviews per product")
+    parser.add_argument("--chunk-rows", type=int, default=65536)
+    options = parser.parse_args()
+
+    print(f"🧪 Building a review store of {options.products} x {options.reviews} reviews...")
+    if not PYARROW_AVAILABLE:
+        print("   (pyarrow is not installed; only CSV is measured)")
+    return benchmark(options.products, options.reviews, options.chunk_rows)
+
+
+if __name__ == "__main__":
+    if main():
+        print("\n✅ Export benchmark completed!")
+    else:
+        print("\n❌ Export benchmark failed!")
+        sys.exit(1)
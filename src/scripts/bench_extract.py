@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from extract import available_backends, get_extractor  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "pages"
+
+
+def load_fixtures():
+    """Saved product pages: the stub layout, a noisy marketplace layout, and the same page with JSON-LD / __NEXT_DATA__"""
+    return {path.stem: path.read_text(encoding="utf-8") for path in sorted(FIXTURES_DIR.glob("*.html"))}
+
+
+def check_agreement(fixtures, backends):
+    """Every backend must extract exactly what BeautifulSoup extracts, and JSON payloads must match the DOM"""
+    reference = get_extractor("bs4")
+    ok = True
+    for name, html in fixtures.items():
+        expected = reference.extract(html)
+        dom_reviews = reference.dom_reviews(reference.parse(html))
+        if expected.reviews != dom_reviews:
+            print(f"   ❌ {name}: embedded JSON reviews differ from the review DOM")
+            ok = False
+        for backend in backends:
+            if get_extractor(backend).extract(html) != expected:
+                print(f"   ❌ {name}: {backend} differs from bs4")
+                ok = False
+    if ok:
+        print(f"✅ {', '.join(backends)} agree on {len(fixtures)} fixture pages")
+    return ok
+
+
+def time_extract(backend, html, repeats):
+    """Median seconds per extract() call"""
+    extractor = get_extractor(backend)
+    extractor.extract(html)
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        extractor.extract(html)
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2]
+
+
+def resident_bytes():
+    """Current RSS; parser trees mostly live in C allocations that tracemalloc cannot see"""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize()
+
+
+def measure_memory(backend, copies):
+    """RSS growth holding parsed trees, and the Python heap peak of one extract pass (run in a fresh process)"""
+    fixtures = load_fixtures()
+    extractor = get_extractor(backend)
+    for html in fixtures.values():
+        extractor.extract(html)
+
+    tracemalloc.start()
+    for html in fixtures.values():
+        extractor.extract(html)
+    _current, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    baseline = resident_bytes()
+    trees = [extractor.parse(html) for _ in range(copies) for html in fixtures.values()]
+    tree_bytes = (resident_bytes() - baseline) / len(trees)
+    print(json.dumps({"tree_bytes": tree_bytes, "heap_peak": heap_peak}))
+
+
+def memory_in_subprocess(backend, copies=20):
+    command = [sys.executable, __file__, "--memory-child", backend, "--copies", str(copies)]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def benchmark(fixtures, backends, repeats):
+    print(f"\n📊 Extraction benchmark (median of {repeats} runs, ms per page)")
+    print("=" * 50)
+    print(f"   {'page':18}{'KB':>6}" + "".join(f"{backend:>12}" for backend in backends))
+    for name, html in fixtures.items():
+        cells = "".join(f"{time_extract(backend, html, repeats) * 1000:12.2f}" for backend in backends)
+        print(f"   {name:18}{len(html) // 1024:>6}{cells}")
+    print("   (json_ld and next_data are marketplace_dom plus an embedded review payload)")
+
+    print(f"\n   Memory (average fixture page is {sum(map(len, fixtures.values())) / len(fixtures) / 1024:.0f} KB):")
+    for backend in backends:
+        memory = memory_in_subprocess(backend)
+        print(
+            f"   {backend:12} {memory['tree_bytes'] / 1024:8.0f} KB RSS per parsed tree   "
+            f"{memory['heap_peak'] / 1024 / 1024:6.1f} MB Python heap peak"
+        )
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML extraction backends vs BeautifulSoup on saved fixture pages")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--memory-child", help=argparse.SUPPRESS)
+    parser.add_argument("--copies", type=int, default=20, help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.memory_child:
+        measure_memory(options.memory_child, options.copies)
+        sys.exit(0)
+
+    backends = list(reversed(available_backends()))
+    fixtures = load_fixtures()
+    print(f"🧪 Checking {len(backends)} parser backends on {len(fixtures)} fixture pages...")
+    if not check_agreement(fixtures, backends):
+        return False
+    return benchmark(fixtures, backends, options.repeats)
+
+
+if __name__ == "__main__":
+    if main():
+        print("\n✅ Extraction benchmark completed!")
+    else:
+        print("\n❌ Extraction benchmark failed!")
+        sys.exit(1)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from cleaning import clean_texts  # noqa: E402
+from models import ReviewData, ScrapeResponse  # noqa: E402
+from pipeline import response_payload  # noqa: E402
+from review_batch import ReviewBatch  # noqa: E402
+from scraper import SAMPLE_REVIEWS  # noqa: E402
+from sentiment import SENTIMENT_LABELS, score_batch  # noqa: E402
+
+
+def scored_reviews(count, seed=11):
+    """Cleaned texts, ratings, scores and label codes shaped like one scrape's output"""
+    rng = random.Random(seed)
+    raw = []
+    ratings = []
+    for i in range(count):
+        parts = rng.sample(SAMPLE_REVIEWS, rng.randint(1, 3))
+        raw.append(" ".join(text for text, _rating in parts) + f" (order {i})")
+        ratings.append(float(parts[0][1]))
+    texts = clean_texts(raw)
+    scores, codes = score_batch(texts)
+    return texts, ratings, scores, codes
+
+
+def build_models(product_name, texts, ratings, scores, codes, timestamp):
+    """What score_reviews used to return: one ReviewData per review"""
+    return [
+        ReviewData(
+            product_name=product_name,
+            review_text=text,
+            rating=rating,
+            sentiment_score=round(float(score), 3),
+            sentiment_label=SENTIMENT_LABELS[code],
+            timestamp=timestamp,
+        )
+        for text, rating, score, code in zip(texts, ratings, scores, codes)
+    ]
+
+
+def models_payload(models):
+    return ScrapeResponse(
+        success=True, data=models, message="ok", total_reviews=len(models), google_sheets_saved=False
+    ).model_dump_json().encode("utf-8")
+
+
+def retained_bytes(build):
+    """Python heap still held by build()'s result (numpy buffers are traced too)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, held
+
+
+def timed(function, repeats):
+    """Best wall time of function() over repeats, and its last result"""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def check_equivalence(texts, ratings, scores, codes, timestamp):
+    """The columnar payload and history round trips must match the Pydantic path"""
+    models = build_models("Bench Product", texts, ratings, scores, codes, timestamp.isoformat())
+    batch = ReviewBatch.from_scored("Bench Product", texts, ratings, scores, codes, timestamp)
+    expected = json.loads(models_payload(models))["data"]
+    ok = True
+    if json.loads(response_payload(batch, message="ok", total_reviews=len(batch)))["data"] != expected:
+        print("   ❌ columnar JSON differs from ScrapeResponse.model_dump_json()")
+        ok = False
+    if batch.rows() != [model.model_dump() for model in models]:
+        print("   ❌ ReviewBatch.rows() differs from ReviewData.model_dump()")
+        ok = False
+    if ReviewBatch.from_bytes(batch.to_bytes()).rows() != expected or ReviewBatch.from_rows(expected).rows() != expected:
+        print("   ❌ stored batch does not read back identically")
+        ok = False
+    if ok:
+        print(f"✅ Columnar reviews serialize identically to the Pydantic models ({len(batch)} reviews)")
+    return ok
+
+
+def benchmark(count, repeats):
+    texts, ratings, scores, codes = scored_reviews(count)
+    timestamp = datetime.now()
+    if not check_equivalence(texts[:2000], ratings[:2000], scores[:2000], codes[:2000], timestamp):
+        return False
+
+    stamp = timestamp.isoformat()
+    models, models_bytes = retained_bytes(lambda: build_models("Bench Product", texts, ratings, scores, codes, stamp))
+    rows, rows_bytes = retained_bytes(lambda: [model.model_dump() for model in models])
+    batch, batch_bytes = retained_bytes(
+        lambda: ReviewBatch.from_scored("Bench Product", texts, ratings, scores, codes, timestamp)
+    )
+    text_bytes = sum(len(text.encode("utf-8")) for text in texts)
+
+    print(f"\n📊 Memory for {count} reviews ({text_bytes / count:.0f} bytes of text each on average)")
+    print("=" * 50)
+    for name, held in (("ReviewData models", models_bytes), ("dicts (model_dump)", rows_bytes), ("ReviewBatch", batch_bytes)):
+        print(f"   {name:22}{held / 1024 / 1024:8.1f} MB{held / count:8.0f} B/review")
+    print(f"   (ReviewBatch.nbytes = {batch.nbytes / 1024 / 1024:.1f} MB)")
+    del rows
+
+    legacy_rows = json.dumps(batch.rows(), ensure_ascii=False).encode("utf-8")
+    stored = batch.to_bytes()
+    timings = [
+        (
+            "scored -> response JSON",
+            lambda: models_payload(build_models("Bench Product", texts, ratings, scores, codes, stamp)),
+            lambda: response_payload(
+                ReviewBatch.from_scored("Bench Product", texts, ratings, scores, codes, timestamp),
+                message="ok",
+                total_reviews=count,
+                google_sheets_saved=False,
+            ),
+        ),
+        (
+            "history save",
+            lambda: json.dumps([model.model_dump() for model in models], ensure_ascii=False).encode("utf-8"),
+            batch.to_bytes,
+        ),
+        ("history load", lambda: json.loads(legacy_rows), lambda: ReviewBatch.from_bytes(stored)),
+        ("merge new + stored", lambda: (models[:100] + models)[:count], lambda: ReviewBatch.concat([batch.head(100), batch]).head(count)),
+    ]
+    print(f"\n📊 Latency for {count} reviews (best of {repeats}, ms)")
+    print("=" * 50)
+    print(f"   {'step':26}{'Pydantic/dicts':>16}{'ReviewBatch':>14}")
+    for name, old, new in timings:
+        old_time, _ = timed(old, repeats)
+        new_time, _ = timed(new, repeats)
+        print(f"   {name:26}{old_time * 1000:>16.1f}{new_time * 1000:>14.1f}")
+    print(f"   Stored history: {len(legacy_rows) / 1024 / 1024:.1f} MB as JSON rows, {len(stored) / 1024 / 1024:.1f} MB columnar")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory and latency of columnar ReviewBatch vs Pydantic ReviewData lists")
+    parser.add_argument("--reviews", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=3)
+    options = parser.parse_args()
+
+    print(f"🧪 Building {options.reviews} scored reviews...")
+    return benchmark(options.reviews, options.repeats)
+
+
+if __name__ == "__main__":
+    if main():
+        print("\n✅ Review batch benchmark completed!")
+    else:
+        print("\n❌ Review batch benchmark failed!")
+        sys.exit(1)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from review_batch import ReviewBatch  # noqa: E402
+from review_store import ReviewStore  # noqa: E402
+from scraper import SAMPLE_REVIEWS  # noqa: E402
+from sentiment import SENTIMENT_LABELS, labels_for_scores  # noqa: E402
+from summary import summarize  # noqa: E402
+
+# Words planted in this share of reviews, so queries have known selectivity
+TOPICS = {"battery": 0.03, "charger": 0.01, "refund": 0.005, "warranty": 0.001}
+FILLER_WORDS = 8
+SYLLABLES = ["ka", "lo", "mi", "ren", "tu", "sa", "vor", "ne", "pi", "dal", "xe", "mo", "ri", "gan", "fe", "lu"]
+
+# (name, query, filters)
+QUERIES = [
+    ("common word", "quality", {}),
+    ("3% word", "battery", {}),
+    ("0.1% word", "warranty", {}),
+    ("OR", "battery or delivery", {}),
+    ("OR, Negative only", "battery or delivery", {"labels": ["Negative"]}),
+    ("phrase", '"fast delivery"', {}),
+    ("prefix", "charg*", {}),
+    ("AND, rating >= 4", "battery charger", {"min_rating": 4}),
+    ("one product", "battery", {"product_ids": ["product-0"]}),
+]
+
+
+def search_corpus(count, seed):
+    """Review texts and ratings: a sample review, Zipf-distributed filler words and the planted TOPICS"""
+    rng = random.Random(seed)
+    vocabulary = sorted({"".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(30000)})
+    ranks = np.minimum(np.random.default_rng(seed).zipf(1.3, size=count * FILLER_WORDS), len(vocabulary)) - 1
+    texts = []
+    ratings = []
+    for index in range(count):
+        text, rating = rng.choice(SAMPLE_REVIEWS)
+        words = [vocabulary[rank] for rank in ranks[index * FILLER_WORDS:(index + 1) * FILLER_WORDS].tolist()]
+        for topic, share in TOPICS.items():
+            if rng.random() < share:
+                words.insert(rng.randrange(len(words) + 1), topic)
+        texts.append(f"{text} {' '.join(words)}")
+        ratings.append(float(rating))
+    return texts, ratings
+
+
+def build_store(path, products, per_product):
+    """A review store of products x per_product distinct reviews; returns (store, seconds spent saving, word counts)"""
+    store = ReviewStore(enabled=True, path=path)
+    store.start()
+    counts = dict.fromkeys(TOPICS, 0)
+    saving = 0.0
+    started = datetime(2024, 1, 1)
+    for index in range(products):
+        texts, ratings = search_corpus(per_product, seed=index)
+        for topic in TOPICS:
+            pattern = re.compile(rf"\b{topic}\b")
+            counts[topic] += sum(1 for text in texts if pattern.search(text))
+        noise = np.random.default_rng(index).normal(0.0, 0.2, per_product)
+        scores = np.clip((np.asarray(ratings) - 3.0) / 4.0 + noise, -1.0, 1.0)
+        batch = ReviewBatch.from_scored(
+            f"Product {index}",
+            texts,
+            ratings,
+            scores,
+            labels_for_scores(scores),
+            started + timedelta(days=index),
+            review_keys=[f"{index}-{number}" for number in range(len(texts))],
+        )
+        began = time.perf_counter()
+        store.save(f"product-{index}", f"https://shop.example/products/{index}", f"Product {index}", batch, summarize(batch))
+        saving += time.perf_counter() - began
+    return store, saving, counts
+
+
+def latency(store, query, filters, repeats, limit):
+    """(p50 ms, p99 ms, total matches) of one search repeated"""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = store.search(query, limit=limit, **filters)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], timings[min(len(timings) - 1, int(len(timings) * 0.99))], result["total"]
+
+
+def check_results(store, counts):
+    """Match counts equal the planted words and filters hold on every hit"""
+    for topic, expected in counts.items():
+        total = store.search(topic, limit=1)["total"]
+        if total != expected:
+            print(f"❌ '{topic}' matched {total} reviews, {expected} contain it")
+            return False
+    hits = store.search("battery or refund", labels=["Negative"], max_rating=2, limit=500)["results"]
+    if not hits or any(hit["sentiment_label"] != "Negative" or hit["rating"] > 2 for hit in hits):
+        print("❌ Label and rating filters were not applied")
+        return False
+    relevance = [hit["relevance"] for hit in hits]
+    if relevance != sorted(relevance, reverse=True):
+        print("❌ Results are not in BM25 order")
+        return False
+    print(f"✅ Match counts equal the planted words ({', '.join(f'{t}: {c}' for t, c in counts.items())})")
+    return True
+
+
+def benchmark(products, per_product, repeats, limit):
+    workdir = tempfile.mkdtemp(prefix="bench_search_")
+    try:
+        path = Path(workdir) / "reviews.sqlite3"
+        store, saving, counts = build_store(str(path), products, per_product)
+        if not store.search_enabled:
+            print("❌ This SQLite build has no FTS5")
+            return False
+        total = products * per_product
+        size = sum(file.stat().st_size for file in Path(workdir).iterdir())
+        print(f"   Stored and indexed {total} reviews in {saving:.1f}s ({total / saving:,.0f} reviews/s), {size / 1e6:.0f} MB")
+
+        if not check_results(store, counts):
+            return False
+
+        print(f"\n📊 Query latency over {total} reviews (top {limit} by BM25, {repeats} runs each)")
+        print("=" * 72)
+        print(f"   {'query':22}{'text':24}{'matches':>10}{'p50 ms':>8}{'p99 ms':>8}")
+        for name, query, filters in QUERIES:
+            p50, p99, matches = latency(store, query, filters, repeats, limit)
+            print(f"   {name:22}{query:24}{matches:>10,}{p50:>8.1f}{p99:>8.1f}")
+
+        print("\n📊 Incremental indexing: one more 1,000-review scrape")
+        texts, ratings = search_corpus(1000, seed=products)
+        scores = np.zeros(len(texts))
+        batch = ReviewBatch.from_scored(
+            "Late product",
+            texts,
+            ratings,
+            scores,
+            [SENTIMENT_LABELS.index("Neutral")] * len(texts),
+            datetime(2025, 1, 1),
+            review_keys=[f"late-{number}" for number in range(len(texts))],
+        )
+        began = time.perf_counter()
+        store.save("product-late", "https://shop.example/products/late", "Late product", batch, summarize(batch))
+        print(f"   Saved and indexed in {(time.perf_counter() - began) * 1000:.0f} ms;"
+              f" searchable at once: {store.search('battery', product_ids=['product-late'])['total']} new 'battery' hits")
+        store.close()
+        return True
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search latency over the review store")
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--reviews", type=int, default=50000, help="Reviews per product")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    options = parser.parse_args()
+
+    print(f"🧪 Building and indexing a review store of {options.products} x {options.reviews} reviews...")
+    return benchmark(options.products, options.reviews, options.repeats, options.limit)
+
+
+if __name__ == "__main__":
+    if main():
+        print("\n✅ Search benchmark completed!")
+    else:
+        print("\n❌ Search benchmark failed!")
+        sys.exit(1)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from textblob import TextBlob  # noqa: E402
+
+from scraper import SAMPLE_REVIEWS  # noqa: E402
+from sentiment import SENTIMENT_LABELS, label_for_score, score_batch  # noqa: E402
+
+# Reviews that exercise every PatternAnalyzer rule: modifiers, negation,
+# "!" boost, "(!)" irony, emoticons, contractions and abbreviations.
+GOLDEN_CORPUS = [
+    "Good product",
+    "Fast delivery",
+    "Not as described",
+    "not good",
+    "not bad at all",
+    "very good",
+    "really not good",
+    "not very good",
+    "never really happy with it",
+    "This is not a good product",
+    "Amazing!!! Best purchase ever!",
+    "Great quality :) but slow delivery :(",
+    "Oh great, it broke on day one (!)",
+    "Terribly bad packaging, extremely disappointed.",
+    "I don't like it, it isn't what I expected.",
+    "The seller was helpful, e.g. he replied quickly... nice.",
+    "Absolutely wonderful, highly recommended :D",
+    "meh",
+    "",
+    "Worst. Product. Ever.",
+    "It's okay I guess, nothing special but not terrible either",
+    "Size is small; color is different; quality is poor!",
+    "\"Perfect\" they said... it's anything but perfect",
+    "Super fast delivery and the battery lasts very long",
+    "Cheap plastic, feels fragile and flimsy. Not worth the price.",
+] + [text for text, _rating in SAMPLE_REVIEWS]
+
+
+def check_golden_corpus():
+    """Compare batch scores with TextBlob's PatternAnalyzer on the golden corpus"""
+    scores, codes = score_batch(GOLDEN_CORPUS)
+    mismatches = 0
+    for text, score, code in zip(GOLDEN_CORPUS, scores, codes):
+        expected = TextBlob(text).sentiment.polarity if text else 0.0
+        if score != expected or SENTIMENT_LABELS[code] != label_for_score(expected):
+            mismatches += 1
+            print(f"   ❌ {text!r}: batch={score!r} textblob={expected!r}")
+    if mismatches:
+        print(f"❌ {mismatches} of {len(GOLDEN_CORPUS)} golden reviews differ from TextBlob")
+        return False
+    print(f"✅ Batch scores match TextBlob exactly on {len(GOLDEN_CORPUS)} golden reviews")
+    return True
+
+
+def build_corpus(size):
+    """Build a benchmark corpus by shuffling golden and sample reviews"""
+    rng = random.Random(42)
+    pool = [text for text in GOLDEN_CORPUS if text]
+    return [" ".join(rng.choice(pool) for _ in range(3)) for _ in range(size)]
+
+
+def benchmark(size):
+    """Measure reviews/sec for per-review TextBlob vs the batch scorer"""
+    corpus = build_corpus(size)
+    score_batch(corpus[:10])  # compile the lexicon outside the timed region
+
+    started = time.perf_counter()
+    baseline = [TextBlob(text).sentiment.polarity for text in corpus]
+    baseline_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scores, _codes = score_batch(corpus)
+    batch_time = time.perf_counter() - started
+
+    identical = all(a == b for a, b in zip(baseline, scores))
+    print(f"\n📊 Sentiment scoring benchmark ({size} reviews, {len(set(corpus))} distinct)")
+    print("=" * 50)
+    print(f"   TextBlob per review: {size / baseline_time:10.0f} reviews/sec")
+    print(f"   Batch scorer:        {size / batch_time:10.0f} reviews/sec")
+    print(f"   Speedup:             {baseline_time / batch_time:10.1f}x")
+    print(f"   Identical scores:    {identical}")
+    return identical
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch sentiment scorer vs per-review TextBlob")
+    parser.add_argument("--size", type=int, default=20000, help="Reviews in the benchmark corpus")
+    options = parser.parse_args()
+
+    print("🧪 Checking golden corpus...")
+    if not check_golden_corpus():
+        return False
+    return benchmark(options.size)
+
+
+if __name__ == "__main__":
+    if main():
+        print("\n✅ Sentiment benchmark completed!")
+    else:
+        print("\n❌ Sentiment benchmark failed!")
+        sys.exit(1)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from bench_review_batch import build_models, scored_reviews, timed  # noqa: E402
+from models import ScrapeResponse  # noqa: E402
+from pipeline import response_frames, response_payload  # noqa: E402
+from responses import BROTLI_AVAILABLE, ORJSON_AVAILABLE, compress, dumps, loads  # noqa: E402
+from review_batch import ReviewBatch  # noqa: E402
+from summary import summarize  # noqa: E402
+
+SUMMARY = dict(message="ok", google_sheets_saved=False, sheet_url=None, product_id="bench-product")
+
+
+def response_fields(batch):
+    """ScrapeResponse fields other than data and total_reviews, with the batch's real summary"""
+    return dict(SUMMARY, summary=summarize(batch))
+
+
+def default_response(models, fields):
+    """What FastAPI does for a response_model endpoint returning Pydantic models"""
+    response = ScrapeResponse(success=True, data=models, total_reviews=len(models), **fields)
+    return JSONResponse(jsonable_encoder(response)).body
+
+
+def model_dump_response(models, fields):
+    response = ScrapeResponse(success=True, data=models, total_reviews=len(models), **fields)
+    return response.model_dump_json().encode("utf-8")
+
+
+def json_frames(payload):
+    """Stream lines as main.frame_response wrote them with the json module"""
+    return [(json.dumps(frame, ensure_ascii=False) + "\n").encode("utf-8") for frame in response_frames(payload)]
+
+
+def fast_frames(payload):
+    return [dumps(frame) + b"\n" for frame in response_frames(payload)]
+
+
+def check_equivalence(batch, models, fields):
+    """Every serializer must produce the same document"""
+    expected = json.loads(model_dump_response(models, fields))
+    payload = response_payload(batch, total_reviews=len(batch), **fields)
+    ok = True
+    for name, body in (("default", default_response(models, fields)), ("columnar", payload)):
+        if json.loads(body) != expected:
+            print(f"   ❌ {name} response differs from model_dump_json()")
+            ok = False
+    if [loads(line) for line in fast_frames(payload)] != [json.loads(line) for line in json_frames(payload)]:
+        print("   ❌ stream frames differ between dumps() and json.dumps")
+        ok = False
+    return ok
+
+
+def benchmark(count, repeats):
+    texts, ratings, scores, codes = scored_reviews(count)
+    timestamp = datetime.now()
+    stamp = timestamp.isoformat()
+    models = build_models("Bench Product", texts, ratings, scores, codes, stamp)
+
+    def build_batch():
+        return ReviewBatch.from_scored("Bench Product", texts, ratings, scores, codes, timestamp)
+
+    batch = build_batch()
+    fields = response_fields(batch)
+    if not check_equivalence(batch, models, fields):
+        return False
+
+    payload = response_payload(batch, total_reviews=len(batch), **fields)
+    serializers = [
+        ("jsonable_encoder + json", lambda: default_response(build_models("Bench Product", texts, ratings, scores, codes, stamp), fields)),
+        ("model_dump_json", lambda: model_dump_response(build_models("Bench Product", texts, ratings, scores, codes, stamp), fields)),
+        ("ReviewBatch (columnar)", lambda: response_payload(build_batch(), total_reviews=count, **fields)),
+    ]
+    print(f"\n📊 {count} reviews: scored columns -> /scrape body (best of {repeats})")
+    print("=" * 60)
+    for name, function in serializers:
+        elapsed, body = timed(function, repeats)
+        print(f"   {name:28}{elapsed * 1000:>10.1f} ms{len(body) / 1024:>12.1f} KB")
+
+    json_time, _ = timed(lambda: json_frames(payload), repeats)
+    fast_time, _ = timed(lambda: fast_frames(payload), repeats)
+    print(f"   {'stream frames (json)':28}{json_time * 1000:>10.1f} ms")
+    print(f"   {'stream frames (dumps)':28}{fast_time * 1000:>10.1f} ms")
+
+    encodings = [("identity", None), ("gzip", "gzip")] + ([("br", "br")] if BROTLI_AVAILABLE else [])
+    print(f"\n📊 {count} reviews: bytes on the wire")
+    print("=" * 60)
+    for name, encoding in encodings:
+        if encoding is None:
+            elapsed, body = 0.0, payload
+        else:
+            elapsed, body = timed(lambda: compress(payload, encoding), repeats)
+        print(f"   {name:28}{elapsed * 1000:>10.1f} ms{len(body) / 1024:>12.1f} KB{len(payload) / len(body):>8.1f}x")
+    # Sanity check that the compressed body decodes back to the payload
+    if gzip.decompress(compress(payload, "gzip")) != payload:
+        print("   ❌ gzip round trip failed")
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization time and response size of /scrape bodies")
+    parser.add_argument("--sizes", default="50,5000,50000", help="Comma-separated review counts")
+    parser.add_argument("--repeats", type=int, default=3)
+    options = parser.parse_args()
+
+    print(f"🧪 Serializing scrape responses (orjson {'on' if ORJSON_AVAILABLE else 'off'}, "
+          f"brotli {'on' if BROTLI_AVAILABLE else 'off'})...")
+    started = time.perf_counter()
+    for count in (int(size) for size in options.sizes.split(",")):
+        if not benchmark(count, options.repeats):
+            return False
+    print(f"\n   ({time.perf_counter() - started:.1f}s total)")
+    return True
+
+
+if __name__ == "__main__":
+    if main():
+        print("\n✅ Serialization benchmark completed!")
+    else:
+        print("\n❌ Serialization benchmark failed!")
+        sys.exit(1)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+RANGE_RE = re.compile(r"^(?:[^!]+!)?[A-Z]+(\d+)")
+VALUES_BATCH_UPDATE_RE = re.compile(r"^/v4/spreadsheets/([^/]+)/values:batchUpdate$")
+BATCH_UPDATE_RE = re.compile(r"^/v4/spreadsheets/([^/:]+):batchUpdate$")
+PERMISSIONS_RE = re.compile(r"^/drive/v3/files/([^/]+)/permissions$")
+SPREADSHEET_RE = re.compile(r"^/spreadsheets/d/([^/]+)(?:/edit)?$")
+
+
+class FakeSheets:
+    """In-memory spreadsheets plus request counters and a per-minute write quota"""
+
+    def __init__(self, quota, retry_after, fail_every):
+        self.quota = quota
+        self.retry_after = retry_after
+        self.fail_every = fail_every
+        self.lock = threading.Lock()
+        self.spreadsheets = {}
+        self.requests = Counter()
+        self.recent = deque()
+        self.writes = 0
+
+    def admit(self):
+        """Return an (status, retry_after) error if this request should be rejected, else None"""
+        with self.lock:
+            now = time.monotonic()
+            while self.recent and now - self.recent[0] > 60:
+                self.recent.popleft()
+            if self.quota and len(self.recent) >= self.quota:
+                self.requests["throttled"] += 1
+                return 429, self.retry_after
+            self.recent.append(now)
+            self.writes += 1
+            if self.fail_every and self.writes % self.fail_every == 0:
+                self.requests["failed"] += 1
+                return 503, None
+        return None
+
+    def generate_ids(self, count):
+        with self.lock:
+            self.requests["generate_ids"] += 1
+        return {"kind": "drive#generatedIds", "space": "drive", "ids": [uuid.uuid4().hex for _ in range(count)]}
+
+    def create(self, body):
+        """Drive files.create of a spreadsheet under a reserved id; None if the id is taken"""
+        with self.lock:
+            if body["id"] in self.spreadsheets:
+                return None
+            self.spreadsheets[body["id"]] = {"title": body["name"], "rows": {}, "shared": []}
+            self.requests["create"] += 1
+        return {"id": body["id"], "name": body["name"], "mimeType": body["mimeType"]}
+
+    def batch_update(self, spreadsheet_id, body):
+        """spreadsheets.batchUpdate; only updateCells changes the stored rows"""
+        with self.lock:
+            sheet = self.spreadsheets.get(spreadsheet_id)
+            if sheet is None:
+                return None
+            for request in body["requests"]:
+                cells = request.get("updateCells")
+                if cells is None:
+                    continue
+                start = cells["start"].get("rowIndex", 0) + 1
+                for offset, row in enumerate(cells["rows"]):
+                    sheet["rows"][start + offset] = [cell["userEnteredValue"]["stringValue"] for cell in row["values"]]
+            self.requests["batch_update"] += 1
+        return {"spreadsheetId": spreadsheet_id, "replies": [{} for _ in body["requests"]]}
+
+    def batch_update_values(self, spreadsheet_id, body):
+        with self.lock:
+            sheet = self.spreadsheets.get(spreadsheet_id)
+            if sheet is None:
+                return None
+            updated = 0
+            for entry in body["data"]:
+                first_row = int(RANGE_RE.match(entry["range"]).group(1))
+                for offset, values in enumerate(entry["values"]):
+                    sheet["rows"][first_row + offset] = values
+                updated += len(entry["values"])
+            self.requests["values_batch_update"] += 1
+        return {"spreadsheetId": spreadsheet_id, "totalUpdatedRows": updated}
+
+    def share(self, spreadsheet_id, body):
+        with self.lock:
+            sheet = self.spreadsheets.get(spreadsheet_id)
+            if sheet is None:
+                return None
+            sheet["shared"].append(body.get("emailAddress"))
+            self.requests["share"] += 1
+        return {"id": uuid.uuid4().hex}
+
+    def stats(self):
+        with self.lock:
+            data_rows = sum(len(sheet["rows"]) - 1 for sheet in self.spreadsheets.values())
+            # Rows written at the wrong offset leave holes (or overwrite others, which shows up in data_rows)
+            contiguous = all(
+                sorted(sheet["rows"]) == list(range(1, len(sheet["rows"]) + 1))
+                for sheet in self.spreadsheets.values()
+            )
+            return {
+                "spreadsheets": len(self.spreadsheets),
+                "data_rows": data_rows,
+                "contiguous": contiguous,
+                "requests": dict(self.requests),
+            }
+
+
+def make_handler(options, sheets):
+    class FakeSheetsHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            if options.verbose:
+                super().log_message(format, *args)
+
+        def send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            path = url.path
+            if path == "/stats":
+                self.send_json(200, sheets.stats())
+                return
+            if path == "/drive/v3/files/generateIds":
+                count = int(parse_qs(url.query).get("count", ["10"])[0])
+                self.send_json(200, sheets.generate_ids(count))
+                return
+            match = SPREADSHEET_RE.match(path)
+            sheet = sheets.spreadsheets.get(match.group(1)) if match else None
+            if sheet is None:
+                self.send_json(404, {"error": {"code": 404, "message": "Not found"}})
+                return
+            rows = [sheet["rows"][index] for index in sorted(sheet["rows"])]
+            self.send_json(200, {"title": sheet["title"], "shared": sheet["shared"], "rows": rows})
+
+        def do_POST(self):
+            path = urlsplit(self.path).path
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+
+            if options.latency:
+                time.sleep(options.latency)
+
+            rejected = sheets.admit()
+            if rejected is not None:
+                status, retry_after = rejected
+                headers = {"Retry-After": str(retry_after)} if retry_after else None
+                self.send_json(status, {"error": {"code": status, "message": "Quota exceeded"}}, headers)
+                return
+
+            if path == "/drive/v3/files":
+                created = sheets.create(body)
+                if created is None:
+                    self.send_json(409, {"error": {"code": 409, "message": "A file with this ID already exists"}})
+                else:
+                    self.send_json(200, created)
+                return
+            match = VALUES_BATCH_UPDATE_RE.match(path)
+            result = sheets.batch_update_values(match.group(1), body) if match else None
+            if result is None:
+                match = BATCH_UPDATE_RE.match(path)
+                result = sheets.batch_update(match.group(1), body) if match else None
+            if result is None:
+                match = PERMISSIONS_RE.match(path)
+                result = sheets.share(match.group(1), body) if match else None
+            if result is None:
+                self.send_json(404, {"error": {"code": 404, "message": "Not found"}})
+                return
+            self.send_json(200, result)
+
+    return FakeSheetsHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake Google Sheets/Drive API for the write-behind sink")
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--quota", type=int, default=60, help="Write requests allowed per minute (0 = unlimited)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429 responses")
+    parser.add_argument("--fail-every", type=int, default=0, help="Answer every Nth write with HTTP 503")
+    parser.add_argument("--latency", type=float, default=0.1, help="Artificial latency per call (seconds)")
+    parser.add_argument("--verbose", action="store_true")
+    options = parser.parse_args()
+
+    sheets = FakeSheets(options.quota, options.retry_after, options.fail_every)
+    server = ThreadingHTTPServer(("127.0.0.1", options.port), make_handler(options, sheets))
+    print(f"🧪 Fake Sheets API on http://127.0.0.1:{options.port} (stats at /stats)")
+    print(f"   Start the backend with GOOGLE_SHEETS_EMULATOR_URL=http://127.0.0.1:{options.port}")
+    print(f"   Quota {options.quota or 'unlimited'} writes/min, {options.latency}s latency")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping fake Sheets server...")
+        server.server_close()
+    return True
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import sys
+import time
+
+import requests
+
+from load_test_scrape import get_health
+
+
+def work_counters(base_url):
+    """Page requests (full downloads and 304s) and reviews scored so far, from /health"""
+    health = get_health(base_url)
+    pages = health["fetch"]["pages_fetched"] + health["fetch"]["not_modified"]
+    return pages, health["scoring"]["reviews_scored"]
+
+
+def refresh(base_url, product_urls, incremental):
+    """Re-scrape every product through /scrape/batch; returns (product frames, pages, reviews scored, seconds)"""
+    pages_before, scored_before = work_counters(base_url)
+    payload = {"product_urls": product_urls, "force_refresh": True, "incremental": incremental}
+    started = time.perf_counter()
+    with requests.post(f"{base_url}/scrape/batch", json=payload, stream=True, timeout=600) as response:
+        response.raise_for_status()
+        frames = [json.loads(line) for line in response.iter_lines() if line]
+    elapsed = time.perf_counter() - started
+    pages_after, scored_after = work_counters(base_url)
+    products = [frame for frame in frames if frame["type"] == "product"]
+    return products, pages_after - pages_before, scored_after - scored_before, elapsed
+
+
+def publish_reviews(stub_url, product_url, count):
+    """Ask the stub server to publish count new reviews for a product"""
+    slug = product_url.rstrip("/").rsplit("/", 1)[-1]
+    requests.post(f"{stub_url}/products/{slug}/reviews", params={"count": count}, timeout=10).raise_for_status()
+
+
+def review_texts(frame):
+    return [review["review_text"] for review in frame["data"]]
+
+
+def run_incremental_test(base_url, stub_url, products, new_per_product):
+    """Seed products, publish a few new reviews each, and compare incremental with full refreshes"""
+    run_id = int(time.time() * 1000)
+    product_urls = [f"{stub_url}/products/incremental-{run_id}-{i}" for i in range(products)]
+
+    seeded, seed_pages, seed_scored, seed_time = refresh(base_url, product_urls, incremental=True)
+    seeded_totals = {frame["product_url"]: frame["total_reviews"] for frame in seeded}
+
+    unchanged, unchanged_pages, unchanged_scored, unchanged_time = refresh(base_url, product_urls, incremental=True)
+
+    for product_url in product_urls:
+        publish_reviews(stub_url, product_url, new_per_product)
+    updated, update_pages, update_scored, update_time = refresh(base_url, product_urls, incremental=True)
+    full, full_pages, full_scored, full_time = refresh(base_url, product_urls, incremental=False)
+
+    print("\n📊 Incremental refresh results")
+    print("=" * 50)
+    print(f"   Products: {products}, new reviews per product: {new_per_product}")
+    print(f"   {'':22}{'pages':>8}{'scored':>10}{'seconds':>10}")
+    print(f"   {'Seed (first run)':22}{seed_pages:>8}{seed_scored:>10}{seed_time:>10.2f}")
+    print(f"   {'Incremental, no news':22}{unchanged_pages:>8}{unchanged_scored:>10}{unchanged_time:>10.2f}")
+    print(f"   {'Incremental, new':22}{update_pages:>8}{update_scored:>10}{update_time:>10.2f}")
+    print(f"   {'Full re-scrape':22}{full_pages:>8}{full_scored:>10}{full_time:>10.2f}")
+
+    ok = True
+    if unchanged_scored != 0 or unchanged_pages != products:
+        print("❌ An unchanged product should cost one page and no scoring")
+        ok = False
+    if any(frame.get("new_reviews") != new_per_product for frame in updated):
+        print(f"❌ Expected {new_per_product} new reviews for every product")
+        ok = False
+    full_by_url = {frame["product_url"]: frame for frame in full}
+    for frame in updated:
+        if frame["total_reviews"] != seeded_totals[frame["product_url"]] + new_per_product:
+            print(f"❌ Merged total is wrong for {frame['product_url']}")
+            ok = False
+        elif review_texts(frame) != review_texts(full_by_url[frame["product_url"]]):
+            print(f"❌ Merged reviews differ from a full re-scrape for {frame['product_url']}")
+            ok = False
+    if ok:
+        print("✅ Merged results match a full re-scrape")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental vs full refresh against the stub product server")
+    parser.add_argument("--api", default="http://localhost:8000")
+    parser.add_argument("--stub", default="http://127.0.0.1:8001", help="Start with scripts/stub_product_server.py")
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--new", type=int, default=5, help="New reviews published per product")
+    options = parser.parse_args()
+
+    print("🧪 Testing incremental scraping...")
+    try:
+        return run_incremental_test(options.api, options.stub, options.products, options.new)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Backend or stub server not reachable: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    if main():
+        print("\n✅ Incremental test completed!")
+    else:
+        print("\n❌ Incremental test failed!")
+        sys.exit(1)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def percentile(values, p):
+    """Return the p-th percentile (0..1) of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def get_health(base_url):
+    """Return the /health payload"""
+    response = requests.get(f"{base_url}/health", timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+def get_fetch_stats(base_url):
+    """Read the fetch engine counters from /health"""
+    return get_health(base_url).get("fetch", {})
+
+
+def scrape_once(base_url, product_url, payload_extra):
+    """POST one /scrape request and return (ok, latency)"""
+    payload = {"product_url": product_url, **payload_extra}
+    started = time.perf_counter()
+    try:
+        response = requests.post(f"{base_url}/scrape", json=payload, timeout=30)
+        ok = response.status_code == 200
+    except requests.exceptions.RequestException:
+        ok = False
+    return ok, time.perf_counter() - started
+
+
+def run_load_test(base_url, stub_url, requests_total, concurrency, products, payload_extra=None):
+    """Fire concurrent /scrape calls against the stub server and report throughput"""
+    payload_extra = payload_extra or {}
+    urls = [f"{stub_url}/products/load-test-product-{i % products}" for i in range(requests_total)]
+
+    before = get_fetch_stats(base_url)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda url: scrape_once(base_url, url, payload_extra), urls))
+    wall = time.perf_counter() - started
+    after = get_fetch_stats(base_url)
+
+    latencies = [latency for ok, latency in results if ok]
+    failures = sum(1 for ok, _ in results if not ok)
+    pages = after.get("pages_fetched", 0) - before.get("pages_fetched", 0)
+    not_modified = after.get("not_modified", 0) - before.get("not_modified", 0)
+
+    print("\n📊 Load test results")
+    print("=" * 50)
+    print(f"   Requests:         {requests_total} ({failures} failed)")
+    print(f"   Concurrency:      {concurrency}")
+    print(f"   Wall time:        {wall:.2f}s")
+    print(f"   Requests/sec:     {requests_total / wall:.1f}")
+    print(f"   Pages fetched:    {pages}")
+    print(f"   Pages/sec:        {pages / wall:.1f}")
+    print(f"   Not modified:     {not_modified} (304, reused without parsing)")
+    print(f"   Latency p50:      {percentile(latencies, 0.50) * 1000:.1f} ms")
+    print(f"   Latency p99:      {percentile(latencies, 0.99) * 1000:.1f} ms")
+    print(f"   Upstream p99:     {after.get('latency_p99_ms', 0)} ms")
+    print(f"   HTTP/2:           {after.get('http2')}")
+    return failures == 0
+
+
+def run_burst_test(base_url, stub_url, burst):
+    """Fire a burst of identical /scrape calls and check they coalesce onto one upstream scrape"""
+    # A fresh product URL per run so the burst cannot be answered from the result cache
+    product_url = f"{stub_url}/products/burst-{int(time.time() * 1000)}"
+    before = get_health(base_url)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=burst) as pool:
+        results = list(pool.map(lambda _: scrape_once(base_url, product_url, {}), range(burst)))
+    wall = time.perf_counter() - started
+    after = get_health(base_url)
+
+    failures = sum(1 for ok, _ in results if not ok)
+    pages = after["fetch"]["pages_fetched"] - before["fetch"]["pages_fetched"]
+    scrapes = after["singleflight"]["leaders"] - before["singleflight"]["leaders"]
+    coalesced = after["singleflight"]["coalesced_waiters"] - before["singleflight"]["coalesced_waiters"]
+    cache_hits = after["cache"]["memory_hits"] - before["cache"]["memory_hits"]
+
+    print("\n📊 Burst results")
+    print("=" * 50)
+    print(f"   Identical requests: {burst} ({failures} failed)")
+    print(f"   Wall time:          {wall:.2f}s")
+    print(f"   Upstream scrapes:   {scrapes}")
+    print(f"   Pages fetched:      {pages}")
+    print(f"   Coalesced waiters:  {coalesced}")
+    print(f"   Cache hits:         {cache_hits}")
+    if scrapes != 1:
+        print(f"❌ Expected one upstream scrape, got {scrapes}")
+    return failures == 0 and scrapes == 1
+
+
+def run_batch_test(base_url, stub_url, products):
+    """Scrape distinct products through one POST /scrape/batch call and report per-product timing"""
+    run_id = int(time.time() * 1000)
+    payload = {"product_urls": [f"{stub_url}/products/batch-{run_id}-{i}" for i in range(products)]}
+    frames = []
+    started = time.perf_counter()
+    first_result_at = None
+    with requests.post(f"{base_url}/scrape/batch", json=payload, stream=True, timeout=300) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            frames.append(json.loads(line))
+            if first_result_at is None:
+                first_result_at = time.perf_counter() - started
+    wall = time.perf_counter() - started
+
+    results = [frame for frame in frames if frame["type"] == "product"]
+    summary = frames[-1] if frames and frames[-1]["type"] == "summary" else {}
+    elapsed = [frame["elapsed_ms"] for frame in results]
+
+    print("\n📊 Batch results")
+    print("=" * 50)
+    print(f"   Products:          {len(results)} ({summary.get('failed', '?')} failed)")
+    print(f"   Reviews:           {summary.get('total_reviews')}")
+    print(f"   Wall time:         {wall:.2f}s")
+    print(f"   First result:      {first_result_at * 1000:.1f} ms")
+    print(f"   Product p50:       {percentile(elapsed, 0.50):.1f} ms")
+    print(f"   Product p99:       {percentile(elapsed, 0.99):.1f} ms")
+    print(f"   Sheets saved:      {summary.get('google_sheets_saved')}")
+    print("   Slowest products:")
+    for frame in sorted(results, key=lambda frame: frame["elapsed_ms"], reverse=True)[:3]:
+        print(f"      {frame['elapsed_ms']:8.1f} ms (+{frame['wait_ms']:.1f} ms queued) {frame['product_url']}")
+    return bool(summary) and summary.get("failed") == 0 and len(results) == products
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent /scrape load test against the stub product server")
+    parser.add_argument("--api", default="http://localhost:8000")
+    parser.add_argument("--stub", default="http://127.0.0.1:8001", help="Start with scripts/stub_product_server.py")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--products", type=int, default=50, help="Distinct product URLs")
+    parser.add_argument("--burst", type=int, default=0, help="Send this many identical requests at once instead")
+    parser.add_argument("--batch", action="store_true", help="Scrape --products products in one /scrape/batch call")
+    parser.add_argument("--force-refresh", action="store_true", help="Bypass the result cache on every request")
+    options = parser.parse_args()
+
+    try:
+        if options.batch:
+            print(f"🧪 Batch scraping {options.products} products...")
+            return run_batch_test(options.api, options.stub, options.products)
+        if options.burst:
+            print(f"🧪 Bursting {options.burst} identical POST /scrape requests...")
+            return run_burst_test(options.api, options.stub, options.burst)
+        print("🧪 Load testing POST /scrape...")
+        payload_extra = {"force_refresh": True} if options.force_refresh else None
+        return run_load_test(
+            options.api, options.stub, options.requests, options.concurrency, options.products, payload_extra
+        )
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Backend not reachable: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    if main():
+        print("\n✅ Load test completed!")
+    else:
+        print("\n❌ Load test had failures!")
+        sys.exit(1)
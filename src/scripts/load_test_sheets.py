@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from load_test_scrape import get_health, percentile
+
+
+def scrape(base_url, product_url):
+    """POST one /scrape and return (latency, response json)"""
+    payload = {"product_url": product_url, "force_refresh": True}
+    started = time.perf_counter()
+    response = requests.post(f"{base_url}/scrape", json=payload, timeout=60)
+    response.raise_for_status()
+    return time.perf_counter() - started, response.json()
+
+
+def wait_for_flush(base_url, timeout):
+    """Wait until the write-behind buffer is empty; returns the sheets stats"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        sheets = get_health(base_url)["sheets"]
+        if sheets["pending_rows"] == 0:
+            return sheets
+        time.sleep(0.5)
+    return get_health(base_url)["sheets"]
+
+
+def run_sheets_test(base_url, stub_url, fake_url, requests_total, products, concurrency, flush_timeout):
+    """Scrape products repeatedly and check each review reaches the fake Sheets API exactly once"""
+    run_id = int(time.time() * 1000)
+    urls = [f"{stub_url}/products/sheets-{run_id}-{i % products}" for i in range(requests_total)]
+
+    before_fake = requests.get(f"{fake_url}/stats", timeout=10).json()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda url: scrape(base_url, url), urls))
+    wall = time.perf_counter() - started
+
+    sheets = wait_for_flush(base_url, flush_timeout)
+    after_fake = requests.get(f"{fake_url}/stats", timeout=10).json()
+
+    latencies = [latency for latency, _ in results]
+    # Identical concurrent requests are coalesced onto one scrape
+    scrapes = {(url, response["data"][0]["timestamp"]) for url, (_, response) in zip(urls, results)}
+    # Rescrapes only append reviews the store has not seen, so each product's reviews land once
+    reviews_per_product = {}
+    for url, (_, response) in zip(urls, results):
+        reviews_per_product[url] = max(reviews_per_product.get(url, 0), response["total_reviews"])
+    expected_rows = sum(reviews_per_product.values())
+    statuses = {response["google_sheets_saved"] for _, response in results}
+    urls_per_product = {}
+    for url, (_, response) in zip(urls, results):
+        urls_per_product.setdefault(url, set()).add(response["sheet_url"])
+
+    new_spreadsheets = after_fake["spreadsheets"] - before_fake["spreadsheets"]
+    new_rows = after_fake["data_rows"] - before_fake["data_rows"]
+    writes = after_fake["requests"].get("values_batch_update", 0) - before_fake["requests"].get(
+        "values_batch_update", 0
+    )
+    throttled = after_fake["requests"].get("throttled", 0) - before_fake["requests"].get("throttled", 0)
+
+    print("\n📊 Sheets write-behind results")
+    print("=" * 50)
+    print(f"   /scrape calls:        {requests_total} for {products} products in {wall:.2f}s ({len(scrapes)} scrapes)")
+    p50, p99 = percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000
+    print(f"   /scrape p50 / p99:    {p50:.1f} / {p99:.1f} ms")
+    print(f"   google_sheets_saved:  {sorted(map(str, statuses))}")
+    print(f"   Spreadsheets created: {new_spreadsheets}")
+    print(f"   Rows expected/landed: {expected_rows} / {new_rows}")
+    print(f"   batchUpdate calls:    {writes}")
+    print(f"   Throttled (429):      {throttled}, sink retries: {sheets['retries']}")
+    print(f"   Rows contiguous:      {after_fake['contiguous']}")
+
+    ok = True
+    if statuses != {"pending"}:
+        print("❌ Expected every response to report google_sheets_saved = 'pending'")
+        ok = False
+    if new_spreadsheets != products or any(len(sheet_urls) != 1 for sheet_urls in urls_per_product.values()):
+        print("❌ Expected exactly one spreadsheet per product")
+        ok = False
+    if new_rows != expected_rows or not after_fake["contiguous"]:
+        print("❌ Expected one row per distinct review in the fake Sheets API")
+        ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write-behind Sheets sink against scripts/fake_sheets_server.py")
+    parser.add_argument("--api", default="http://localhost:8000")
+    parser.add_argument("--stub", default="http://127.0.0.1:8001", help="Start with scripts/stub_product_server.py")
+    parser.add_argument("--fake", default="http://127.0.0.1:8002", help="Start with scripts/fake_sheets_server.py")
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--products", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--flush-timeout", type=float, default=120)
+    options = parser.parse_args()
+
+    print("🧪 Testing the Google Sheets write-behind sink...")
+    try:
+        if get_health(options.api)["google_sheets"] != "configured":
+            print("❌ Backend has no Sheets configured; start it with GOOGLE_SHEETS_EMULATOR_URL set")
+            return False
+        return run_sheets_test(
+            options.api,
+            options.stub,
+            options.fake,
+            options.requests,
+            options.products,
+            options.concurrency,
+            options.flush_timeout,
+        )
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Backend or fake Sheets server not reachable: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    if main():
+        print("\n✅ Sheets test completed!")
+    else:
+        print("\n❌ Sheets test failed!")
+        sys.exit(1)
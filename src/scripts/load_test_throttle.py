@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import sys
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+from load_test_scrape import get_health
+
+
+def stub_stats(stub_url):
+    """Served / 429 / 503 counters from the stub server"""
+    response = requests.get(f"{stub_url}/stats", timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+def run_batch(base_url, product_urls, reviews):
+    """One forced /scrape/batch run; returns (product frames, seconds)"""
+    payload = {"product_urls": product_urls, "force_refresh": True, "incremental": False, "max_reviews": reviews}
+    started = time.perf_counter()
+    with requests.post(f"{base_url}/scrape/batch", json=payload, stream=True, timeout=1800) as response:
+        response.raise_for_status()
+        frames = [json.loads(line) for line in response.iter_lines() if line]
+    elapsed = time.perf_counter() - started
+    return [frame for frame in frames if frame["type"] == "product"], elapsed
+
+
+def run_throttle_test(base_url, stub_url, products, reviews, page_size):
+    """Scrape a batch from a stub that rate-limits and sheds load, and report throughput and completeness"""
+    run_id = int(time.time() * 1000)
+    product_urls = [f"{stub_url}/products/throttle-{run_id}-{i}" for i in range(products)]
+    host = urlsplit(stub_url).netloc.lower()
+
+    fetch_before = get_health(base_url)["fetch"]
+    stub_before = stub_stats(stub_url)
+    frames, elapsed = run_batch(base_url, product_urls, reviews)
+    fetch_after = get_health(base_url)["fetch"]
+    stub_after = stub_stats(stub_url)
+
+    expected = products * reviews
+    scraped = sum(frame["total_reviews"] for frame in frames if frame["success"])
+    pages = fetch_after["pages_fetched"] - fetch_before["pages_fetched"]
+    limits = fetch_after.get("host_limits", {}).get(host, {})
+
+    print("\n📊 Throttled scrape results")
+    print("=" * 50)
+    print(f"   Adaptive limits: {'on' if limits.get('adaptive') else 'off'}")
+    print(f"   Products: {products} x {reviews} reviews ({products * -(-reviews // page_size)} pages)")
+    print(f"   Elapsed: {elapsed:.2f}s ({pages / elapsed:.1f} pages/s)")
+    print(f"   Reviews scraped: {scraped} / {expected} ({scraped / expected:.1%})")
+    print(f"   Retries: {fetch_after['retries'] - fetch_before['retries']}")
+    print(
+        f"   Stub refusals: {stub_after['throttled'] - stub_before['throttled']} x 429, "
+        f"{stub_after['overloaded'] - stub_before['overloaded']} x 503 "
+        f"(peak {stub_after['peak_in_flight']} in flight)"
+    )
+    if limits:
+        print(
+            f"   Host limits for {host}: concurrency {limits['concurrency']}, rate {limits['rate']}/s, "
+            f"latency {limits['latency_ms']} ms"
+        )
+
+    if scraped != expected:
+        print("❌ Some pages were lost to throttling")
+        return False
+    print("✅ Every review was scraped despite throttling")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Batch scrape against a throttled stub server "
+        "(stub_product_server.py --rate R --max-inflight N); "
+        "restart the backend with FETCH_ADAPTIVE=false to compare fixed limits"
+    )
+    parser.add_argument("--api", default="http://localhost:8000")
+    parser.add_argument("--stub", default="http://127.0.0.1:8001")
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--reviews", type=int, default=200, help="Reviews per product (the stub's --reviews)")
+    parser.add_argument("--page-size", type=int, default=20, help="The stub's --page-size")
+    options = parser.parse_args()
+
+    print("🧪 Testing scraping against a throttled host...")
+    try:
+        return run_throttle_test(options.api, options.stub, options.products, options.reviews, options.page_size)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Backend or stub server not reachable: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    if main():
+        print("\n✅ Throttle test completed!")
+    else:
+        print("\n❌ Throttle test failed!")
+        sys.exit(1)
@@ -30,6 +30,18 @@ def test_complete_system():
         else:
             print("❌ API test failed")
             return False
+
+        # Streaming API test (time to first review)
+        # force_refresh so the URL just scraped is fetched live rather than replayed from the result cache
+        payload = {**payload, "force_refresh": True}
+        started = time.perf_counter()
+        with requests.post("http://localhost:8000/scrape/stream", json=payload, stream=True, timeout=30) as response:
+            first_line = next(response.iter_lines(), None) if response.status_code == 200 else None
+        if first_line and json.loads(first_line).get("type") == "review":
+            print(f"✅ Streaming test passed - first review after {(time.perf_counter() - started) * 1000:.1f} ms")
+        else:
+            print("❌ Streaming test failed")
+            return False
             
     except Exception as e:
         print(f"❌ Backend test failed: {e}")
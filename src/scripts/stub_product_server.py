@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+
+import argparse
+import gzip
+import hashlib
+import html
+import json
+import random
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+REVIEW_TEMPLATES = [
+    ("Excellent product! Exactly as described.", 5),
+    ("Good product, fast delivery.", 5),
+    ("Great value for money.", 4),
+    ("Nice product but packaging could be better.", 4),
+    ("It is okay, nothing special.", 3),
+    ("Average quality, delivery was slow.", 3),
+    ("Not as described, color is different.", 2),
+    ("Poor quality, stopped working after a week.", 2),
+    ("Terrible, received a damaged item.", 1),
+    ("Waste of money, do not buy.", 1),
+]
+
+
+def build_reviews(slug, count):
+    """Build a deterministic list of reviews for a product slug"""
+    rng = random.Random(int(hashlib.md5(slug.encode("utf-8")).hexdigest()[:8], 16))
+    reviews = []
+    for i in range(count):
+        text, rating = rng.choice(REVIEW_TEMPLATES)
+        reviews.append((f"{text} (review #{i + 1})", rating))
+    return reviews
+
+
+def render_page(slug, reviews, page, page_size):
+    """Render one product review page as HTML, newest reviews first"""
+    total_pages = max(1, (len(reviews) + page_size - 1) // page_size)
+    start = (page - 1) * page_size
+    items = []
+    for index in range(len(reviews) - start, max(0, len(reviews) - start - page_size), -1):
+        text, rating = reviews[index - 1]
+        items.append(
+            f'<div class="review-item" data-review-id="{slug}-{index}">'
+            f'<span class="rating" data-rating="{rating}"></span>'
+            f'<p class="review-content">{html.escape(text)}</p></div>'
+        )
+    name = html.escape(slug.replace("-", " ").title())
+    next_link = f'<a class="next" href="?page={page + 1}">Next</a>' if page < total_pages else ""
+    return (
+        f"<!DOCTYPE html><html><head><title>{name}</title>"
+        f'<meta property="og:title" content="{name}"></head><body>'
+        f"<h1>{name}</h1><div class=\"mod-reviews\">{''.join(items)}</div>"
+        f'<div class="review-pagination" data-current-page="{page}" data-total-pages="{total_pages}"'
+        f' data-total-reviews="{len(reviews)}">{next_link}</div>'
+        "</body></html>"
+    )
+
+
+def render_api_page(slug, reviews, page, page_size):
+    """Render one page of reviews as a Daraz/Lazada-style review API response, newest first"""
+    total_pages = max(1, (len(reviews) + page_size - 1) // page_size)
+    start = (page - 1) * page_size
+    items = []
+    for index in range(len(reviews) - start, max(0, len(reviews) - start - page_size), -1):
+        text, rating = reviews[index - 1]
+        items.append({"reviewRateId": f"{slug}-{index}", "rating": rating, "reviewContent": text})
+    paging = {"currentPage": page, "pageSize": page_size, "totalItems": len(reviews), "totalPages": total_pages}
+    return json.dumps({"success": True, "model": {"items": items, "paging": paging}})
+
+
+def make_handler(options):
+    # Reviews posted per product since the server started, on top of --reviews
+    added = {}
+    # When each product last changed, for Last-Modified
+    modified = {}
+    started = time.time()
+    added_lock = threading.Lock()
+    # Server-side throttling: a token bucket for --rate and a counter for --max-inflight
+    throttle = {"tokens": max(1.0, options.rate), "updated": time.monotonic(), "in_flight": 0}
+    counters = {"served": 0, "throttled": 0, "overloaded": 0, "peak_in_flight": 0}
+
+    def admit():
+        """None if the request may proceed, else the (status, Retry-After) to refuse it with"""
+        with added_lock:
+            if options.rate:
+                now = time.monotonic()
+                throttle["tokens"] = min(max(1.0, options.rate), throttle["tokens"] + (now - throttle["updated"]) * options.rate)
+                throttle["updated"] = now
+                if throttle["tokens"] < 1:
+                    counters["throttled"] += 1
+                    return 429, "1"
+                throttle["tokens"] -= 1
+            if options.max_inflight and throttle["in_flight"] >= options.max_inflight:
+                counters["overloaded"] += 1
+                return 503, None
+            throttle["in_flight"] += 1
+            counters["peak_in_flight"] = max(counters["peak_in_flight"], throttle["in_flight"])
+            return None
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            if options.verbose:
+                super().log_message(format, *args)
+
+        def send_json(self, payload, status=200):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            """GET /products/<slug>?page=N (HTML), /api/products/<slug>/reviews?page=N&pageSize=M (JSON) or /stats"""
+            if urlsplit(self.path).path == "/stats":
+                with added_lock:
+                    self.send_json(dict(counters, in_flight=throttle["in_flight"]))
+                return
+            refusal = admit()
+            if refusal is not None:
+                status, retry_after = refusal
+                self.send_response(status)
+                if retry_after:
+                    self.send_header("Retry-After", retry_after)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            try:
+                self.serve_page()
+            finally:
+                with added_lock:
+                    throttle["in_flight"] -= 1
+                    counters["served"] += 1
+
+        def serve_page(self):
+            parts = urlsplit(self.path)
+            query = parse_qs(parts.query)
+            path = parts.path.rstrip("/")
+            api = path.startswith("/api/products/") and path.endswith("/reviews")
+            if api:
+                slug = path[len("/api/products/"):-len("/reviews")]
+                page_size = max(1, int(query.get("pageSize", [str(options.page_size)])[0]))
+            elif path.startswith("/products/"):
+                slug = path.rsplit("/", 1)[-1]
+                page_size = options.page_size
+            else:
+                self.send_error(404)
+                return
+            page = max(1, int(query.get("page", ["1"])[0]))
+            with added_lock:
+                count = options.reviews + added.get(slug, 0)
+                last_modified = formatdate(modified.get(slug, started), usegmt=True)
+                in_flight = throttle["in_flight"]
+
+            if options.latency:
+                # Past --max-inflight / 2 concurrent requests the server slows down, like a saturated backend
+                crowding = max(0, in_flight - options.max_inflight // 2) if options.max_inflight else 0
+                time.sleep(options.latency * (1 + crowding))
+
+            # A page changes only when reviews are published, so its version is the review count
+            etag = f'"{slug}-{count}-{page}-{page_size}{"-api" if api else ""}"'
+            if options.validators and (
+                self.headers.get("If-None-Match") == etag
+                or (not self.headers.get("If-None-Match") and self.headers.get("If-Modified-Since") == last_modified)
+            ):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                self.end_headers()
+                return
+
+            reviews = build_reviews(slug, count)
+            if api:
+                body = render_api_page(slug, reviews, page, page_size).encode("utf-8")
+            else:
+                body = render_page(slug, reviews, page, page_size).encode("utf-8")
+            encoding = None
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body)
+                encoding = "gzip"
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json" if api else "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            if options.validators:
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            """POST /products/<slug>/reviews?count=N publishes N new reviews for the product"""
+            parts = urlsplit(self.path)
+            path = parts.path.rstrip("/")
+            if not (path.startswith("/products/") and path.endswith("/reviews")):
+                self.send_error(404)
+                return
+            slug = path[len("/products/"):-len("/reviews")]
+            count = max(0, int(parse_qs(parts.query).get("count", ["1"])[0]))
+            with added_lock:
+                added[slug] = added.get(slug, 0) + count
+                # Never equal to the previous Last-Modified, even within the same second
+                modified[slug] = max(time.time(), modified.get(slug, started) + 1)
+                total = options.reviews + added[slug]
+
+            self.send_json({"product": slug, "total_reviews": total})
+
+    return StubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub product server with paginated reviews")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--reviews", type=int, default=200, help="Reviews per product")
+    parser.add_argument("--page-size", type=int, default=20, help="Reviews per page")
+    parser.add_argument("--latency", type=float, default=0.05, help="Artificial latency per page (seconds)")
+    parser.add_argument("--no-validators", dest="validators", action="store_false",
+                        help="Do not send ETag / Last-Modified or answer conditional requests with 304")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Pages per second to serve; excess requests get 429 with Retry-After (0 = unlimited)")
+    parser.add_argument("--max-inflight", type=int, default=0,
+                        help="Concurrent requests to serve; excess requests get 503 (0 = unlimited)")
+    parser.add_argument("--verbose", action="store_true")
+    options = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", options.port), make_handler(options))
+    print(f"🧪 Stub product server on http://127.0.0.1:{options.port}/products/<slug>")
+    print(f"   {options.reviews} reviews per product, {options.page_size} per page, {options.latency}s latency")
+    if options.rate or options.max_inflight:
+        print(f"   Throttled to {options.rate or 'unlimited'} pages/s, {options.max_inflight or 'unlimited'} in flight")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping stub server...")
+        server.server_close()
+    return True
+
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
@@ -25,8 +25,149 @@ def wait_for_server(url, timeout=30):
     print(f"❌ Server not available after {timeout} seconds")
     return False
 
-def test_api():
-    """Test the FastAPI backend"""
+def test_review_store(base_url, scrape_product_id, scrape_total):
+    """Product summary, trend, paging and search over the product test 3 stored"""
+    # Test product summary endpoint
+    try:
+        print("\n6. Testing product summary endpoint...")
+        response = requests.get(f"{base_url}/products/{scrape_product_id}/summary", timeout=10)
+        if response.status_code != 200:
+            print(f"❌ Product summary failed: HTTP {response.status_code}")
+            return False
+        summary = response.json()["summary"]
+        if sum(summary["score_histogram"]["counts"]) != summary["total"]:
+            print("❌ Score histogram does not add up to the review count")
+            return False
+        aspects = summary.get("aspects")
+        if not aspects or any(
+            sum(aspect["labels"].values()) != aspect["mentions"] or aspect["mentions"] > summary["total"]
+            for aspect in aspects.values()
+        ):
+            print(f"❌ Aspect summary is missing or inconsistent: {aspects}")
+            return False
+        mentions = [aspect["mentions"] for aspect in aspects.values()]
+        if mentions != sorted(mentions, reverse=True):
+            print("❌ Aspects are not ordered by mentions")
+            return False
+        if requests.get(f"{base_url}/products/unknown/summary", timeout=10).status_code != 404:
+            print("❌ Unknown product did not return 404")
+            return False
+        print("✅ Product summary endpoint passed")
+        print(f"   Reviews: {summary['total']}, mean score: {summary['mean_score']}, mean rating: {summary['mean_rating']}")
+        print(f"   Ratings: {summary['ratings']}")
+        top = ", ".join(f"{name} ({aspect['mentions']})" for name, aspect in aspects.items())
+        print(f"   Aspects: {top}")
+    except Exception as e:
+        print(f"❌ Product summary error: {e}")
+        return False
+
+    # Test review store trend endpoint
+    try:
+        print("\n7. Testing review store trend endpoint...")
+        products = requests.get(f"{base_url}/products", timeout=10).json()
+        stored = next((product for product in products if product["product_id"] == scrape_product_id), None)
+        if stored is None:
+            print("❌ Scraped product is not in the review store")
+            return False
+        response = requests.get(f"{base_url}/products/{scrape_product_id}/trend", params={"bucket": "hour"}, timeout=10)
+        if response.status_code != 200:
+            print(f"❌ Trend failed: HTTP {response.status_code}")
+            return False
+        points = response.json()["points"]
+        # Every scraped review has its own id, so re-scrapes in the tests above add nothing
+        if stored["review_count"] != scrape_total:
+            print(f"❌ Stored {stored['review_count']} reviews, the scrape returned {scrape_total}")
+            return False
+        if sum(point["total"] for point in points) != scrape_total:
+            print("❌ Trend does not add up to the scraped review count")
+            return False
+        print("✅ Review store endpoints passed")
+        print(f"   Stored reviews: {stored['review_count']} in {len(points)} hourly bucket(s)")
+    except Exception as e:
+        print(f"❌ Review store error: {e}")
+        return False
+
+    # Test 8: Cursor-paginated reviews
+    try:
+        print("\n8. Testing paginated product reviews...")
+        url = f"{base_url}/products/{scrape_product_id}/reviews"
+        seen = set()
+        cursor = None
+        total = None
+        previous_score = None
+        while True:
+            params = {"sort": "most_positive", "limit": 7}
+            if cursor:
+                params["cursor"] = cursor
+            response = requests.get(url, params=params, timeout=10)
+            if response.status_code != 200:
+                print(f"❌ Review page failed: HTTP {response.status_code}")
+                return False
+            page = response.json()
+            if total is None:
+                total = page["total"]
+            for review in page["reviews"]:
+                if previous_score is not None and review["sentiment_score"] > previous_score:
+                    print("❌ Reviews are not sorted by score")
+                    return False
+                previous_score = review["sentiment_score"]
+                seen.add(review["id"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        if len(seen) != total or total != scrape_total:
+            print(f"❌ Paging returned {len(seen)} distinct reviews, expected {scrape_total}")
+            return False
+        negative = requests.get(url, params={"label": "Negative", "limit": 500}, timeout=10).json()
+        if any(review["sentiment_label"] != "Negative" for review in negative["reviews"]):
+            print("❌ Label filter returned other labels")
+            return False
+        response = requests.get(url, params={"cursor": "not-a-cursor"}, timeout=10)
+        if response.status_code != 400:
+            print(f"❌ Bad cursor should be rejected, got HTTP {response.status_code}")
+            return False
+        print("✅ Paginated reviews passed")
+        print(f"   Walked {len(seen)} reviews in pages of 7; {negative['total']} negative")
+    except Exception as e:
+        print(f"❌ Paginated reviews error: {e}")
+        return False
+
+    # Test 9: Full-text search
+    try:
+        print("\n9. Testing review search...")
+        response = requests.get(
+            f"{base_url}/search", params={"q": "quality OR delivery", "label": "Positive", "min_rating": 4}, timeout=10
+        )
+        if response.status_code != 200:
+            print(f"❌ Search failed: HTTP {response.status_code}")
+            return False
+        found = response.json()
+        hits = found["results"]
+        if not hits:
+            print("❌ Search found nothing for 'quality OR delivery'")
+            return False
+        for hit in hits:
+            text = hit["review_text"].lower()
+            if ("quality" not in text and "delivery" not in text) or hit["sentiment_label"] != "Positive" or hit["rating"] < 4:
+                print(f"❌ Search hit does not match the query and filters: {hit}")
+                return False
+        if [hit["relevance"] for hit in hits] != sorted((hit["relevance"] for hit in hits), reverse=True):
+            print("❌ Search results are not ranked")
+            return False
+        response = requests.get(f"{base_url}/search", params={"q": "!!!"}, timeout=10)
+        if response.status_code != 400:
+            print(f"❌ Query without words should be rejected, got HTTP {response.status_code}")
+            return False
+        print("✅ Review search passed")
+        print(f"   'quality OR delivery', Positive, 4+ stars: {found['total']} matches")
+    except Exception as e:
+        print(f"❌ Review search error: {e}")
+        return False
+    return True
+
+
+def test_api(product_url="https://www.daraz.pk/products/test-product"):
+    """Test the FastAPI backend; product_url is scraped by tests 3 and 4"""
     base_url = "http://localhost:8000"
     
     print("🧪 Testing Product Review Sentiment Scraper API...")
@@ -76,7 +217,7 @@ def test_api():
     # Test scrape endpoint
     try:
         print("\n3. Testing scrape endpoint...")
-        payload = {"product_url": "https://www.daraz.pk/products/test-product"}
+        payload = {"product_url": product_url}
         response = requests.post(f"{base_url}/scrape", json=payload, timeout=30)
         
         if response.status_code == 200:
@@ -103,6 +244,15 @@ def test_api():
                 print("   Sentiment distribution:")
                 for sentiment, count in sentiments.items():
                     print(f"     {sentiment}: {count}")
+
+                summary = data.get('summary') or {}
+                summary_labels = {label: count for label, count in summary.get('labels', {}).items() if count}
+                if summary_labels != sentiments or summary.get('total') != len(reviews):
+                    print(f"❌ Response summary does not match the reviews: {summary_labels}")
+                    return False
+                scrape_product_id = data.get('product_id')
+                scrape_total = data.get('total_reviews')
+                scrape_is_sample = "demo mode" in data.get('message', '')
                 
                 print("✅ Data structure is valid")
             else:
@@ -120,6 +270,90 @@ def test_api():
         print(f"❌ Scrape endpoint error: {e}")
         return False
     
+    # Test streaming scrape endpoint
+    try:
+        print("\n4. Testing streaming scrape endpoint...")
+        # Test 3 just scraped this URL; force_refresh times a live scrape instead of a result cache replay
+        payload = {"product_url": product_url, "force_refresh": True}
+        started = time.perf_counter()
+        first_review_at = None
+        review_count = 0
+        summary = None
+
+        with requests.post(f"{base_url}/scrape/stream", json=payload, stream=True, timeout=30) as response:
+            if response.status_code != 200:
+                print(f"❌ Streaming endpoint failed: HTTP {response.status_code}")
+                return False
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                frame = json.loads(line)
+                if frame.get("type") == "review":
+                    review_count += 1
+                    if first_review_at is None:
+                        first_review_at = time.perf_counter() - started
+                elif frame.get("type") == "summary":
+                    summary = frame
+                elif frame.get("type") == "error":
+                    print(f"❌ Stream error: {frame.get('detail')}")
+                    return False
+        total_time = time.perf_counter() - started
+
+        if summary is None or review_count == 0:
+            print("❌ Stream ended without reviews or summary frame")
+            return False
+
+        print("✅ Streaming endpoint passed")
+        print(f"   Reviews streamed: {review_count} (summary says {summary.get('total_reviews')})")
+        print(f"   Time to first review: {first_review_at * 1000:.1f} ms")
+        print(f"   Total stream time: {total_time * 1000:.1f} ms")
+        print(f"   Google Sheets saved: {summary.get('google_sheets_saved')}")
+    except Exception as e:
+        print(f"❌ Streaming endpoint error: {e}")
+        return False
+
+    # Test background job endpoints
+    try:
+        print("\n5. Testing background job endpoints...")
+        payload = {"product_url": "https://www.daraz.pk/products/test-job-product"}
+        response = requests.post(f"{base_url}/jobs", json=payload, timeout=10)
+        if response.status_code != 202:
+            print(f"❌ Job submission failed: HTTP {response.status_code}")
+            return False
+        job = response.json()
+        print(f"   Job {job['job_id']} queued")
+
+        polls = 0
+        deadline = time.time() + 120
+        while job["status"] in ("queued", "running") and time.time() < deadline:
+            time.sleep(0.5)
+            polls += 1
+            job = requests.get(f"{base_url}/jobs/{job['job_id']}", timeout=10).json()
+
+        if job["status"] != "done" or not job.get("result"):
+            print(f"❌ Job did not finish: {job['status']} {job.get('error') or ''}")
+            return False
+
+        print("✅ Job endpoints passed")
+        print(f"   Polls: {polls}, pages fetched: {job['pages_fetched']}")
+        print(f"   Reviews: {job['result']['total_reviews']}")
+    except Exception as e:
+        print(f"❌ Job endpoint error: {e}")
+        return False
+
+    if scrape_is_sample:
+        # Demo-mode sample reviews never reach the review store, so there is nothing to query
+        print("\n6. Checking demo data stayed out of the review store...")
+        response = requests.get(f"{base_url}/products/{scrape_product_id}/summary", timeout=10)
+        if response.status_code != 404:
+            print(f"❌ Sample reviews were stored: HTTP {response.status_code}")
+            return False
+        print("✅ Sample reviews were not stored")
+        print("   To test the review store, scrape a real page, e.g. scripts/stub_product_server.py:")
+        print("   python scripts/test_api.py http://127.0.0.1:8001/products/test-product")
+    elif not test_review_store(base_url, scrape_product_id, scrape_total):
+        return False
+
     print("\n" + "=" * 50)
     print("🎉 All API tests passed!")
     print("✅ Backend is working correctly!")
@@ -130,7 +364,7 @@ def test_api():
     return True
 
 if __name__ == "__main__":
-    if test_api():
+    if test_api(*sys.argv[1:2]):
         print("\n🚀 You can now use the application!")
         sys.exit(0)
     else: